@@ -0,0 +1,202 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from glob import glob
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from speechline.utils.alignment import equal_blocks
+from speechline.utils.tokenizer import WordTokenizer
+
+Blocks = List[Tuple[int, int, int, int]]
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """
+    Utility argument parser function for word alignment benchmarking.
+
+    Args:
+        args (List[str]):
+            List of arguments.
+
+    Returns:
+        argparse.Namespace:
+            Objects with arguments values as attributes.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python scripts/benchmark_word_alignment.py",
+        description="Benchmark word alignment engines against difflib.",
+    )
+
+    parser.add_argument(
+        "-i",
+        "--input_dir",
+        type=str,
+        default=None,
+        help="Directory of transcript offsets (JSON) and ground truths (TXT). "
+        "Synthetic readings are generated if not given.",
+    )
+    parser.add_argument(
+        "--num_words",
+        type=int,
+        default=20_000,
+        help="Number of ground truth words per synthetic reading.",
+    )
+    parser.add_argument(
+        "--num_readings", type=int, default=3, help="Number of synthetic readings."
+    )
+    parser.add_argument(
+        "--error_rate",
+        type=float,
+        default=0.15,
+        help="Word error rate of synthetic transcripts.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    return parser.parse_args(args)
+
+
+def synthetic_readings(
+    num_readings: int, num_words: int, error_rate: float, seed: int = 0
+) -> List[Tuple[List[str], List[str]]]:
+    """
+    Generates readings with Zipf-distributed ground truth words, and transcripts
+    with substitutions, deletions and insertions.
+
+    Args:
+        num_readings (int):
+            Number of readings.
+        num_words (int):
+            Number of ground truth words per reading.
+        error_rate (float):
+            Word error rate of transcripts.
+        seed (int, optional):
+            Random seed. Defaults to `0`.
+
+    Returns:
+        List[Tuple[List[str], List[str]]]:
+            Transcript and ground truth words of every reading.
+    """
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(5_000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+
+    readings = []
+    for _ in range(num_readings):
+        ground_truth = rng.choices(vocab, weights, k=num_words)
+        transcript = []
+        for word in ground_truth:
+            p = rng.random()
+            if p < error_rate / 3:
+                transcript.append(rng.choice(vocab))  # substitution
+            elif p < 2 * error_rate / 3:
+                continue  # deletion
+            elif p < error_rate:
+                transcript.extend([word, rng.choice(vocab)])  # insertion
+            else:
+                transcript.append(word)
+        readings.append((transcript, ground_truth))
+    return readings
+
+
+def load_readings(input_dir: str) -> List[Tuple[List[str], List[str]]]:
+    """
+    Loads transcripts and ground truths of SpeechLine offsets in `input_dir`,
+    normalized as in `WordOverlapSegmenter`.
+
+    Args:
+        input_dir (str):
+            Directory of `{utt_id}.json` offsets and `{utt_id}.txt` ground truths.
+
+    Returns:
+        List[Tuple[List[str], List[str]]]:
+            Transcript and ground truth words of every reading.
+    """
+    tokenizer = WordTokenizer()
+    readings = []
+    for json_path in sorted(glob(f"{input_dir}/**/*.json", recursive=True)):
+        txt_path = Path(json_path).with_suffix(".txt")
+        if not txt_path.exists():
+            continue
+        with open(json_path) as f:
+            offsets = json.load(f)
+        transcript = [o["text"].lower().strip() for o in offsets]
+        ground_truth = [w.lower().strip() for w in tokenizer(txt_path.read_text())]
+        readings.append((transcript, ground_truth))
+    return readings
+
+
+def difflib_blocks(a: List[str], b: List[str]) -> Blocks:
+    """
+    Equal blocks of `difflib.SequenceMatcher` on raw tokens, i.e. the previous
+    `WordOverlapSegmenter` alignment.
+    """
+    opcodes = SequenceMatcher(None, a, b).get_opcodes()
+    return [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in opcodes if tag == "equal"]
+
+
+def aligned_pairs(blocks: Blocks) -> set:
+    return {(i1 + k, j1 + k) for i1, i2, j1, _ in blocks for k in range(i2 - i1)}
+
+
+def benchmark(readings: List[Tuple[List[str], List[str]]]) -> None:
+    """
+    Times every engine on `readings`, and compares their aligned words
+    with the raw `difflib` baseline.
+
+    Args:
+        readings (List[Tuple[List[str], List[str]]]):
+            Transcript and ground truth words of every reading.
+    """
+    engines: List[Tuple[str, Callable[[List[str], List[str]], Blocks]]] = [
+        ("difflib (raw tokens)", difflib_blocks),
+        ("difflib", lambda a, b: equal_blocks(a, b, engine="difflib")),
+        ("levenshtein", lambda a, b: equal_blocks(a, b, engine="levenshtein")),
+    ]
+
+    baseline = [difflib_blocks(a, b) for a, b in readings]
+    baseline_pairs = [aligned_pairs(blocks) for blocks in baseline]
+    num_words = sum(len(b) for _, b in readings)
+    print(f"{len(readings)} readings, {num_words} ground truth words")
+    print(f"{'engine':<22}{'time (s)':>10}{'aligned':>10}{'agreement':>11}{'same':>6}")
+
+    for name, fn in engines:
+        start = time.perf_counter()
+        outputs = [fn(a, b) for a, b in readings]
+        elapsed = time.perf_counter() - start
+
+        pairs = [aligned_pairs(blocks) for blocks in outputs]
+        aligned = sum(len(p) for p in pairs)
+        common = sum(len(p & q) for p, q in zip(pairs, baseline_pairs))
+        agreement = common / max(sum(len(q) for q in baseline_pairs), 1)
+        same = all(o == b for o, b in zip(outputs, baseline))
+        print(
+            f"{name:<22}{elapsed:>10.3f}{aligned:>10}{agreement:>11.2%}{str(same):>6}"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.input_dir:
+        readings = load_readings(args.input_dir)
+    else:
+        readings = synthetic_readings(
+            args.num_readings, args.num_words, args.error_rate, args.seed
+        )
+    benchmark(readings)
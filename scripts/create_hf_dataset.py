@@ -21,7 +21,7 @@ from typing import List
 
 import numpy as np
 import pandas as pd
-from datasets import Audio, Dataset, DatasetDict
+from datasets import Audio, Dataset, DatasetDict, concatenate_datasets
 from speechline.utils.g2p import get_g2p
 from tqdm.auto import tqdm
 
@@ -104,9 +104,13 @@ def create_dataset(
     Creates HuggingFace dataset from SpeechLine outputs.
     Ensures unique utterance and speaker IDs in each subset.
 
+    If `input_dir` holds Arrow shards written by `ArrowShardSink`, they are loaded
+    as is. Otherwise, audio chunks and TSV transcripts are read from the
+    directory layout written by `DirectorySink`.
+
     Args:
         input_dir (str):
-            Path to input audio directory.
+            Path to input audio directory, or directory of Arrow shards.
         dataset_name (str):
             HuggingFace dataset name.
         private (bool, optional):
@@ -122,13 +126,22 @@ def create_dataset(
         DatasetDict:
             Created HuggingFace dataset.
     """
-    audios = glob(f"{input_dir}/**/*.wav")
-    df = pd.DataFrame({"audio": audios})
-    # `audio` =  `"{dir}/{language}/{speaker}_{utt_id}.wav"`
-    df["id"] = df["audio"].apply(lambda x: x.split("/")[-1].replace(".wav", ""))
-    df["language"] = df["audio"].apply(lambda x: x.split("/")[-2])
-    df["speaker"] = df["audio"].apply(lambda x: x.split("/")[-1].split("_")[0])
-    df["text"] = df["audio"].apply(lambda x: parse_tsv(Path(x).with_suffix(".tsv")))
+    shards = sorted(glob(f"{input_dir}/*.arrow"))
+    if shards:
+        # shards already hold audio bytes and transcripts, nothing to re-read
+        shards_dataset = concatenate_datasets([Dataset.from_file(p) for p in shards])
+        df = shards_dataset.select_columns(["id", "language", "text"]).to_pandas()
+        df["speaker"] = df["id"].str.split("_").str[0]
+    else:
+        audios = glob(f"{input_dir}/**/*.wav")
+        df = pd.DataFrame({"audio": audios})
+        # `audio` =  `"{dir}/{language}/{speaker}_{utt_id}.wav"`
+        df["id"] = df["audio"].apply(lambda x: x.split("/")[-1].replace(".wav", ""))
+        df["language"] = df["audio"].apply(lambda x: x.split("/")[-2])
+        df["speaker"] = df["audio"].apply(lambda x: x.split("/")[-1].split("_")[0])
+        df["text"] = df["audio"].apply(
+            lambda x: parse_tsv(Path(x).with_suffix(".tsv"))
+        )
 
     tqdm.pandas(desc="Phonemization")
 
@@ -158,22 +171,23 @@ def create_dataset(
             valid_speakers.append(speaker)
         total += count
 
-    train_df = df[df["speaker"].isin(train_speakers)].reset_index(drop=True)
-    test_df = df[df["speaker"].isin(test_speakers)].reset_index(drop=True)
-    valid_df = df[df["speaker"].isin(valid_speakers)].reset_index(drop=True)
+    def _subset(speakers: List[str]) -> Dataset:
+        mask = df["speaker"].isin(speakers)
+        if shards:
+            subset = shards_dataset.select(np.flatnonzero(mask))
+            subset = subset.add_column("speaker", df["speaker"][mask].tolist())
+            if phonemize:
+                subset = subset.add_column("phonemes", df["phonemes"][mask].tolist())
+            return subset.remove_columns("offsets")
+        subset_df = df[mask].reset_index(drop=True)
+        return Dataset.from_pandas(subset_df).cast_column("audio", Audio())
 
-    dataset_dict = {
-        "train": Dataset.from_pandas(train_df).cast_column("audio", Audio())
-    }
+    dataset_dict = {"train": _subset(train_speakers)}
 
     if test_size > 0:
-        dataset_dict["test"] = Dataset.from_pandas(test_df).cast_column(
-            "audio", Audio()
-        )
+        dataset_dict["test"] = _subset(test_speakers)
     if valid_size > 0:
-        dataset_dict["validation"] = Dataset.from_pandas(valid_df).cast_column(
-            "audio", Audio()
-        )
+        dataset_dict["validation"] = _subset(valid_speakers)
 
     dataset = DatasetDict(dataset_dict)
     dataset.push_to_hub(dataset_name, private=private)
@@ -4,12 +4,12 @@ from pathlib import Path
 
 import torch
 import torchaudio
-import torchaudio.transforms as T
 import numpy as np
 
 
 from scipy.io.wavfile import write
 from tqdm.auto import tqdm
+from speechline.utils.resample import get_resampler
 from utils import preprocess_text, compute_alignments, compute_alignment_scores
 
 import torch
@@ -79,8 +79,8 @@ def get_word_alignment(datum, chunk_size_s, text_column: str):
     audio_array = torch.from_numpy(audio["array"])
     audio_id = Path(audio["path"]).stem
 
-    resampler = T.Resample(sampling_rate, bundle.sample_rate, dtype=audio_array.dtype)
-    resampled_waveform = resampler(audio_array)
+    resampler = get_resampler(sampling_rate, bundle.sample_rate)
+    resampled_waveform = resampler(audio_array.float())
 
     # split audio into chunks to avoid OOM and faster inference
     chunk_size_frames = chunk_size_s * bundle.sample_rate
@@ -9,7 +9,7 @@ import unicodedata
 import torch
 import torchaudio
 import torchaudio.functional as F
-import torchaudio.transforms as T
+from speechline.utils.resample import get_resampler
 
 from datasets import load_dataset
 from transformers import pipeline
@@ -69,7 +69,7 @@ def extract_lexicon(datum):
     words = preprocess_verse(datum["sentence"]).split()
     input_waveform, input_sample_rate = audio["array"], audio["sampling_rate"]
     input_waveform = torch.from_numpy(input_waveform).to(torch.float32).unsqueeze(0)
-    resampler = T.Resample(input_sample_rate, bundle.sample_rate, dtype=input_waveform.dtype)
+    resampler = get_resampler(input_sample_rate, bundle.sample_rate)
     resampled_waveform = resampler(input_waveform)
     # split audio into chunks to avoid OOM and faster inference
     chunk_size_frames = chunk_size_s * bundle.sample_rate
@@ -37,6 +37,7 @@ if __name__ == "__main__":
         license="Apache License",
         packages=find_packages(),
         install_requires=requirements,
+        entry_points={"console_scripts": ["speechline=speechline.__main__:main"]},
         include_package_data=True,
         platforms=["linux"],
         python_requires=">=3.7",
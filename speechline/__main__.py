@@ -0,0 +1,93 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from speechline.utils.lexicon import compile_lexicon
+from speechline.utils.logger import Logger
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """
+    Utility argument parser function for the SpeechLine command line interface.
+
+    Args:
+        args (List[str]):
+            List of arguments.
+
+    Returns:
+        argparse.Namespace:
+            Objects with arguments values as attributes.
+    """
+    parser = argparse.ArgumentParser(
+        prog="speechline", description="SpeechLine command line interface."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    lexicon_parser = commands.add_parser("lexicon", help="Manage lexicons.")
+    lexicon_commands = lexicon_parser.add_subparsers(
+        dest="lexicon_command", required=True
+    )
+    compile_parser = lexicon_commands.add_parser(
+        "compile",
+        help="Compile lexicons into a memory-mappable binary lexicon.",
+        description=(
+            "Merge the lexikos lexicon and JSON lexicons, normalize and deduplicate "
+            "their phonemes, and compile them into a binary lexicon, loadable "
+            "through the segmenter's `lexicon_path`."
+        ),
+    )
+    compile_parser.add_argument(
+        "-o",
+        "--output_path",
+        type=str,
+        required=True,
+        help="Path to save the compiled lexicon.",
+    )
+    compile_parser.add_argument(
+        "-l",
+        "--lexicon_path",
+        type=str,
+        action="append",
+        default=[],
+        help="Path to a JSON lexicon to merge. Can be repeated.",
+    )
+    compile_parser.add_argument(
+        "--no_lexikos",
+        action="store_true",
+        help="Don't start from the lexikos lexicon.",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    args = parse_args(sys.argv[1:] if args is None else args)
+    logger = Logger.get_logger()
+
+    if args.command == "lexicon" and args.lexicon_command == "compile":
+        start = time.perf_counter()
+        lexicon = compile_lexicon(
+            args.output_path, args.lexicon_path, use_lexikos=not args.no_lexikos
+        )
+        logger.info(
+            f"Compiled {len(lexicon)} words to {args.output_path} "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
+
+
+if __name__ == "__main__":
+    main()
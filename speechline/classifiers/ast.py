@@ -26,14 +26,28 @@ class ASTClassifier(AudioMultiLabelClassifier):
     Args:
         model_checkpoint (str):
             HuggingFace model hub checkpoint.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str) -> None:
-        super().__init__(model_checkpoint)
+    def __init__(
+        self,
+        model_checkpoint: str,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+    ) -> None:
+        super().__init__(
+            model_checkpoint, backend=backend, quantize=quantize, onnx_dir=onnx_dir
+        )
 
     def predict(
-        self, dataset: Dataset, threshold: float = 0.5
-    ) -> List[Dict[str, Union[str, float]]]:
+        self, dataset: Dataset, threshold: float = 0.5, batch_size: int = 1
+    ) -> List[List[Dict[str, Union[str, float]]]]:
         """
         Performs audio classification (inference) on `dataset`.
         Preprocesses datasets, performs inference, then returns predictions.
@@ -44,10 +58,12 @@ class ASTClassifier(AudioMultiLabelClassifier):
             threshold (float):
                 Threshold probability for predicted labels.
                 Anything above this threshold will be considered as a valid prediction.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
 
         Returns:
-            List[Dict[str, Union[str, float]]]:
-                List of predictions in the format of dictionaries,
+            List[List[Dict[str, Union[str, float]]]]:
+                Predictions of every audio, as lists of dictionaries
                 consisting of the predicted label and probability.
         """
-        return self.inference(dataset, threshold)
+        return self.inference(dataset, threshold, batch_size=batch_size)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import Iterator, List, Optional, Sequence, Union
 
 from datasets import Dataset
 
@@ -28,12 +28,33 @@ class Wav2Vec2Classifier(AudioClassifier):
             HuggingFace model hub checkpoint.
         max_duration_s (float):
             Maximum audio duration in seconds.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str, max_duration_s: float) -> None:
-        super().__init__(model_checkpoint, max_duration_s=max_duration_s)
+    def __init__(
+        self,
+        model_checkpoint: str,
+        max_duration_s: float,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+    ) -> None:
+        super().__init__(
+            model_checkpoint,
+            backend=backend,
+            quantize=quantize,
+            onnx_dir=onnx_dir,
+            max_duration_s=max_duration_s,
+        )
 
-    def predict(self, dataset: Dataset) -> List[str]:
+    def predict(
+        self, dataset: Dataset, stream: bool = False, batch_size: int = 1
+    ) -> Union[List[str], Iterator[str]]:
         """
         Performs audio classification (inference) on `dataset`.
         Preprocesses datasets, performs inference, then returns predictions.
@@ -41,9 +62,93 @@ class Wav2Vec2Classifier(AudioClassifier):
         Args:
             dataset (Dataset):
                 Dataset to be inferred.
+            stream (bool, optional):
+                Whether to lazily yield predictions in order. Defaults to `False`.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
+
+        Returns:
+            Union[List[str], Iterator[str]]:
+                List of predictions (as strings of labels).
+                If `stream` is `True`, return an iterator instead of a list.
+        """
+        return self.inference(dataset, stream=stream, batch_size=batch_size)
+
+    def predict_by_speaker(
+        self,
+        dataset: Dataset,
+        speakers: Sequence[str],
+        sample_size: int = 4,
+        max_samples: int = 12,
+        threshold: float = 0.9,
+        batch_size: int = 1,
+    ) -> List[str]:
+        """
+        Performs speaker-aggregated audio classification on `dataset`.
+        See `AudioClassifier.inference_by_group`.
+
+        Args:
+            dataset (Dataset):
+                Dataset to be inferred.
+            speakers (Sequence[str]):
+                Speaker ID of every audio in `dataset`.
+            sample_size (int, optional):
+                Number of audios sampled per speaker and round. Defaults to `4`.
+            max_samples (int, optional):
+                Maximum number of audios sampled per speaker. Defaults to `12`.
+            threshold (float, optional):
+                Minimum mean probability of a speaker's agreeing samples
+                to accept its label. Defaults to `0.9`.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
+
+        Returns:
+            List[str]:
+                List of predictions (as strings of labels).
+        """
+        return self.inference_by_group(
+            dataset,
+            speakers,
+            sample_size=sample_size,
+            max_samples=max_samples,
+            threshold=threshold,
+            batch_size=batch_size,
+        )
+
+    def predict_cascade(
+        self,
+        dataset: Dataset,
+        window_s: float,
+        threshold: float = 0.9,
+        second_stage: Optional["Wav2Vec2Classifier"] = None,
+        batch_size: int = 1,
+    ) -> List[str]:
+        """
+        Performs cascaded audio classification on `dataset`, scoring a short leading
+        window first. See `AudioClassifier.inference_cascade`.
+
+        Args:
+            dataset (Dataset):
+                Dataset to be inferred.
+            window_s (float):
+                Duration of the leading window scored by the first stage, in seconds.
+            threshold (float, optional):
+                Minimum probability to accept a first-stage prediction.
+                Defaults to `0.9`.
+            second_stage (Optional[Wav2Vec2Classifier], optional):
+                Classifier of ambiguous audios. Defaults to `None`, i.e. this
+                classifier on the full `max_duration_s` window.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
 
         Returns:
             List[str]:
                 List of predictions (as strings of labels).
         """
-        return self.inference(dataset)
+        return self.inference_cascade(
+            dataset,
+            window_s,
+            threshold=threshold,
+            second_stage=second_stage,
+            batch_size=batch_size,
+        )
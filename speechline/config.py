@@ -28,12 +28,73 @@ class ClassifierConfig:
         max_duration_s (float, optional):
             Maximum audio duration for padding. Defaults to `3.0` seconds.
         batch_size (int, optional):
-            Batch size during inference. Defaults to `1`.
+            Batch size during inference. Audios are batched in duration-sorted
+            order and padded to the longest audio of their batch, up to
+            `max_duration_s`. Defaults to `1`.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"` (ONNX Runtime on CPU).
+            Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to apply dynamic int8 quantization to the ONNX model.
+            Defaults to `False`.
+        group_by_speaker (bool, optional):
+            Whether to classify speakers instead of single utterances. The speaker
+            ID is the utterance ID's prefix, up to the first `_`. A sample of every
+            speaker's utterances is classified, and a confident label is copied
+            to the speaker's remaining utterances. Defaults to `False`.
+        speaker_sample_size (int, optional):
+            Number of utterances sampled per speaker and round. Defaults to `4`.
+        speaker_max_samples (int, optional):
+            Maximum number of utterances sampled per speaker, before falling back
+            to classifying every utterance. Defaults to `12`.
+        speaker_threshold (float, optional):
+            Minimum mean probability of a speaker's agreeing samples
+            to accept its label. Defaults to `0.9`.
+        cascade_window_s (float, optional):
+            If non-zero, audios are first classified on their leading
+            `cascade_window_s` seconds, and only ambiguous audios are classified on
+            their full `max_duration_s` window. Defaults to `0`.
+        cascade_threshold (float, optional):
+            Minimum probability to accept a leading-window prediction.
+            Defaults to `0.9`.
+        cascade_model (Optional[str], optional):
+            HuggingFace Hub checkpoint of the second-stage classifier of ambiguous
+            audios. Defaults to `None`, i.e. `model`.
     """
 
     model: str
     max_duration_s: float = 3.0
     batch_size: int = 1
+    backend: str = "pytorch"
+    quantize: bool = False
+    group_by_speaker: bool = False
+    speaker_sample_size: int = 4
+    speaker_max_samples: int = 12
+    speaker_threshold: float = 0.9
+    cascade_window_s: float = 0
+    cascade_threshold: float = 0.9
+    cascade_model: Optional[str] = None
+
+    def __post_init__(self):
+        if self.backend not in {"pytorch", "onnx"}:
+            raise ValueError(f"Backend {self.backend} is not yet supported!")
+
+        if self.speaker_sample_size < 1:
+            raise ValueError("`speaker_sample_size` must be positive!")
+        elif self.speaker_max_samples < self.speaker_sample_size:
+            raise ValueError(
+                "`speaker_max_samples` must be at least `speaker_sample_size`!"
+            )
+
+        if self.cascade_window_s:
+            if not 0 < self.cascade_window_s < self.max_duration_s:
+                raise ValueError(
+                    "`cascade_window_s` must be shorter than `max_duration_s`!"
+                )
+            elif self.group_by_speaker:
+                raise ValueError(
+                    "Cascaded classification can't be grouped by speaker!"
+                )
 
 
 @dataclass
@@ -53,13 +114,24 @@ class NoiseClassifierConfig:
             Defaults to `0.3`.
         batch_size (int, optional):
             Batch size during inference. Defaults to `1`.
-
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"` (ONNX Runtime on CPU).
+            Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to apply dynamic int8 quantization to the ONNX model.
+            Defaults to `False`.
     """
 
     model: str
     minimum_empty_duration: float = 1.0
     threshold: float = 0.3
     batch_size: int = 1
+    backend: str = "pytorch"
+    quantize: bool = False
+
+    def __post_init__(self):
+        if self.backend not in {"pytorch", "onnx"}:
+            raise ValueError(f"Backend {self.backend} is not yet supported!")
 
 
 @dataclass
@@ -78,6 +150,30 @@ class TranscriberConfig:
             `True` for Whisper-based models.
         chunk_length_s (int):
             Audio chunk length in seconds.
+        transcriber_device (str, optional):
+            Device used by the parakeet transcriber. Defaults to `"cuda"`.
+        batch_size (int, optional):
+            Batch size during inference. Utterances are batched in
+            duration-sorted order to minimize padding. Defaults to `1`.
+        pack_length_s (float, optional):
+            If non-zero, short audios are packed into single model inputs of up to
+            `pack_length_s` seconds. Only supported for wav2vec2. Defaults to `0`.
+        cache_dir (str, optional):
+            Path to a transcription cache directory. Model outputs and CTC emissions
+            are cached by audio content, model revision and inference parameters,
+            so that reruns only transcribe new audios. Defaults to `None`.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"` (ONNX Runtime on CPU).
+            The ONNX backend is only supported for wav2vec2. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to apply dynamic int8 quantization to the ONNX model.
+            Defaults to `False`.
+        num_replicas (int, optional):
+            Number of model replicas, each in its own worker process.
+            Defaults to `1`, i.e. inference in the main process.
+        num_threads (Optional[int], optional):
+            Number of intra-op threads per model replica.
+            Defaults to `None`, i.e. the PyTorch default.
     """
 
     type: str
@@ -85,6 +181,13 @@ class TranscriberConfig:
     return_timestamps: Union[str, bool]
     chunk_length_s: Optional[int] = None 
     transcriber_device: str = "cuda"
+    batch_size: int = 1
+    pack_length_s: float = 0
+    cache_dir: Optional[str] = None
+    backend: str = "pytorch"
+    quantize: bool = False
+    num_replicas: int = 1
+    num_threads: Optional[int] = None
 
     def __post_init__(self):
         SUPPORTED_MODELS = {"wav2vec2", "whisper", "parakeet"}
@@ -105,6 +208,22 @@ class TranscriberConfig:
         if self.type in {"wav2vec2", "whisper"} and self.chunk_length_s is None:
             raise ValueError(f"chunk_length_s is required for {self.type} models")
 
+        if self.pack_length_s and self.type != "wav2vec2":
+            raise ValueError("Packed inference is only supported for wav2vec2!")
+
+        if self.backend not in {"pytorch", "onnx"}:
+            raise ValueError(f"Backend {self.backend} is not yet supported!")
+        elif self.backend == "onnx" and self.type != "wav2vec2":
+            raise ValueError("ONNX backend is only supported for wav2vec2!")
+
+        if self.num_replicas < 1:
+            raise ValueError("`num_replicas` must be positive!")
+        elif self.num_replicas > 1 and self.type == "parakeet":
+            raise ValueError("parakeet does not support multiple replicas!")
+
+        if self.cache_dir and self.type == "parakeet":
+            raise ValueError("parakeet does not support transcription caching!")
+
 
 @dataclass
 class SegmenterConfig:
@@ -119,9 +238,32 @@ class SegmenterConfig:
             Minimum chunk duration (in seconds) to be exported.
             Defaults to 0.2 second.
         lexicon_path (str, optional):
-            Path to lexicon file. Defaults to `None`.
+            Path to a JSON lexicon file, merged into the `lexikos` lexicon, or to a
+            compiled lexicon (see `speechline lexicon compile`), loaded as is.
+            Defaults to `None`.
         keep_whitespace (bool, optional):
             Whether to keep whitespace in transcript. Defaults to `False`.
+        audio_format (str, optional):
+            Format of exported audio chunks, either `"wav"` or `"flac"`.
+            Defaults to `"wav"`.
+        sink (str, optional):
+            Output sink of chunks, one of `"directory"` (audio and TSV files),
+            `"tar"` (WebDataset-style tar shards), `"arrow"` (HuggingFace dataset
+            shards) or `"nemo"` (audio files and a JSON-lines NeMo manifest).
+            Defaults to `"directory"`.
+        max_shard_size_mb (float, optional):
+            Maximum size (in megabytes) of `"tar"` and `"arrow"` shards.
+            Defaults to `1024`.
+        alignment_engine (str, optional):
+            Word alignment engine of the `"word_overlap"` segmenter, either
+            `"difflib"` or `"levenshtein"` (faster on long recordings).
+            Defaults to `"difflib"`.
+        g2p_cache_size (int, optional):
+            Maximum number of out-of-lexicon word conversions of the
+            `"phoneme_overlap"` segmenter kept in memory. Defaults to `100000`.
+        g2p_cache_path (str, optional):
+            Path to a SQLite database persisting out-of-lexicon word conversions
+            across runs. Defaults to `None`.
     """
 
     type: str
@@ -130,13 +272,58 @@ class SegmenterConfig:
     lexicon_path: str = None
     keep_whitespace: bool = False
     segment_with_ground_truth: bool = False
+    audio_format: str = "wav"
+    sink: str = "directory"
+    max_shard_size_mb: float = 1024
+    alignment_engine: str = "difflib"
+    g2p_cache_size: int = 100000
+    g2p_cache_path: str = None
 
     def __post_init__(self):
         SUPPORTED_TYPES = {"silence", "word_overlap", "phoneme_overlap"}
+        SUPPORTED_AUDIO_FORMATS = {"wav", "flac"}
+        SUPPORTED_SINKS = {"directory", "tar", "arrow", "nemo"}
+        SUPPORTED_ALIGNMENT_ENGINES = {"difflib", "levenshtein"}
 
         if self.type not in SUPPORTED_TYPES:
             raise ValueError(f"Segmenter of type {self.type} is not yet supported!")
 
+        if self.audio_format not in SUPPORTED_AUDIO_FORMATS:
+            raise ValueError(f"Audio format {self.audio_format} is not supported!")
+
+        if self.sink not in SUPPORTED_SINKS:
+            raise ValueError(f"Segment sink {self.sink} is not supported!")
+
+        if self.alignment_engine not in SUPPORTED_ALIGNMENT_ENGINES:
+            raise ValueError(
+                f"Alignment engine {self.alignment_engine} is not supported!"
+            )
+
+
+@dataclass
+class StreamingConfig:
+    """
+    Streaming, stage-fused pipeline config.
+
+    Args:
+        queue_size (int, optional):
+            Maximum number of transcribed utterances waiting to be segmented.
+            Bounds the number of in-memory offsets. Defaults to `64`.
+        num_workers (int, optional):
+            Number of segmentation worker threads. Defaults to `4`.
+        export_offsets (bool, optional):
+            Whether to also persist each utterance's offsets as JSON
+            next to its audio file. Defaults to `False`.
+    """
+
+    queue_size: int = 64
+    num_workers: int = 4
+    export_offsets: bool = False
+
+    def __post_init__(self):
+        if self.queue_size < 1 or self.num_workers < 1:
+            raise ValueError("`queue_size` and `num_workers` must be positive!")
+
 
 @dataclass
 class Config:
@@ -146,6 +333,15 @@ class Config:
     Args:
         path (str):
             Path to JSON config file.
+
+    Optional top-level keys include `dataset_cache_dir`, the parent directory
+    under which per-run dataset scratch tables are written
+    (if unset, datasets are kept fully in memory),
+    `dataframe_index_path`, a persistent input directory index
+    that lets repeat runs skip unchanged transcripts,
+    `onnx_dir`, where models exported for the ONNX backend are saved and reused,
+    and `audio_store_size_mb`, the memory budget of decoded audios shared by all
+    stages (defaults to `1024`, `0` disables the store).
     """
 
     path: str
@@ -155,6 +351,11 @@ class Config:
         self.do_classify = config.get("do_classify", False)
         self.do_noise_classify = config.get("do_noise_classify", False)
         self.filter_empty_transcript = config.get("filter_empty_transcript", False)
+        self.do_stream = config.get("do_stream", False)
+        self.dataset_cache_dir = config.get("dataset_cache_dir", None)
+        self.dataframe_index_path = config.get("dataframe_index_path", None)
+        self.onnx_dir = config.get("onnx_dir", None)
+        self.audio_store_size_mb = config.get("audio_store_size_mb", 1024)
 
         if self.do_classify:
             self.classifier = ClassifierConfig(**config["classifier"])
@@ -162,5 +363,8 @@ class Config:
         if self.do_noise_classify:
             self.noise_classifier = NoiseClassifierConfig(**config["noise_classifier"])
 
+        if self.do_stream:
+            self.streaming = StreamingConfig(**config.get("streaming", {}))
+
         self.transcriber = TranscriberConfig(**config["transcriber"])
         self.segmenter = SegmenterConfig(**config["segmenter"])
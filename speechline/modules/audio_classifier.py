@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+import random
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Union
 
 import numpy as np
 import torch
@@ -21,6 +23,8 @@ from tqdm.auto import tqdm
 from transformers import pipeline
 
 from ..pipelines import AudioClassificationWithPaddingPipeline
+from ..utils.logger import Logger
+from ..utils.onnx import load_onnx_model
 from .audio_module import AudioModule
 
 
@@ -31,45 +35,291 @@ class AudioClassifier(AudioModule):
     Args:
         model_checkpoint (str):
             HuggingFace Hub model checkpoint.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. The ONNX backend runs
+            the model with ONNX Runtime on CPU. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str, **kwargs) -> None:
+    def __init__(
+        self,
+        model_checkpoint: str,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+        **kwargs,
+    ) -> None:
+        if backend == "onnx":
+            model = load_onnx_model(
+                model_checkpoint,
+                "audio-classification",
+                quantize=quantize,
+                export_dir=onnx_dir,
+            )
+            kwargs["feature_extractor"] = model_checkpoint
+            device = -1
+        else:
+            model = model_checkpoint
+            device = 0 if torch.cuda.is_available() else -1
+
         classifier = pipeline(
             "audio-classification",
-            model=model_checkpoint,
-            device=0 if torch.cuda.is_available() else -1,
+            model=model,
+            device=device,
             pipeline_class=AudioClassificationWithPaddingPipeline,
             **kwargs,
         )
         super().__init__(pipeline=classifier)
 
-    def inference(self, dataset: Dataset) -> List[str]:
+    def inference(
+        self,
+        dataset: Dataset,
+        stream: bool = False,
+        batch_size: int = 1,
+        return_scores: bool = False,
+    ) -> Union[List[str], Iterator[str], List[Dict[str, Union[str, float]]]]:
         """
         Inference function for audio classification.
 
         Args:
             dataset (Dataset):
                 Dataset to be inferred.
+            stream (bool, optional):
+                Whether to lazily yield predicted labels in dataset order
+                instead of collecting them into a list. Defaults to `False`.
+            batch_size (int, optional):
+                Batch size during inference. Audios are batched by similar length,
+                and padded to the longest audio of their batch. Defaults to `1`.
+            return_scores (bool, optional):
+                Whether to return the predicted labels along with their
+                probabilities, as dictionaries with `label` and `score` keys.
+                Defaults to `False`.
 
         Returns:
-            List[str]:
-                List of predicted labels.
+            Union[List[str], Iterator[str], List[Dict[str, Union[str, float]]]]:
+                List of predicted labels, or an iterator of labels if `stream`.
         """
 
         def _get_audio_array(
             dataset: Dataset,
         ) -> np.ndarray:
-            for item in dataset:
-                yield item["audio"]["array"]
-
-        results = []
+            for audio in self.iter_audios(dataset):
+                yield audio["array"]
 
-        for out in tqdm(
-            self.pipeline(_get_audio_array(dataset), top_k=1),
+        outputs = tqdm(
+            self.pipeline_sorted_by_length(
+                _get_audio_array(dataset),
+                length_fn=len,
+                batch_size=batch_size,
+                top_k=1,
+            ),
             total=len(dataset),
             desc="Classifying Audios",
-        ):
-            prediction = out[0]["label"]
-            results.append(prediction)
+            disable=not self.show_progress,
+        )
+        if return_scores:
+            predictions = (out[0] for out in outputs)
+        else:
+            predictions = (out[0]["label"] for out in outputs)
+
+        if stream:
+            return predictions
+
+        return list(predictions)
+
+    def inference_by_group(
+        self,
+        dataset: Dataset,
+        groups: Sequence[str],
+        sample_size: int = 4,
+        max_samples: int = 12,
+        threshold: float = 0.9,
+        batch_size: int = 1,
+        seed: int = 0,
+    ) -> List[str]:
+        """
+        Amortized audio classification of groups of audios sharing a label,
+        e.g. utterances of the same speaker.
+
+        Every group is classified in rounds of `sample_size` randomly sampled audios,
+        with the samples of all groups batched together. Once a group's sampled
+        predictions agree, with a mean probability of at least `threshold`, its
+        label is copied to the group's remaining audios. Groups whose samples
+        disagree, or remain unconfident after `max_samples` samples, fall back to
+        classifying each of their audios.
+
+        Args:
+            dataset (Dataset):
+                Dataset to be inferred.
+            groups (Sequence[str]):
+                Group (e.g. speaker ID) of every audio in `dataset`.
+            sample_size (int, optional):
+                Number of audios sampled per group and round. Defaults to `4`.
+            max_samples (int, optional):
+                Maximum number of audios sampled per group. Defaults to `12`.
+            threshold (float, optional):
+                Minimum mean probability of a group's agreeing samples
+                to accept its label. Defaults to `0.9`.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
+            seed (int, optional):
+                Random seed for sampling. Defaults to `0`.
+
+        Returns:
+            List[str]:
+                Predicted label of every audio in `dataset`.
+        """
+        if len(groups) != len(dataset):
+            raise ValueError("Every audio in `dataset` must have a group!")
+
+        rng = random.Random(seed)
+        members = defaultdict(list)
+        for idx, group in enumerate(groups):
+            members[group].append(idx)
+        for indices in members.values():
+            rng.shuffle(indices)
+
+        predictions: List[Optional[Dict[str, Union[str, float]]]] = [None] * len(
+            dataset
+        )
+        sampled = {group: 0 for group in members}
+        unresolved = set(members)
+        fallback = []
+
+        def _classify(indices: List[int]) -> None:
+            subset = self._select(dataset, indices)
+            outputs = self.inference(subset, batch_size=batch_size, return_scores=True)
+            for idx, output in zip(indices, outputs):
+                predictions[idx] = output
+
+        while unresolved:
+            # sample every unresolved group, and classify all samples together
+            _classify(
+                [
+                    idx
+                    for group in sorted(unresolved)
+                    for idx in members[group][
+                        sampled[group] : sampled[group] + sample_size
+                    ]
+                ]
+            )
+
+            for group in list(unresolved):
+                indices = members[group]
+                sampled[group] = min(sampled[group] + sample_size, len(indices))
+                samples = [predictions[idx] for idx in indices[: sampled[group]]]
+                labels = {sample["label"] for sample in samples}
+                score = np.mean([sample["score"] for sample in samples])
+
+                if len(labels) == 1 and score >= threshold:
+                    # confident, copy label to remaining audios
+                    label = labels.pop()
+                    for idx in indices[sampled[group] :]:
+                        predictions[idx] = {"label": label, "score": score}
+                    unresolved.remove(group)
+                elif sampled[group] == len(indices):
+                    unresolved.remove(group)
+                elif len(labels) > 1 or sampled[group] >= max_samples:
+                    fallback += indices[sampled[group] :]
+                    unresolved.remove(group)
+
+        if fallback:
+            _classify(sorted(fallback))
+
+        num_classified = sum(min(n, len(members[g])) for g, n in sampled.items())
+        num_classified += len(fallback)
+        Logger.get_logger().info(
+            f"Classified {num_classified} of {len(dataset)} audios "
+            f"from {len(members)} groups, "
+            f"{len(fallback)} of which in per-audio fallback."
+        )
+
+        return [prediction["label"] for prediction in predictions]
+
+    def inference_cascade(
+        self,
+        dataset: Dataset,
+        window_s: float,
+        threshold: float = 0.9,
+        second_stage: Optional["AudioClassifier"] = None,
+        batch_size: int = 1,
+    ) -> List[str]:
+        """
+        Cascaded audio classification with early exit.
+
+        Every audio is first classified on its leading `window_s` seconds only.
+        Predictions with a probability of at least `threshold` are accepted,
+        while ambiguous audios are classified again on their full (truncated)
+        audio, by `second_stage` if given, or by this classifier otherwise.
+        The acceptance rate of every stage is logged.
+
+        Args:
+            dataset (Dataset):
+                Dataset to be inferred.
+            window_s (float):
+                Duration of the leading window scored by the first stage, in seconds.
+            threshold (float, optional):
+                Minimum probability to accept a first-stage prediction.
+                Defaults to `0.9`.
+            second_stage (Optional[AudioClassifier], optional):
+                Classifier of ambiguous audios, e.g. a larger checkpoint. Must
+                expect the same sampling rate. Defaults to `None`.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
+
+        Returns:
+            List[str]:
+                Predicted label of every audio in `dataset`.
+        """
+        window_length = int(window_s * self.sampling_rate)
+
+        def _get_audio_window(dataset: Dataset) -> np.ndarray:
+            for audio in self.iter_audios(dataset):
+                yield audio["array"][:window_length]
+
+        outputs = tqdm(
+            self.pipeline_sorted_by_length(
+                _get_audio_window(dataset),
+                length_fn=len,
+                batch_size=batch_size,
+                top_k=1,
+            ),
+            total=len(dataset),
+            desc="Classifying Audio Windows",
+            disable=not self.show_progress,
+        )
+        predictions = [out[0] for out in outputs]
+
+        rejected = [
+            idx
+            for idx, prediction in enumerate(predictions)
+            if prediction["score"] < threshold
+        ]
+        if rejected:
+            stage = second_stage or self
+            outputs = stage.inference(
+                self._select(dataset, rejected),
+                batch_size=batch_size,
+                return_scores=True,
+            )
+            for idx, output in zip(rejected, outputs):
+                predictions[idx] = output
+
+        num_accepted = len(predictions) - len(rejected)
+        Logger.get_logger().info(
+            f"Cascade stage 1 ({window_s}s window) accepted "
+            f"{num_accepted} of {len(predictions)} audios "
+            f"({num_accepted / max(len(predictions), 1):.1%}), "
+            f"stage 2 classified {len(rejected)} audios."
+        )
+
+        return [prediction["label"] for prediction in predictions]
 
-        return results
+    @staticmethod
+    def _select(dataset: Dataset, indices: List[int]) -> Dataset:
+        if isinstance(dataset, Dataset):
+            return dataset.select(indices)
+        return [dataset[idx] for idx in indices]
@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from datasets import Dataset
 from transformers import Pipeline
 
 
@@ -24,8 +28,95 @@ class AudioModule:
     Args:
         pipeline (Pipeline):
             HuggingFace `transformers` `Pipeline` for inference.
+
+    Attributes:
+        show_progress (bool):
+            Whether inference functions display progress bars. Defaults to `True`.
     """
 
     def __init__(self, pipeline: Pipeline) -> None:
         self.pipeline = pipeline
         self.sampling_rate = self.pipeline.feature_extractor.sampling_rate
+        self.show_progress = True
+
+    @staticmethod
+    def iter_audios(
+        dataset: Iterable[Dict[str, Any]], batch_size: int = 32
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over the audios of `dataset`.
+
+        `datasets`' `Dataset`s are read `batch_size` rows at a time, such that
+        batched transforms (e.g. resampling in `format_audio_dataset`)
+        process many audios in one call.
+
+        Args:
+            dataset (Iterable[Dict[str, Any]]):
+                Dataset items with an `audio` key.
+            batch_size (int, optional):
+                Number of rows read at once from a `Dataset`. Defaults to `32`.
+
+        Yields:
+            Dict[str, Any]:
+                Audios with `array` and `sampling_rate` keys.
+        """
+        if isinstance(dataset, Dataset):
+            for batch in dataset.iter(batch_size=batch_size):
+                yield from batch["audio"]
+        else:
+            for item in dataset:
+                yield item["audio"]
+
+    def pipeline_sorted_by_length(
+        self,
+        inputs: Iterable[Any],
+        length_fn: Callable[[Any], int],
+        batch_size: int = 1,
+        window_size: Optional[int] = None,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """
+        Runs the pipeline over `inputs` in batches of similar lengths.
+
+        Inputs are read in windows of `window_size` items. Each window is sorted
+        by descending length so that every batch holds similarly-sized inputs,
+        minimizing padding, then outputs are restored to their input order.
+        Only one window is held in memory at a time.
+
+        Args:
+            inputs (Iterable[Any]):
+                Pipeline inputs.
+            length_fn (Callable[[Any], int]):
+                Function returning the length of an input.
+            batch_size (int, optional):
+                Pipeline batch size. Defaults to `1`, where inputs are passed
+                through unsorted.
+            window_size (Optional[int], optional):
+                Number of inputs sorted together.
+                Defaults to `None`, i.e. `16 * batch_size`.
+
+        Yields:
+            Any:
+                Pipeline outputs, in input order.
+        """
+        if batch_size <= 1:
+            yield from self.pipeline(inputs, **kwargs)
+            return
+
+        window_size = window_size or 16 * batch_size
+        iterator = iter(inputs)
+        while True:
+            window = list(islice(iterator, window_size))
+            if not window:
+                return
+
+            order = sorted(
+                range(len(window)), key=lambda i: length_fn(window[i]), reverse=True
+            )
+            outputs = [None] * len(window)
+            sorted_outputs = self.pipeline(
+                [window[i] for i in order], batch_size=batch_size, **kwargs
+            )
+            for i, output in zip(order, sorted_outputs):
+                outputs[i] = output
+            yield from outputs
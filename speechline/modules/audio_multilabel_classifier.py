@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 import torch
@@ -21,6 +21,7 @@ from tqdm.auto import tqdm
 from transformers import pipeline
 
 from ..pipelines import AudioMultiLabelClassificationPipeline
+from ..utils.onnx import load_onnx_model
 from .audio_module import AudioModule
 
 
@@ -31,22 +32,111 @@ class AudioMultiLabelClassifier(AudioModule):
     Args:
         model_checkpoint (str):
             HuggingFace Hub model checkpoint.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. The ONNX backend runs
+            the model with ONNX Runtime on CPU. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str, **kwargs) -> None:
+    def __init__(
+        self,
+        model_checkpoint: str,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+        **kwargs,
+    ) -> None:
+        if backend == "onnx":
+            model = load_onnx_model(
+                model_checkpoint,
+                "audio-classification",
+                quantize=quantize,
+                export_dir=onnx_dir,
+            )
+            device = -1
+        else:
+            model = model_checkpoint
+            device = 0 if torch.cuda.is_available() else -1
+
         classifier = pipeline(
             "audio-classification",
-            model=model_checkpoint,
+            model=model,
             feature_extractor=model_checkpoint,
-            device=0 if torch.cuda.is_available() else -1,
+            device=device,
             pipeline_class=AudioMultiLabelClassificationPipeline,
             **kwargs,
         )
         super().__init__(pipeline=classifier)
 
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Label of every class id, as an object array.
+        """
+        id2label = self.pipeline.model.config.id2label
+        return np.array([id2label[i] for i in range(len(id2label))], dtype=object)
+
+    def predict_proba(self, dataset: Dataset, batch_size: int = 1) -> np.ndarray:
+        """
+        Predicts the probability of every label, for every audio in `dataset`.
+
+        Args:
+            dataset (Dataset):
+                Dataset to be inferred.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
+
+        Returns:
+            np.ndarray:
+                Probability matrix of shape `(len(dataset), num_labels)`.
+        """
+
+        def _get_audio_array(
+            dataset: Dataset,
+        ) -> np.ndarray:
+            for audio in self.iter_audios(dataset):
+                yield audio["array"]
+
+        outputs = tqdm(
+            self.pipeline_sorted_by_length(
+                _get_audio_array(dataset), length_fn=len, batch_size=batch_size
+            ),
+            total=len(dataset),
+            desc="Classifying Audios",
+            disable=not self.show_progress,
+        )
+        probs = list(outputs)
+        if len(probs) == 0:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return np.stack(probs)
+
+    def top_labels(
+        self, probs: np.ndarray, threshold: float = 0.5
+    ) -> List[Optional[str]]:
+        """
+        Selects the most probable label of every row of `probs`.
+
+        Args:
+            probs (np.ndarray):
+                Probability matrix of shape `(N, num_labels)`.
+            threshold (float, optional):
+                Threshold probability for predicted labels. Defaults to `0.5`.
+
+        Returns:
+            List[Optional[str]]:
+                Most probable label of every row,
+                or `None` if no label reaches `threshold`.
+        """
+        ids = probs.argmax(axis=1)
+        is_valid = probs[np.arange(len(probs)), ids] >= threshold
+        return np.where(is_valid, self.labels[ids], None).tolist()
+
     def inference(
-        self, dataset: Dataset, threshold: float = 0.5
-    ) -> List[Dict[str, Union[str, float]]]:
+        self, dataset: Dataset, threshold: float = 0.5, batch_size: int = 1
+    ) -> List[List[Dict[str, Union[str, float]]]]:
         """
         Inference function for audio classification.
 
@@ -56,35 +146,27 @@ class AudioMultiLabelClassifier(AudioModule):
             threshold (float):
                 Threshold probability for predicted labels.
                 Anything above this threshold will be considered as a valid prediction.
+            batch_size (int, optional):
+                Batch size during inference. Defaults to `1`.
 
         Returns:
-            List[Dict[str, Union[str, float]]]:
-                List of predictions in the format of dictionaries,
+            List[List[Dict[str, Union[str, float]]]]:
+                Predictions of every audio, as lists of dictionaries
                 consisting of the predicted label and probability.
+                Audios without any label above `threshold` have no predictions.
         """
+        probs = self.predict_proba(dataset, batch_size=batch_size)
 
-        def _get_audio_array(
-            dataset: Dataset,
-        ) -> np.ndarray:
-            for item in dataset:
-                yield item["audio"]["array"]
-
-        results = []
+        rows, ids = np.nonzero(probs >= threshold)
+        labels = self.labels[ids].tolist()
+        scores = probs[rows, ids].tolist()
+        # rows are sorted, split predictions at every row boundary
+        bounds = np.searchsorted(rows, np.arange(len(probs) + 1)).tolist()
 
-        for out in tqdm(
-            self.pipeline(_get_audio_array(dataset), top_k=1),
-            total=len(dataset),
-            desc="Classifying Audios",
-        ):
-            ids = np.where(out >= threshold)[0].tolist()
-            if len(ids) > 0:
-                prediction = [
-                    {
-                        "label": self.pipeline.model.config.id2label[id],
-                        "score": out[id],
-                    }
-                    for id in ids
-                ]
-                results.append(prediction)
-
-        return results
+        return [
+            [
+                {"label": label, "score": score}
+                for label, score in zip(labels[start:end], scores[start:end])
+            ]
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
@@ -12,7 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, Generator, List, Tuple, Union
+import math
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Sized,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import torch
@@ -21,8 +34,13 @@ from tqdm.auto import tqdm
 from transformers import pipeline
 
 from ..pipelines import AutomaticSpeechRecognitionFilteredPipeline
+from ..utils.cache import TranscriptionCache
+from ..utils.onnx import load_onnx_model
 from .audio_module import AudioModule
 
+# output of `AutomaticSpeechRecognitionPipeline`, with optional timestamp chunks
+PipelineOutput = Dict[str, Union[str, List[Dict[str, Union[str, Tuple[float, float]]]]]]
+
 
 class AudioTranscriber(AudioModule):
     """
@@ -31,17 +49,49 @@ class AudioTranscriber(AudioModule):
     Args:
         model_checkpoint (str):
             HuggingFace Hub model hub checkpoint.
+        torch_dtype (torch.dtype, optional):
+            PyTorch model dtype. Defaults to `None`.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. The ONNX backend runs
+            CTC models with ONNX Runtime on CPU. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str, torch_dtype: torch.dtype = None) -> None:
+    def __init__(
+        self,
+        model_checkpoint: str,
+        torch_dtype: torch.dtype = None,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+    ) -> None:
+        if backend == "onnx":
+            model = load_onnx_model(
+                model_checkpoint, "ctc", quantize=quantize, export_dir=onnx_dir
+            )
+            kwargs = {
+                "tokenizer": model_checkpoint,
+                "feature_extractor": model_checkpoint,
+            }
+            device = -1
+        else:
+            model = model_checkpoint
+            kwargs = {"torch_dtype": torch_dtype}
+            device = 0 if torch.cuda.is_available() else -1
+
         asr = pipeline(
             "automatic-speech-recognition",
-            model=model_checkpoint,
-            device=0 if torch.cuda.is_available() else -1,
+            model=model,
+            device=device,
             pipeline_class=AutomaticSpeechRecognitionFilteredPipeline,
-            torch_dtype=torch_dtype,
+            **kwargs,
         )
         super().__init__(pipeline=asr)
+        self.backend = backend
+        self.quantize = quantize
 
     def inference(
         self,
@@ -51,8 +101,16 @@ class AudioTranscriber(AudioModule):
         offset_key: str = "text",
         return_timestamps: Union[str, bool] = True,
         keep_whitespace: bool = False,
+        stream: bool = False,
+        batch_size: int = 1,
+        pack_length_s: float = 0,
+        cache_dir: str = None,
         **kwargs,
-    ) -> Union[List[List[Dict[str, Union[str, float]]]], List[str]]:
+    ) -> Union[
+        List[List[Dict[str, Union[str, float]]]],
+        List[str],
+        Iterator[Union[List[Dict[str, Union[str, float]]], str]],
+    ]:
         """
         Inference/prediction function to be mapped to a dataset.
 
@@ -72,10 +130,27 @@ class AudioTranscriber(AudioModule):
                 Defaults to `True`.
             keep_whitespace (bool, optional):
                 Whether to presere whitespace predictions. Defaults to `False`.
+            stream (bool, optional):
+                Whether to lazily yield predictions in dataset order instead of
+                collecting them into a list. `dataset` may then be any iterable
+                of items with an `audio` key. Defaults to `False`.
+            batch_size (int, optional):
+                Inference batch size. If greater than `1`, utterances are batched
+                in duration-sorted windows to minimize padding, and audio chunks
+                of long files are batched across utterances.
+                Predictions are still returned in dataset order. Defaults to `1`.
+            pack_length_s (float, optional):
+                If non-zero, short audios are packed into model inputs of up to
+                `pack_length_s` seconds, see `pipeline_packed`. Only supported for
+                CTC models. Defaults to `0`.
+            cache_dir (str, optional):
+                Path to a `TranscriptionCache` directory. If given, outputs of
+                previously transcribed audios (and CTC emissions) are read from disk
+                instead of running the model again. Defaults to `None`.
 
         Returns:
-            Union[List[List[Dict[str, Union[str, float]]]], List[str]]:
-                List of predictions.
+            Union[List[List[Dict[str, Union[str, float]]]], List[str], Iterator[Union[List[Dict[str, Union[str, float]]], str]]]:  # noqa: E501
+                List of predictions, or an iterator of predictions if `stream`.
         """
 
         def _format_timestamps_to_offsets(
@@ -143,32 +218,298 @@ class AudioTranscriber(AudioModule):
             return " ".join([o["text"].strip() for o in timestamps["chunks"] if o["text"] != " "])
 
         def _get_audio_array(
-            dataset: Dataset,
+            dataset: Iterable[Dict],
         ) -> Generator[Dict[str, Union[np.ndarray, int, str]], None, None]:
-                for item in dataset:
-                    yield {**item["audio"]}
+            for audio in self.iter_audios(dataset):
+                yield {**audio}
 
-        results = []
-        
-        for out in tqdm(
-            self.pipeline(
-                _get_audio_array(dataset),
-                chunk_length_s=chunk_length_s,
-                return_timestamps=return_timestamps,
-                **kwargs,
-            ),
-            total=len(dataset),
-            desc="Transcribing Audios",
-        ):
-            prediction = (
-                _format_timestamps_to_offsets(
+        def _format_prediction(
+            out: PipelineOutput,
+        ) -> Union[List[Dict[str, Union[str, float]]], str]:
+            if output_offsets:
+                return _format_timestamps_to_offsets(
                     out,
                     offset_key=offset_key,
                     keep_whitespace=keep_whitespace,
                 )
-                if output_offsets
-                else _format_timestamps_to_transcript(out)
+            return _format_timestamps_to_transcript(out)
+
+        def _run_pipeline(
+            audios: Iterable[Dict[str, Union[np.ndarray, int, str]]], **pipeline_kwargs
+        ) -> Iterator[Dict[str, Any]]:
+            if pack_length_s:
+                return self.pipeline_packed(
+                    audios,
+                    pack_length_s=pack_length_s,
+                    chunk_length_s=chunk_length_s,
+                    return_timestamps=return_timestamps,
+                    **pipeline_kwargs,
+                    **kwargs,
+                )
+            return self.pipeline_sorted_by_length(
+                audios,
+                length_fn=lambda audio: len(audio["array"]),
+                batch_size=batch_size,
+                chunk_length_s=chunk_length_s,
+                return_timestamps=return_timestamps,
+                **pipeline_kwargs,
+                **kwargs,
+            )
+
+        if cache_dir:
+            outputs = self.pipeline_cached(
+                _get_audio_array(dataset),
+                pipeline_fn=_run_pipeline,
+                cache_dir=cache_dir,
+                params={
+                    # backend and precision of the model change its emissions
+                    "backend": self.backend,
+                    "quantize": self.quantize,
+                    "dtype": str(getattr(self.pipeline.model, "dtype", None)),
+                    "chunk_length_s": chunk_length_s,
+                    "pack_length_s": pack_length_s,
+                    "batch_size": batch_size,
+                    **kwargs,
+                },
+                return_timestamps=return_timestamps,
             )
-            results.append(prediction)    
+        else:
+            outputs = _run_pipeline(_get_audio_array(dataset))
+
+        outputs = tqdm(
+            outputs,
+            total=len(dataset) if isinstance(dataset, Sized) else None,
+            desc="Transcribing Audios",
+            disable=not self.show_progress,
+        )
+        predictions = (_format_prediction(out) for out in outputs)
+
+        if stream:
+            return predictions
+
+        return list(predictions)
+
+    def pipeline_packed(
+        self,
+        inputs: Iterable[Dict[str, Any]],
+        pack_length_s: float,
+        chunk_length_s: int = 0,
+        separator_s: float = 0.1,
+        return_timestamps: Union[str, bool] = True,
+        return_emissions: bool = False,
+        **kwargs,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Runs a CTC pipeline over short audios packed into a single model input.
+
+        Consecutive audios are preprocessed (resampled and normalized) individually,
+        padded to a multiple of the model's `inputs_to_logits_ratio`, separated by
+        `separator_s` seconds of silence, and concatenated into one input of at most
+        `pack_length_s` seconds. After a single forward pass, the predicted CTC frames
+        are split back per audio, so that timestamps are relative to each audio.
+        Audios longer than `pack_length_s` are passed through the pipeline as usual.
+
+        Args:
+            inputs (Iterable[Dict[str, Any]]):
+                Audio inputs with `array` and `sampling_rate` keys.
+            pack_length_s (float):
+                Maximum length of a packed input, in seconds.
+            chunk_length_s (int, optional):
+                Audio chunk length of audios that are not packed. Defaults to `0`.
+            separator_s (float, optional):
+                Silence in between packed audios, in seconds. Defaults to `0.1`.
+            return_timestamps (Union[str, bool], optional):
+                `return_timestamps` argument of the pipeline. Defaults to `True`.
+            return_emissions (bool, optional):
+                Whether to include the frame-level log-probabilities of each audio
+                in its output, under the `emissions` key. Defaults to `False`.
+
+        Raises:
+            ValueError: Pipeline is not a CTC pipeline.
+
+        Yields:
+            Dict[str, Any]:
+                Pipeline outputs, in input order.
+        """
+        if self.pipeline.type != "ctc":
+            raise ValueError("Packed inference is only supported for CTC models!")
+
+        model = self.pipeline.model
+        ratio = model.config.inputs_to_logits_ratio
+        max_length = int(pack_length_s * self.sampling_rate)
+        separator = math.ceil(separator_s * self.sampling_rate / ratio) * ratio
+
+        def _num_frames(length: int) -> int:
+            # output length of the convolutional feature encoder
+            config = model.config
+            for kernel, stride in zip(config.conv_kernel, config.conv_stride):
+                length = (length - kernel) // stride + 1
+            return length
+
+        def _padded_length(values: torch.Tensor) -> int:
+            return math.ceil(len(values) / ratio) * ratio + separator
+
+        def _forward_pack(pack: List[torch.Tensor]) -> Iterator[Dict[str, Any]]:
+            lengths = [_padded_length(values) for values in pack]
+            input_values = torch.cat(
+                [
+                    torch.nn.functional.pad(values, (0, length - len(values)))
+                    for values, length in zip(pack, lengths)
+                ]
+            )
+            with self.pipeline.get_inference_context()():
+                logits = model(input_values[None].to(self.pipeline.device)).logits
+            tokens = logits.argmax(dim=-1).cpu()
+            if return_emissions:
+                emissions = logits.float().log_softmax(dim=-1).cpu().numpy()
+
+            start = 0
+            for values, length in zip(pack, lengths):
+                num_frames = _num_frames(len(values))
+                # offsets are multiples of `ratio`, so frames of each audio align
+                frame = start // ratio
+                clip_tokens = tokens[:, frame : frame + max(num_frames, 0)]
+                output = self.pipeline.postprocess(
+                    [{"is_last": True, "tokens": clip_tokens}],
+                    return_timestamps=return_timestamps,
+                )
+                if return_emissions:
+                    num_frames = clip_tokens.shape[1]
+                    output["emissions"] = emissions[0, frame : frame + num_frames]
+                yield output
+                start += length
+
+        pack, pack_length = [], 0
+        for audio in inputs:
+            length = len(audio["array"]) * self.sampling_rate / audio["sampling_rate"]
+            if length + separator > max_length:
+                if pack:
+                    yield from _forward_pack(pack)
+                pack, pack_length = [], 0
+                if return_emissions:
+                    kwargs["return_emissions"] = True
+                yield self.pipeline(
+                    audio,
+                    chunk_length_s=chunk_length_s,
+                    return_timestamps=return_timestamps,
+                    **kwargs,
+                )
+                continue
+
+            processed = next(self.pipeline.preprocess({**audio}))
+            values = processed[model.main_input_name][0]
+            padded_length = _padded_length(values)
+            if pack and pack_length + padded_length > max_length:
+                yield from _forward_pack(pack)
+                pack, pack_length = [], 0
+
+            pack.append(values)
+            pack_length += padded_length
+
+        if pack:
+            yield from _forward_pack(pack)
+
+    def decode_emissions(
+        self, emissions: np.ndarray, return_timestamps: Union[str, bool] = True
+    ) -> Dict[str, Any]:
+        """
+        Greedily decodes CTC emissions into a pipeline output.
+
+        Args:
+            emissions (np.ndarray):
+                Emissions of shape `(frames, vocab_size)`.
+            return_timestamps (Union[str, bool], optional):
+                `return_timestamps` argument of the pipeline. Defaults to `True`.
+
+        Returns:
+            Dict[str, Any]:
+                Pipeline output, as if the audio was passed through the pipeline.
+        """
+        tokens = torch.from_numpy(emissions.argmax(axis=-1))[None]
+        return self.pipeline.postprocess(
+            [{"is_last": True, "tokens": tokens}], return_timestamps=return_timestamps
+        )
+
+    def pipeline_cached(
+        self,
+        inputs: Iterable[Dict[str, Any]],
+        pipeline_fn: Callable[..., Iterator[Dict[str, Any]]],
+        cache_dir: str,
+        params: Dict[str, Any],
+        return_timestamps: Union[str, bool] = True,
+        window_size: int = 64,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Runs `pipeline_fn` over inputs, reading and writing a `TranscriptionCache`.
+
+        Inputs are read in windows of `window_size` audios. For each audio, a cached
+        output is looked up first. Otherwise for CTC models, cached emissions are
+        decoded with `decode_emissions`, e.g. when only `return_timestamps` changed.
+        Only the remaining audios are passed to `pipeline_fn`, whose outputs and
+        emissions are then cached.
+
+        Args:
+            inputs (Iterable[Dict[str, Any]]):
+                Audio inputs with `array` and `sampling_rate` keys.
+            pipeline_fn (Callable[..., Iterator[Dict[str, Any]]]):
+                Function running the pipeline over a list of audios, in order.
+                Receives `return_emissions=True` as keyword argument for CTC models.
+            cache_dir (str):
+                Path to cache directory.
+            params (Dict[str, Any]):
+                Inference parameters affecting the emissions, part of the cache key.
+            return_timestamps (Union[str, bool], optional):
+                `return_timestamps` argument of the pipeline. Defaults to `True`.
+            window_size (int, optional):
+                Number of audios looked up at once. Defaults to `64`.
+
+        Yields:
+            Dict[str, Any]:
+                Pipeline outputs, in input order.
+        """
+        config = self.pipeline.model.config
+        model_id = TranscriptionCache.make_model_id(
+            config._name_or_path, getattr(config, "_commit_hash", None)
+        )
+        cache = TranscriptionCache(cache_dir, model_id)
+        is_ctc = self.pipeline.type == "ctc"
+        pipeline_kwargs = {"return_emissions": True} if is_ctc else {}
+
+        iterator = iter(inputs)
+        while True:
+            window = list(islice(iterator, window_size))
+            if not window:
+                return
+
+            outputs, keys, misses = [None] * len(window), [], []
+            for idx, audio in enumerate(window):
+                audio_hash = cache.hash_audio(audio)
+                emissions_key = cache.key(audio_hash, params)
+                output_key = cache.key(
+                    audio_hash, {**params, "return_timestamps": return_timestamps}
+                )
+                keys.append((emissions_key, output_key))
+
+                outputs[idx] = cache.load_output(output_key)
+                if outputs[idx] is None and is_ctc:
+                    emissions = cache.load_emissions(emissions_key)
+                    if emissions is not None:
+                        outputs[idx] = self.decode_emissions(
+                            emissions, return_timestamps
+                        )
+                        cache.save_output(output_key, outputs[idx])
+                if outputs[idx] is None:
+                    misses.append(idx)
+
+            if misses:
+                audios = [window[i] for i in misses]
+                predictions = pipeline_fn(audios, **pipeline_kwargs)
+                for idx, output in zip(misses, predictions):
+                    emissions_key, output_key = keys[idx]
+                    emissions = output.pop("emissions", None)
+                    if emissions is not None:
+                        cache.save_emissions(emissions_key, emissions)
+                    cache.save_output(output_key, output)
+                    outputs[idx] = output
 
-        return results
+            yield from outputs
@@ -0,0 +1,168 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import weakref
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sized,
+    Union,
+)
+
+import torch
+from tqdm.auto import tqdm
+
+from .audio_module import AudioModule
+
+# model replica of the current worker process
+_replica: Optional[AudioModule] = None
+
+
+def _init_replica(
+    factory: Callable[[], AudioModule], num_threads: Optional[int]
+) -> None:
+    global _replica
+    if num_threads:
+        torch.set_num_threads(num_threads)
+        torch.set_num_interop_threads(1)
+    _replica = factory()
+    _replica.show_progress = False
+
+
+def _predict(
+    items: List[Dict[str, Any]], predict_kwargs: Dict[str, Any]
+) -> List[Any]:
+    return _replica.predict(items, **predict_kwargs)
+
+
+class ReplicaPool:
+    """
+    Pool of model replicas, each running in its own worker process with a fixed
+    number of intra-op threads.
+
+    Utterances are dispatched in chunks of `chunk_size` to whichever replica is
+    idle, and predictions are merged back in dataset order. Exposes the same
+    `predict` interface as the replicated module.
+
+    Args:
+        factory (Callable[[], AudioModule]):
+            Picklable function creating a replica, e.g.
+            `functools.partial(Wav2Vec2Transcriber, model_checkpoint)`.
+        sampling_rate (int):
+            Sampling rate expected by the replicas.
+        num_replicas (int, optional):
+            Number of replicas (worker processes). Defaults to `2`.
+        num_threads (Optional[int], optional):
+            Number of intra-op threads per replica.
+            Defaults to `None`, i.e. the PyTorch default.
+        chunk_size (int, optional):
+            Number of utterances dispatched to a replica at once. Defaults to `16`.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], AudioModule],
+        sampling_rate: int,
+        num_replicas: int = 2,
+        num_threads: Optional[int] = None,
+        chunk_size: int = 16,
+    ) -> None:
+        self.sampling_rate = sampling_rate
+        self.num_replicas = num_replicas
+        self.chunk_size = chunk_size
+        # spawn fresh interpreters, forking a process with initialized
+        # PyTorch thread pools is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_replicas,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_replica,
+            initargs=(factory, num_threads),
+        )
+        self._finalizer = weakref.finalize(self, self.executor.shutdown)
+
+    def predict(
+        self, dataset: Iterable[Dict[str, Any]], stream: bool = False, **kwargs
+    ) -> Union[List[Any], Iterator[Any]]:
+        """
+        Performs inference on `dataset` across all replicas.
+
+        Args:
+            dataset (Iterable[Dict[str, Any]]):
+                Dataset items with an `audio` key.
+            stream (bool, optional):
+                Whether to lazily yield predictions in dataset order.
+                Defaults to `False`.
+            **kwargs:
+                Keyword arguments passed to the replicas' `predict`.
+
+        Returns:
+            Union[List[Any], Iterator[Any]]:
+                Predictions in dataset order, as returned by the replicas' `predict`.
+        """
+        predictions = tqdm(
+            self._dispatch(dataset, kwargs),
+            total=len(dataset) if isinstance(dataset, Sized) else None,
+            desc=f"Predicting with {self.num_replicas} Replicas",
+        )
+
+        if stream:
+            return predictions
+
+        return list(predictions)
+
+    def _dispatch(
+        self, dataset: Iterable[Dict[str, Any]], predict_kwargs: Dict[str, Any]
+    ) -> Iterator[Any]:
+        iterator = iter(dataset)
+        pending: Deque[Future] = deque()
+        # keep every replica busy, while bounding the number of queued audios
+        max_pending = 2 * self.num_replicas
+
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                items = islice(iterator, self.chunk_size)
+                chunk = [{"audio": item["audio"]} for item in items]
+                if chunk:
+                    future = self.executor.submit(_predict, chunk, predict_kwargs)
+                    pending.append(future)
+                else:
+                    exhausted = True
+
+            if not pending:
+                return
+
+            yield from pending.popleft().result()
+
+    def close(self) -> None:
+        """
+        Shuts down all replicas.
+        """
+        self._finalizer()
+
+    def __enter__(self) -> "ReplicaPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -19,6 +19,8 @@ from tqdm import tqdm  # Add this import at the top with other imports
 sys.path.append("../")
 from speechline.transcribers import Wav2Vec2Transcriber
 from speechline.segmenters import PhonemeOverlapSegmenter
+from speechline.utils.cache import G2PCache
+from speechline.utils.lexicon import CompiledLexicon
 from speechline.utils.tokenizer import WordTokenizer
 
 COSMOS_DB_KEY = os.getenv('COSMOS_DB_KEY')
@@ -45,17 +47,23 @@ class Cosmos:
         return lexicon
 
 class Lexicon(PhonemeOverlapSegmenter):
-    def __init__(self, language, cosmos_client):
+    def __init__(
+        self, language, cosmos_client, g2p_cache=None, compiled_lexicon_path=None
+    ):
         self.language = language
-        self.cosmos_lexicon = cosmos_client.get_lexicon(language)
         self._init_g2p(language)   
         
+        # A compiled lexicon already holds the merged, normalized lexicons
+        if compiled_lexicon_path:
+            self.cosmos_lexicon = CompiledLexicon(compiled_lexicon_path)
+        else:
+            self.cosmos_lexicon = cosmos_client.get_lexicon(language)
         # If language is english, use Lexicos
-        if language == "en":
+        if language == "en" and not compiled_lexicon_path:
             lexicos_lexicon = Lexicos()
             for k, v in lexicos_lexicon.items():
                 self.cosmos_lexicon[k] = self.cosmos_lexicon[k].union(set(v)) if k in self.cosmos_lexicon else set(v)
-        super().__init__(self.cosmos_lexicon)
+        super().__init__(self.cosmos_lexicon, language=language, g2p_cache=g2p_cache)
         
     def gruut_g2p(self, text: str) -> List[str]:
         phonemes = []
@@ -85,28 +93,6 @@ class Lexicon(PhonemeOverlapSegmenter):
         text = text.lower().strip()
         return text  
     
-    def _generate_combinations(self, ground_truth: List[str]) -> List[List[str]]:
-        """
-        Generate all possible phoneme combinations for a given word.
-
-        Args:
-            ground_truth (List[str]):
-                List of words.
-
-        Returns:
-            List[List[str]]:
-                List of phoneme combinations.
-        """
-        combinations = []
-        for word in ground_truth:
-            normalized_word = self._normalize_text(word)
-            if normalized_word in self.lexicon:
-                phonemes = self.lexicon[normalized_word]
-            else:
-                phonemes = self.g2p(normalized_word)
-            combinations.append(phonemes)
-        return combinations
-
 def check_phoneme_match(phoneme_transcript, ground_truth):
     """
     Check if each phoneme in transcript exists in corresponding ground truth set
@@ -147,6 +133,11 @@ def parse_args():
                       help='Name for the output HuggingFace dataset')
     parser.add_argument('--log_dir', type=str, default='logs',
                       help='Directory for storing log files')
+    parser.add_argument('--g2p_cache_path', type=str, default=None,
+                      help='Path to a SQLite database persisting G2P conversions')
+    parser.add_argument('--compiled_lexicon_path', type=str, default=None,
+                      help='Path to a compiled lexicon, '
+                           'used instead of CosmosDB and Lexicos')
     return parser.parse_args()
 
 def setup_logging(log_dir):
@@ -233,8 +224,13 @@ def main():
     try:
         # Initialize components
         transcriber = Wav2Vec2Transcriber(args.model_path, None)
-        cosmos_client = Cosmos(COSMOS_URL, COSMOS_DB_KEY, "Bookbot")
-        lexicon = Lexicon(args.language, cosmos_client)
+        cosmos_client = None
+        if not args.compiled_lexicon_path:
+            cosmos_client = Cosmos(COSMOS_URL, COSMOS_DB_KEY, "Bookbot")
+        g2p_cache = G2PCache(cache_path=args.g2p_cache_path)
+        lexicon = Lexicon(
+            args.language, cosmos_client, g2p_cache, args.compiled_lexicon_path
+        )
         tokenizer = WordTokenizer()
         
         # Load dataset
@@ -260,6 +256,10 @@ def main():
         )
         
         logger.info(f"Successfully filtered {len(filtered_dataset)} samples from {len(dataset)} samples")
+        logger.info(
+            f"G2P cache: {g2p_cache.num_hits} hits, "
+            f"{g2p_cache.num_misses} misses"
+        )
         
         # Save locally first
         output_dir = "../bookbot_en_training_filtered_hf_dataset"
@@ -21,20 +21,29 @@ from transformers import AudioClassificationPipeline
 class AudioClassificationWithPaddingPipeline(AudioClassificationPipeline):
     """
     Subclass of `AudioClassificationPipeline`.
-    Pads/truncates audio array to maximum length before performing audio classification.
+    Truncates audio arrays to a maximum length before performing audio classification.
+    When run with `batch_size > 1`, every batch is dynamically padded to its
+    longest (truncated) audio array.
     """
 
     def __init__(self, *args, **kwargs):
         self.max_duration_s = kwargs.get("max_duration_s")
         super().__init__(*args, **kwargs)
 
+    @property
+    def max_length(self) -> int:
+        """
+        Maximum audio array length, i.e. `int(sampling_rate * max_duration_s)`.
+        """
+        return int(self.feature_extractor.sampling_rate * self.max_duration_s)
+
     def preprocess(self, inputs: np.ndarray) -> torch.Tensor:
         """
         Pre-process `inputs` to a maximum length used during model's training.
         Let `max_length = int(sampling_rate * max_duration_s)`.
-        Audio arrays shorter than `max_length` will be padded to `max_length`,
-        while arrays longer than `max_length` will be truncated to `max_length`.
-
+        Arrays longer than `max_length` will be truncated to `max_length`.
+        Shorter arrays are left as is, and only padded to the longest array of their
+        batch during batch collation, capping padding at `max_length`.
 
         Args:
             inputs (np.ndarray):
@@ -45,10 +54,8 @@ class AudioClassificationWithPaddingPipeline(AudioClassificationPipeline):
                 Pre-processed audio array as PyTorch tensors.
         """
         processed = self.feature_extractor(
-            inputs,
+            inputs[: self.max_length],
             sampling_rate=self.feature_extractor.sampling_rate,
             return_tensors="pt",
-            max_length=int(self.feature_extractor.sampling_rate * self.max_duration_s),
-            truncation=True,
         )
         return processed
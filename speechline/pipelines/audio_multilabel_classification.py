@@ -52,9 +52,6 @@ class AudioMultiLabelClassificationPipeline(AudioClassificationPipeline):
 
         Returns:
             np.ndarray:
-                List of probabilities.
+                Probability of every label, of shape `(num_labels,)`.
         """
-        probs = model_outputs.logits[0]
-        sigmoid = torch.nn.Sigmoid()
-        scores = sigmoid(probs).cpu().numpy()
-        return scores
+        return torch.sigmoid(model_outputs.logits[0].float()).cpu().numpy()
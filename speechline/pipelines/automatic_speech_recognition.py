@@ -14,16 +14,32 @@
 
 import numpy as np
 import requests
-import torch
-from transformers import AutomaticSpeechRecognitionPipeline
+from collections import defaultdict
+
+from transformers import AutomaticSpeechRecognitionPipeline, Wav2Vec2CTCTokenizer
 from transformers.pipelines.audio_utils import ffmpeg_read
-from transformers.pipelines.automatic_speech_recognition import chunk_iter
+from transformers.pipelines.automatic_speech_recognition import (
+    chunk_iter,
+    rescale_stride,
+)
 from transformers.utils import logging, is_torchaudio_available
 
+from ..utils.ctc import CTCDecoder
+
 logger = logging.get_logger(__name__)
 
 
 class AutomaticSpeechRecognitionFilteredPipeline(AutomaticSpeechRecognitionPipeline):
+    def _sanitize_parameters(self, return_emissions=None, **kwargs):
+        params = super()._sanitize_parameters(**kwargs)
+        preprocess_params, forward_params, postprocess_params = params
+        if return_emissions is not None:
+            if return_emissions and self.type != "ctc":
+                raise ValueError("Only CTC models can return emissions.")
+            forward_params["return_emissions"] = return_emissions
+            postprocess_params["return_emissions"] = return_emissions
+        return preprocess_params, forward_params, postprocess_params
+
     def preprocess(self, inputs, chunk_length_s=0, stride_length_s=None, ignore_warning=False):
         if isinstance(inputs, str):
             if inputs.startswith("http://") or inputs.startswith("https://"):
@@ -60,16 +76,17 @@ class AutomaticSpeechRecognitionFilteredPipeline(AutomaticSpeechRecognitionPipel
             inputs = _inputs
             if in_sampling_rate != self.feature_extractor.sampling_rate:
                 if is_torchaudio_available():
-                    from torchaudio import functional as F
+                    from ..utils.resample import resample
                 else:
                     raise ImportError(
                         "torchaudio is required to resample audio samples in AutomaticSpeechRecognitionPipeline. "
                         "The torchaudio package can be installed through: `pip install torchaudio`."
                     )
 
-                inputs = F.resample(
-                    torch.from_numpy(inputs), in_sampling_rate, self.feature_extractor.sampling_rate
-                ).numpy()
+                # resampling kernels are cached per pair of sampling rates
+                inputs = resample(
+                    inputs, in_sampling_rate, self.feature_extractor.sampling_rate
+                )
                 ratio = self.feature_extractor.sampling_rate / in_sampling_rate
             else:
                 ratio = 1
@@ -106,10 +123,28 @@ class AutomaticSpeechRecognitionFilteredPipeline(AutomaticSpeechRecognitionPipel
             if chunk_len < stride_left + stride_right:
                 raise ValueError("Chunk length must be superior to stride length")
 
-            for item in chunk_iter(
-                inputs, self.feature_extractor, chunk_len, stride_left, stride_right, self.torch_dtype
-            ):
-                yield item
+            # inputs that fit in a single chunk skip `chunk_iter`, but keep its
+            # output keys so that they can still be batched together with chunks
+            # of longer inputs
+            if inputs.shape[0] < chunk_len:
+                processed = self.feature_extractor(
+                    inputs,
+                    sampling_rate=self.feature_extractor.sampling_rate,
+                    return_tensors="pt",
+                )
+                if self.torch_dtype is not None:
+                    processed = processed.to(dtype=self.torch_dtype)
+                yield {"is_last": True, "stride": (inputs.shape[0], 0, 0), **processed}
+            else:
+                for item in chunk_iter(
+                    inputs,
+                    self.feature_extractor,
+                    chunk_len,
+                    stride_left,
+                    stride_right,
+                    self.torch_dtype,
+                ):
+                    yield item
         else:
             if self.type == "seq2seq_whisper" and inputs.shape[0] > self.feature_extractor.n_samples:
                 processed = self.feature_extractor(
@@ -134,3 +169,105 @@ class AutomaticSpeechRecognitionFilteredPipeline(AutomaticSpeechRecognitionPipel
 
                 processed["stride"] = stride
             yield {"is_last": True, **processed, **extra}
+
+    def _forward(
+        self,
+        model_inputs,
+        return_timestamps=False,
+        return_emissions=False,
+        **generate_kwargs,
+    ):
+        if not return_emissions:
+            return super()._forward(
+                model_inputs, return_timestamps=return_timestamps, **generate_kwargs
+            )
+
+        # same as the CTC branch of `AutomaticSpeechRecognitionPipeline._forward`,
+        # additionally keeping the frame-level log-probabilities
+        attention_mask = model_inputs.pop("attention_mask", None)
+        stride = model_inputs.pop("stride", None)
+        is_last = model_inputs.pop("is_last")
+
+        inputs = {
+            self.model.main_input_name: model_inputs.pop(self.model.main_input_name),
+            "attention_mask": attention_mask,
+        }
+        logits = self.model(**inputs).logits
+        out = {
+            "tokens": logits.argmax(dim=-1),
+            "emissions": logits.float().log_softmax(dim=-1),
+        }
+        if stride is not None:
+            ratio = 1 / self.model.config.inputs_to_logits_ratio
+            if isinstance(stride, tuple):
+                out["stride"] = rescale_stride([stride], ratio)[0]
+            else:
+                out["stride"] = rescale_stride(stride, ratio)
+        return {"is_last": is_last, **out, **model_inputs}
+
+    def postprocess(self, model_outputs, return_emissions=False, **kwargs):
+        emissions = []
+        if return_emissions:
+            for outputs in model_outputs:
+                items = outputs.pop("emissions").numpy()
+                stride = outputs.get("stride", None)
+                if stride is not None:
+                    total_n, left, right = stride
+                    items = items[:, left : total_n - right]
+                emissions.append(items)
+
+        if self.type == "ctc" and isinstance(self.tokenizer, Wav2Vec2CTCTokenizer):
+            output = self._postprocess_ctc(
+                model_outputs, return_timestamps=kwargs.get("return_timestamps")
+            )
+        else:
+            output = super().postprocess(model_outputs, **kwargs)
+
+        if return_emissions:
+            output["emissions"] = np.concatenate(emissions, axis=1).squeeze(0)
+        return output
+
+    def _postprocess_ctc(self, model_outputs, return_timestamps=None):
+        """
+        Fast path of `postprocess` for greedy CTC decoding with `CTCDecoder`,
+        skipping the tokenizer's per-character offsets decoding.
+        """
+        if getattr(self, "_ctc_decoder", None) is None:
+            self._ctc_decoder = CTCDecoder.from_tokenizer(
+                self.tokenizer, self.model.config.vocab_size
+            )
+
+        final_items = []
+        for outputs in model_outputs:
+            items = outputs["tokens"].numpy()
+            stride = outputs.get("stride", None)
+            if stride is not None:
+                total_n, left, right = stride
+                items = items[:, left : total_n - right]
+            final_items.append(items)
+        items = np.concatenate(final_items, axis=1).squeeze(0)
+
+        text = self._ctc_decoder.decode(items)
+
+        optional = {}
+        if return_timestamps:
+            if return_timestamps == "word":
+                texts, starts, ends = self._ctc_decoder.word_offsets(items)
+            else:
+                texts, starts, ends = self._ctc_decoder.char_offsets(items)
+
+            ratio = self.model.config.inputs_to_logits_ratio
+            starts = (starts * ratio / self.feature_extractor.sampling_rate).tolist()
+            ends = (ends * ratio / self.feature_extractor.sampling_rate).tolist()
+            optional["chunks"] = [
+                {"text": chunk, "timestamp": (start, end)}
+                for chunk, start, end in zip(texts, starts, ends)
+            ]
+
+        extra = defaultdict(list)
+        for output in model_outputs:
+            for key in ("tokens", "logits", "is_last", "stride", "token_timestamps"):
+                output.pop(key, None)
+            for k, v in output.items():
+                extra[k].append(v)
+        return {"text": text, **optional, **extra}
@@ -17,34 +17,54 @@ import pandas as pd
 import json
 import os
 import sys
+from collections import deque
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Union
+from queue import Queue
+from threading import Thread
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datasets import Dataset, Audio
-from lexikos import Lexicon
+from tqdm.auto import tqdm
 from tqdm.contrib.concurrent import thread_map
+from transformers import AutoFeatureExtractor
+import torch
 
-from speechline.classifiers import Wav2Vec2Classifier
+from speechline.classifiers import ASTClassifier, Wav2Vec2Classifier
 from speechline.config import Config
+from speechline.modules import ReplicaPool
 from speechline.segmenters import (
     PhonemeOverlapSegmenter,
+    ReferenceCache,
+    Segmenter,
     SilenceSegmenter,
     WordOverlapSegmenter,
 )
+from speechline.sinks import (
+    ArrowShardSink,
+    DirectorySink,
+    NemoManifestSink,
+    SegmentSink,
+    TarShardSink,
+)
 from speechline.transcribers import (
     Wav2Vec2Transcriber,
     WhisperTranscriber,
     ParakeetTranscriber,
 )
+from speechline.utils.audio_store import AudioStore
+from speechline.utils.cache import G2PCache
 from speechline.utils.dataset import (
     format_audio_dataset,
+    iter_dataframe_from_manifest,
     prepare_dataframe,
     prepare_dataframe_from_manifest,
 )
 from speechline.utils.io import export_transcripts_json
+from speechline.utils.lexicon import load_lexicon
 from speechline.utils.logger import Logger
 from speechline.utils.tokenizer import WordTokenizer
-from speechline.utils.manifest import write_manifest
+from speechline.utils.manifest import ManifestWriter, write_manifest
 
 
 @dataclass
@@ -72,7 +92,7 @@ class Runner:
             "--input_dir",
             type=str,
             required=True,
-            help="Directory of input audios or path to manifest JSON file.",
+            help="Directory of input audios or path to manifest JSON/JSONL file.",
         )
         parser.add_argument(
             "-o",
@@ -107,7 +127,524 @@ class Runner:
         return parser.parse_args(args)
 
     @staticmethod
-    def run(config: Config, input_dir: str, output_dir: str) -> None:
+    def load_transcriber(
+        config: Config,
+    ) -> Union[
+        Wav2Vec2Transcriber, WhisperTranscriber, ParakeetTranscriber, ReplicaPool
+    ]:
+        """
+        Loads the transcriber specified in `config`. If `num_replicas` is greater
+        than `1`, returns a `ReplicaPool` of transcribers in worker processes.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+
+        Returns:
+            Union[Wav2Vec2Transcriber, WhisperTranscriber, ParakeetTranscriber, ReplicaPool]:  # noqa: E501
+                Transcriber, or pool of transcriber replicas.
+        """
+        if config.transcriber.type == "wav2vec2":
+            factory = partial(
+                Wav2Vec2Transcriber,
+                config.transcriber.model,
+                backend=config.transcriber.backend,
+                quantize=config.transcriber.quantize,
+                onnx_dir=config.onnx_dir,
+            )
+        elif config.transcriber.type == "whisper":
+            factory = partial(WhisperTranscriber, config.transcriber.model)
+        elif config.transcriber.type == "parakeet":
+            factory = partial(
+                ParakeetTranscriber,
+                config.transcriber.model,
+                config.transcriber.transcriber_device,
+            )
+
+        if config.transcriber.num_replicas > 1:
+            feature_extractor = AutoFeatureExtractor.from_pretrained(
+                config.transcriber.model
+            )
+            return ReplicaPool(
+                factory,
+                sampling_rate=feature_extractor.sampling_rate,
+                num_replicas=config.transcriber.num_replicas,
+                num_threads=config.transcriber.num_threads,
+            )
+
+        if config.transcriber.num_threads:
+            torch.set_num_threads(config.transcriber.num_threads)
+        return factory()
+
+    @staticmethod
+    def load_segmenter(
+        config: Config,
+    ) -> Union[SilenceSegmenter, WordOverlapSegmenter, PhonemeOverlapSegmenter]:
+        """
+        Loads the segmenter specified in `config`.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+
+        Returns:
+            Union[SilenceSegmenter, WordOverlapSegmenter, PhonemeOverlapSegmenter]:
+                Segmenter instance.
+        """
+        if config.segmenter.type == "silence":
+            segmenter = SilenceSegmenter()
+        elif config.segmenter.type == "word_overlap":
+            segmenter = WordOverlapSegmenter(config.segmenter.alignment_engine)
+        elif config.segmenter.type == "phoneme_overlap":
+            lexicon_path = config.segmenter.lexicon_path
+            lexicon = load_lexicon([lexicon_path] if lexicon_path else [])
+            g2p_cache = G2PCache(
+                max_size=config.segmenter.g2p_cache_size,
+                cache_path=config.segmenter.g2p_cache_path,
+            )
+            segmenter = PhonemeOverlapSegmenter(lexicon, g2p_cache=g2p_cache)
+        return segmenter
+
+    @staticmethod
+    def load_classifiers(
+        config: Config,
+    ) -> Tuple[Wav2Vec2Classifier, Optional[Wav2Vec2Classifier]]:
+        """
+        Loads the audio classifier, and the second-stage classifier of cascaded
+        classification, specified in `config`.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+
+        Returns:
+            Tuple[Wav2Vec2Classifier, Optional[Wav2Vec2Classifier]]:
+                Audio classifier, and second-stage classifier
+                if `config.classifier.cascade_model`.
+        """
+        classifier_fn = partial(
+            Wav2Vec2Classifier,
+            max_duration_s=config.classifier.max_duration_s,
+            backend=config.classifier.backend,
+            quantize=config.classifier.quantize,
+            onnx_dir=config.onnx_dir,
+        )
+        classifier = classifier_fn(config.classifier.model)
+        second_stage = None
+        if config.classifier.cascade_window_s and config.classifier.cascade_model:
+            second_stage = classifier_fn(config.classifier.cascade_model)
+        return classifier, second_stage
+
+    @staticmethod
+    def classify(
+        config: Config,
+        classifier: Wav2Vec2Classifier,
+        dataset: Dataset,
+        df: pd.DataFrame,
+        stream: bool = False,
+        second_stage: Optional[Wav2Vec2Classifier] = None,
+    ) -> Union[List[str], Iterator[str]]:
+        """
+        Classifies the audios of `df`: per utterance, per speaker if
+        `config.classifier.group_by_speaker`, or cascaded if
+        `config.classifier.cascade_window_s`.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+            classifier (Wav2Vec2Classifier):
+                Loaded audio classifier.
+            dataset (Dataset):
+                Audio dataset of `df`.
+            df (pd.DataFrame):
+                Prepared input DataFrame, with an `id` column.
+            stream (bool, optional):
+                Whether to lazily yield predictions in order. Defaults to `False`.
+            second_stage (Optional[Wav2Vec2Classifier], optional):
+                Second-stage classifier of cascaded classification.
+                Defaults to `None`.
+
+        Returns:
+            Union[List[str], Iterator[str]]:
+                Predicted category of every audio.
+        """
+        if config.classifier.cascade_window_s:
+            categories = classifier.predict_cascade(
+                dataset,
+                config.classifier.cascade_window_s,
+                threshold=config.classifier.cascade_threshold,
+                second_stage=second_stage,
+                batch_size=config.classifier.batch_size,
+            )
+            return iter(categories) if stream else categories
+
+        if not config.classifier.group_by_speaker:
+            return classifier.predict(
+                dataset, stream=stream, batch_size=config.classifier.batch_size
+            )
+
+        # speaker ID is the prefix of Bookbot utterance IDs
+        speakers = [str(id).split("_")[0] for id in df["id"]]
+        categories = classifier.predict_by_speaker(
+            dataset,
+            speakers,
+            sample_size=config.classifier.speaker_sample_size,
+            max_samples=config.classifier.speaker_max_samples,
+            threshold=config.classifier.speaker_threshold,
+            batch_size=config.classifier.batch_size,
+        )
+        return iter(categories) if stream else categories
+
+    @staticmethod
+    def load_noise_classifier(config: Config) -> Optional[ASTClassifier]:
+        """
+        Loads the noise classifier specified in `config`, shared by all audios.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+
+        Returns:
+            Optional[ASTClassifier]:
+                Noise classifier, or `None` if noise classification is disabled.
+        """
+        if not config.do_noise_classify:
+            return None
+
+        noise_classifier = ASTClassifier(
+            config.noise_classifier.model,
+            backend=config.noise_classifier.backend,
+            quantize=config.noise_classifier.quantize,
+            onnx_dir=config.onnx_dir,
+        )
+        # progress is reported per noise classification stage, not per batch
+        noise_classifier.show_progress = False
+        return noise_classifier
+
+    @staticmethod
+    def segmenter_kwargs(
+        config: Config,
+        audio_store: Optional[AudioStore] = None,
+        sink: Optional[SegmentSink] = None,
+    ) -> Dict[str, Any]:
+        """
+        Builds keyword arguments passed to the `Segmenter` phases, i.e.
+        `prepare_segments`, `classify_noise_batched` and `export_segments`.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+            audio_store (Optional[AudioStore], optional):
+                Shared store of decoded audios. Defaults to `None`.
+            sink (Optional[SegmentSink], optional):
+                Output sink of chunks. Defaults to `None`.
+
+        Returns:
+            Dict[str, Any]:
+                Keyword arguments for the segmenter phases.
+        """
+        if config.do_noise_classify:
+            minimum_empty_duration = config.noise_classifier.minimum_empty_duration
+            noise_classifier_threshold = config.noise_classifier.threshold
+            noise_classifier_batch_size = config.noise_classifier.batch_size
+        else:
+            minimum_empty_duration = None
+            noise_classifier_threshold = None
+            noise_classifier_batch_size = None
+
+        return {
+            "do_noise_classify": config.do_noise_classify,
+            "minimum_empty_duration": minimum_empty_duration,
+            "minimum_chunk_duration": config.segmenter.minimum_chunk_duration,
+            "noise_classifier_threshold": noise_classifier_threshold,
+            "noise_classifier_batch_size": noise_classifier_batch_size,
+            "silence_duration": config.segmenter.silence_duration,
+            "audio_format": config.segmenter.audio_format,
+            "audio_store": audio_store,
+            "sink": sink,
+        }
+
+    @staticmethod
+    def load_sink(config: Config, output_dir: str) -> SegmentSink:
+        """
+        Loads the output sink of segmented chunks.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+            output_dir (str):
+                Path to output directory.
+
+        Returns:
+            SegmentSink:
+                Loaded sink.
+        """
+        audio_format = config.segmenter.audio_format
+        max_shard_size_mb = config.segmenter.max_shard_size_mb
+        if config.segmenter.sink == "tar":
+            return TarShardSink(output_dir, audio_format, max_shard_size_mb)
+        elif config.segmenter.sink == "arrow":
+            return ArrowShardSink(output_dir, audio_format, max_shard_size_mb)
+        elif config.segmenter.sink == "nemo":
+            return NemoManifestSink(output_dir, audio_format)
+        return DirectorySink(output_dir, audio_format)
+
+    @staticmethod
+    def log_audio_store(audio_store: Optional[AudioStore]) -> None:
+        """
+        Logs how many audios were decoded and served from the shared store.
+
+        Args:
+            audio_store (Optional[AudioStore]):
+                Shared store of decoded audios.
+        """
+        if audio_store is not None:
+            logger = Logger.get_logger()
+            logger.info(
+                f"Decoded {audio_store.num_decodes} audios, "
+                f"served {audio_store.num_hits} from the audio store."
+            )
+
+    @staticmethod
+    def log_g2p_cache(segmenter: Segmenter) -> None:
+        """
+        Logs how many out-of-lexicon words were converted and served from the
+        segmenter's G2P cache.
+
+        Args:
+            segmenter (Segmenter):
+                Segmenter instance.
+        """
+        if isinstance(segmenter, PhonemeOverlapSegmenter):
+            g2p_cache = segmenter.g2p_cache
+            logger = Logger.get_logger()
+            logger.info(
+                f"Converted {g2p_cache.num_misses} out-of-lexicon words, "
+                f"served {g2p_cache.num_hits} from the G2P cache."
+            )
+
+    @staticmethod
+    def write_segment_manifest(all_manifest: List[Any], output_dir: str) -> None:
+        """
+        Writes segmentation results to `{output_dir}/audio_segment_manifest.json`.
+
+        Args:
+            all_manifest (List[Any]):
+                Per-utterance lists of segment manifest entries.
+            output_dir (str):
+                Path to output directory.
+        """
+        logger = Logger.get_logger()
+
+        # Skip writing to manifest file if all_manifest is empty or contains only empty items
+        if all_manifest and any(manifest for manifest in all_manifest):
+            logger.info("Processing segmentation results for manifest creation")
+            manifest_path = os.path.join(output_dir, "audio_segment_manifest.json")
+
+            # Check if file exists before overwriting
+            if os.path.exists(manifest_path):
+                logger.warning(f"Overwriting existing manifest file: {manifest_path}")
+
+            write_manifest(
+                all_manifest,
+                manifest_path,
+                force_overwrite=True,  # Explicitly force overwrite
+            )
+
+            # Verify the file was written correctly
+            if os.path.exists(manifest_path):
+                logger.info(f"Manifest file exists after writing: {manifest_path}")
+                try:
+                    with open(manifest_path, "r") as f:
+                        content = json.load(f)
+                        logger.info(f"Manifest contains {len(content)} entries")
+                except Exception as e:
+                    logger.error(f"Error verifying manifest content: {str(e)}")
+            else:
+                logger.error(f"Failed to create manifest file: {manifest_path}")
+        else:
+            logger.warning(
+                "No valid segmentation results found, skipping manifest creation"
+            )
+
+    @staticmethod
+    def run_streaming(
+        config: Config,
+        dfs: Iterable[pd.DataFrame],
+        transcriber: Union[Wav2Vec2Transcriber, WhisperTranscriber, ReplicaPool],
+        output_dir: str,
+        audio_store: Optional[AudioStore] = None,
+    ) -> None:
+        """
+        Runs the pipeline in streaming, stage-fused mode.
+
+        Every utterance flows through classification, transcription and
+        segmentation without waiting for the rest of the corpus. Offsets are
+        handed to segmentation workers in memory through a bounded queue,
+        and are only exported to JSON if `config.streaming.export_offsets`.
+        Manifest entries of every utterance are appended to
+        `{output_dir}/audio_segment_manifest.json` as soon as it is segmented.
+
+        Args:
+            config (Config):
+                SpeechLine Config object.
+            dfs (Iterable[pd.DataFrame]):
+                Prepared input DataFrame chunks, consumed lazily.
+            transcriber (Union[Wav2Vec2Transcriber, WhisperTranscriber, ReplicaPool]):
+                Loaded transcriber.
+            output_dir (str):
+                Path to output directory.
+            audio_store (Optional[AudioStore], optional):
+                Shared store of decoded audios. Defaults to `None`.
+        """
+        logger = Logger.get_logger()
+        streaming = config.streaming
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        if config.do_classify:
+            classifier, second_stage = Runner.load_classifiers(config)
+
+        def _iter_items() -> Iterator[Dict[str, Any]]:
+            for df in dfs:
+                dataset = format_audio_dataset(
+                    df,
+                    sampling_rate=transcriber.sampling_rate,
+                    cache_dir=config.dataset_cache_dir,
+                    audio_store=audio_store,
+                )
+                items = iter(dataset)
+
+                if config.do_classify:
+                    classifier_dataset = format_audio_dataset(
+                        df,
+                        sampling_rate=classifier.sampling_rate,
+                        cache_dir=config.dataset_cache_dir,
+                        audio_store=audio_store,
+                    )
+                    categories = Runner.classify(
+                        config,
+                        classifier,
+                        classifier_dataset,
+                        df,
+                        stream=True,
+                        second_stage=second_stage,
+                    )
+                    # lazily keep child speech only
+                    items = (
+                        item
+                        for item, category in zip(items, categories)
+                        if category == "child"
+                    )
+
+                yield from items
+
+        # utterances handed to the transcriber, awaiting their predictions
+        pending = deque()
+
+        def _track(items: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for item in items:
+                pending.append((item["audio"]["path"], item["ground_truth"]))
+                yield item
+
+        predict_params = {
+            "chunk_length_s": config.transcriber.chunk_length_s,
+            "output_offsets": True,
+            "return_timestamps": config.transcriber.return_timestamps,
+            "keep_whitespace": config.segmenter.keep_whitespace,
+            "stream": True,
+            "batch_size": config.transcriber.batch_size,
+        }
+        if config.transcriber.pack_length_s:
+            predict_params["pack_length_s"] = config.transcriber.pack_length_s
+        if config.transcriber.cache_dir:
+            predict_params["cache_dir"] = config.transcriber.cache_dir
+
+        output_offsets = transcriber.predict(_track(_iter_items()), **predict_params)
+
+        segmenter = Runner.load_segmenter(config)
+        sink = Runner.load_sink(config, output_dir)
+        segmenter_kwargs = Runner.segmenter_kwargs(config, audio_store, sink)
+        noise_classifier = Runner.load_noise_classifier(config)
+        references = ReferenceCache(segmenter, WordTokenizer())
+
+        # prepared utterances, awaiting noise classification
+        prepared = deque()
+
+        def _prepare() -> Iterator[Tuple[str, List[List[Dict[str, Any]]]]]:
+            for offsets in output_offsets:
+                audio_path, ground_truth = pending.popleft()
+                # skip undetected transcripts
+                if not offsets:
+                    continue
+                try:
+                    segments = segmenter.prepare_segments(
+                        offsets, **references.get(ground_truth), **segmenter_kwargs
+                    )
+                except Exception as e:
+                    logger.error(f"Error segmenting {audio_path}: {str(e)}")
+                    continue
+                prepared.append(offsets)
+                yield audio_path, segments
+
+        items = _prepare()
+        if noise_classifier is not None:
+            # classify gaps of consecutive utterances together, in full batches
+            items = segmenter.classify_noise_batched(
+                items, noise_classifier, **segmenter_kwargs
+            )
+
+        queue = Queue(maxsize=streaming.queue_size)
+        # segments of every utterance are appended to the manifest as they finish
+        manifest = ManifestWriter(
+            os.path.join(output_dir, "audio_segment_manifest.json")
+        )
+        sentinel = None
+
+        def _consume():
+            while True:
+                job = queue.get()
+                if job is sentinel:
+                    break
+                audio_path, offsets, segments = job
+                try:
+                    if streaming.export_offsets:
+                        json_path = Path(audio_path).with_suffix(".json")
+                        export_transcripts_json(str(json_path), offsets)
+                    entries = segmenter.export_segments(
+                        audio_path, output_dir, offsets, segments, **segmenter_kwargs
+                    )
+                    manifest.write(entries)
+                except Exception as e:
+                    logger.error(f"Error segmenting {audio_path}: {str(e)}")
+
+        workers = [Thread(target=_consume) for _ in range(streaming.num_workers)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for audio_path, segments in items:
+                offsets = prepared.popleft()
+                queue.put((audio_path, offsets, segments))
+        finally:
+            for _ in workers:
+                queue.put(sentinel)
+            for worker in workers:
+                worker.join()
+            sink.close()
+            manifest.close()
+
+        Runner.log_audio_store(audio_store)
+        Runner.log_g2p_cache(segmenter)
+
+    @staticmethod
+    def run(
+        config: Config,
+        input_dir: str,
+        output_dir: str,
+        script_name: Optional[str] = None,
+        log_dir: str = "logs",
+    ) -> None:
         """
         Runs end-to-end SpeechLine pipeline.
 
@@ -116,6 +653,9 @@ class Runner:
         - Transcribes audio.
         - Segments audio into chunks based on silences.
 
+        If `config.do_stream` is enabled, stages are fused per utterance.
+        See `Runner.run_streaming`.
+
         Args:
             config (Config):
                 SpeechLine Config object.
@@ -123,52 +663,87 @@ class Runner:
                 Path to input directory or manifest file if input_type is 'manifest'.
             output_dir (str):
                 Path to output directory.
+            script_name (Optional[str], optional):
+                Name of the shell script being executed. Defaults to `None`.
+            log_dir (str, optional):
+                Directory to save log files. Defaults to `"logs"`.
         """
-        Logger.setup(script_name=args.script_name, log_dir=args.log_dir)
+        Logger.setup(script_name=script_name, log_dir=log_dir)
         logger = Logger.get_logger()
 
         # load transcriber model
-        if config.transcriber.type == "wav2vec2":
-            transcriber = Wav2Vec2Transcriber(config.transcriber.model)
-        elif config.transcriber.type == "whisper":
-            transcriber = WhisperTranscriber(config.transcriber.model)
-        elif config.transcriber.type == "parakeet":
-            transcriber = ParakeetTranscriber(
-                config.transcriber.model, config.transcriber.transcriber_device
+        transcriber = Runner.load_transcriber(config)
+
+        # decoded audios, shared by classification, transcription and segmentation
+        audio_store = None
+        if config.audio_store_size_mb > 0:
+            audio_store = AudioStore(max_size_mb=config.audio_store_size_mb)
+
+        do_stream = config.do_stream
+        if do_stream and isinstance(transcriber, ParakeetTranscriber):
+            logger.warning(
+                "Streaming is not supported for parakeet, running in batch mode."
             )
+            do_stream = False
 
         logger.info("Preparing DataFrame..")
         # Auto-detect input type based on path
-        if os.path.isfile(input_dir) and input_dir.endswith(".json"):
-            # Input is a JSON manifest file
+        if os.path.isfile(input_dir) and input_dir.endswith((".json", ".jsonl")):
+            # Input is a JSON-array or JSON-lines manifest file
+            if do_stream:
+                # read manifest incrementally, in chunks
+                dfs = iter_dataframe_from_manifest(input_dir)
+                if config.filter_empty_transcript:
+                    dfs = (df[df["ground_truth"] != ""] for df in dfs)
+                Runner.run_streaming(
+                    config, dfs, transcriber, output_dir, audio_store
+                )
+                return
             df = prepare_dataframe_from_manifest(input_dir)
         elif os.path.isdir(input_dir):
             # Input is a directory of audio files
-            df = prepare_dataframe(input_dir, audio_extension="wav")
+            df = prepare_dataframe(
+                input_dir,
+                audio_extension="wav",
+                index_path=config.dataframe_index_path,
+            )
         else:
             logger.error(
-                f"Input path {input_dir} is neither a directory nor a JSON file."
+                f"Input path {input_dir} is neither a directory nor a JSON/JSONL file."
             )
             return
 
         if config.filter_empty_transcript:
             df = df[df["ground_truth"] != ""]
 
+        if do_stream:
+            Runner.run_streaming(config, [df], transcriber, output_dir, audio_store)
+            return
+
         if config.do_classify:
             # load classifier model
-            classifier = Wav2Vec2Classifier(
-                config.classifier.model,
-                max_duration_s=config.classifier.max_duration_s,
-            )
+            classifier, second_stage = Runner.load_classifiers(config)
 
             # perform audio classification
-            dataset = format_audio_dataset(df, sampling_rate=classifier.sampling_rate)
-            df["category"] = classifier.predict(dataset)
+            dataset = format_audio_dataset(
+                df,
+                sampling_rate=classifier.sampling_rate,
+                cache_dir=config.dataset_cache_dir,
+                audio_store=audio_store,
+            )
+            df["category"] = Runner.classify(
+                config, classifier, dataset, df, second_stage=second_stage
+            )
 
             # filter audio by category
             df = df[df["category"] == "child"]
 
-        dataset = format_audio_dataset(df, sampling_rate=transcriber.sampling_rate)
+        dataset = format_audio_dataset(
+            df,
+            sampling_rate=transcriber.sampling_rate,
+            cache_dir=config.dataset_cache_dir,
+            audio_store=audio_store,
+        )
 
         os.makedirs(output_dir, exist_ok=True)
 
@@ -179,8 +754,14 @@ class Runner:
             "output_offsets": True,
             "return_timestamps": config.transcriber.return_timestamps,
             "keep_whitespace": config.segmenter.keep_whitespace,
+            "batch_size": config.transcriber.batch_size,
         }
 
+        if config.transcriber.pack_length_s:
+            predict_params["pack_length_s"] = config.transcriber.pack_length_s
+        if config.transcriber.cache_dir:
+            predict_params["cache_dir"] = config.transcriber.cache_dir
+
         # Add output_dir only if the transcriber is ParakeetTranscriber
         if isinstance(transcriber, ParakeetTranscriber):
             predict_params["output_dir"] = output_dir
@@ -212,37 +793,20 @@ class Runner:
             logger.warning("No offsets to export. Skipping export step.")
 
         # segment audios based on offsets
-        if config.segmenter.type == "silence":
-            segmenter = SilenceSegmenter()
-        elif config.segmenter.type == "word_overlap":
-            segmenter = WordOverlapSegmenter()
-        elif config.segmenter.type == "phoneme_overlap":
-            lexicon = Lexicon()
-            if config.segmenter.lexicon_path:
-                with open(config.segmenter.lexicon_path) as json_file:
-                    lex = json.load(json_file)
-                # merge dict with lexicon
-                for k, v in lex.items():
-                    lexicon[k] = lexicon[k].union(set(v)) if k in lexicon else set(v)
-            segmenter = PhonemeOverlapSegmenter(lexicon)
-
-        tokenizer = WordTokenizer()
-
-        if config.do_noise_classify:
-            noise_classifier = config.noise_classifier.model
-            minimum_empty_duration = config.noise_classifier.minimum_empty_duration
-            noise_classifier_threshold = config.noise_classifier.threshold
-        else:
-            noise_classifier = None
-            minimum_empty_duration = None
-            noise_classifier_threshold = None
+        segmenter = Runner.load_segmenter(config)
+        sink = Runner.load_sink(config, output_dir)
+        segmenter_kwargs = Runner.segmenter_kwargs(config, audio_store, sink)
+        noise_classifier = Runner.load_noise_classifier(config)
+
+        # tokenize and prepare every distinct ground truth once
+        references = ReferenceCache(segmenter, WordTokenizer())
+        references.prepare(df["ground_truth"])
+        logger.info(
+            f"Prepared {len(references)} ground truth references "
+            f"for {len(df)} utterances."
+        )
 
-        def segment_audio(
-            audio_path: str,
-            ground_truth: str,
-            # We're removing the in-memory offsets parameter, but we need to keep the function signature compatible with thread_map
-            _: List[Dict[str, Union[str, float]]],  # This parameter will be ignored
-        ):
+        def load_offsets(audio_path: str) -> Optional[List[Dict[str, Any]]]:
             # Load offsets from the JSON file instead of using in-memory offsets
             json_path = Path(audio_path).with_suffix(".json")
 
@@ -251,7 +815,7 @@ class Runner:
                 logger.warning(
                     f"JSON file not found for {audio_path}. Skipping segmentation."
                 )
-                return [{}]
+                return None
 
             # Load offsets from JSON file
             try:
@@ -263,7 +827,7 @@ class Runner:
                     logger.warning(
                         f"Empty offsets in JSON file for {audio_path}. Skipping segmentation."
                     )
-                    return [{}]
+                    return None
 
                 # Ensure loaded_offsets has the expected structure
                 for offset in loaded_offsets:
@@ -273,78 +837,86 @@ class Runner:
                         logger.warning(
                             f"Invalid offset format in JSON file for {audio_path}. Skipping segmentation."
                         )
-                        return [{}]
+                        return None
 
             except json.JSONDecodeError:
                 logger.error(
                     f"Error decoding JSON file for {audio_path}. Skipping segmentation."
                 )
-                return [{}]
+                return None
             except Exception as e:
                 logger.error(
                     f"Error loading JSON file for {audio_path}: {str(e)}. Skipping segmentation."
                 )
-                return [{}]
-
-            # chunk audio into segments using loaded offsets
-            segmented_manifest = segmenter.chunk_audio_segments(
-                audio_path,
-                output_dir,
-                loaded_offsets,  # Use loaded offsets instead of in-memory offsets
-                do_noise_classify=config.do_noise_classify,
-                noise_classifier=noise_classifier,
-                minimum_empty_duration=minimum_empty_duration,
-                minimum_chunk_duration=config.segmenter.minimum_chunk_duration,
-                noise_classifier_threshold=noise_classifier_threshold,
-                silence_duration=config.segmenter.silence_duration,
-                ground_truth=tokenizer(ground_truth),
-            )
-            return segmented_manifest
-
-        # Keep the thread_map call the same to maintain compatibility
-        # We're still passing output_offsets, but our segment_audio function will ignore it
-        all_manifest = thread_map(
-            segment_audio,
-            df["audio"],
-            df["ground_truth"],
-            output_offsets,  # Keep this parameter to maintain compatibility with thread_map
-            desc="Segmenting Audio into Chunks",
-            total=len(df),
-        )
+                return None
 
-        # Skip writing to manifest file if all_manifest is empty or contains only empty items
-        if all_manifest and any(manifest for manifest in all_manifest):
-            logger.info("Processing segmentation results for manifest creation")
-            manifest_path = os.path.join(output_dir, "audio_segment_manifest.json")
+            return loaded_offsets
 
-            # Check if file exists before overwriting
-            if os.path.exists(manifest_path):
-                logger.warning(f"Overwriting existing manifest file: {manifest_path}")
+        def prepare_segments(audio_path: str, ground_truth: str):
+            offsets = load_offsets(audio_path)
+            if offsets is None:
+                return None
 
-            write_manifest(
-                all_manifest,
-                manifest_path,
-                force_overwrite=True,  # Explicitly force overwrite
+            # chunk offsets into segments using loaded offsets
+            segments = segmenter.prepare_segments(
+                offsets, **references.get(ground_truth), **segmenter_kwargs
+            )
+            return offsets, segments
+
+        try:
+            # 1. chunk offsets of every audio into segments
+            prepared = thread_map(
+                prepare_segments,
+                df["audio"],
+                df["ground_truth"],
+                desc="Preparing Segments",
+                total=len(df),
             )
 
-            # Verify the file was written correctly
-            if os.path.exists(manifest_path):
-                logger.info(f"Manifest file exists after writing: {manifest_path}")
-                try:
-                    with open(manifest_path, "r") as f:
-                        content = json.load(f)
-                        logger.info(f"Manifest contains {len(content)} entries")
-                except Exception as e:
-                    logger.error(f"Error verifying manifest content: {str(e)}")
-            else:
-                logger.error(f"Failed to create manifest file: {manifest_path}")
-        else:
-            logger.warning(
-                "No valid segmentation results found, skipping manifest creation"
+            # 2. classify gaps of all audios in full batches, with one loaded model
+            if noise_classifier is not None:
+                items = [
+                    (audio_path, p[1])
+                    for audio_path, p in zip(df["audio"], prepared)
+                    if p is not None
+                ]
+                list(
+                    tqdm(
+                        segmenter.classify_noise_batched(
+                            items, noise_classifier, **segmenter_kwargs
+                        ),
+                        desc="Classifying Noise",
+                        total=len(items),
+                    )
+                )
+
+            # 3. export audio chunks and transcripts
+            def export_segments(audio_path: str, p):
+                if p is None:
+                    return [{}]
+                offsets, segments = p
+                return segmenter.export_segments(
+                    audio_path, output_dir, offsets, segments, **segmenter_kwargs
+                )
+
+            all_manifest = thread_map(
+                export_segments,
+                df["audio"],
+                prepared,
+                desc="Segmenting Audio into Chunks",
+                total=len(df),
             )
+        finally:
+            sink.close()
+
+        Runner.write_segment_manifest(all_manifest, output_dir)
+        Runner.log_audio_store(audio_store)
+        Runner.log_g2p_cache(segmenter)
 
 
 if __name__ == "__main__":
     args = Runner.parse_args(sys.argv[1:])
     config = Config(args.config)
-    Runner.run(config, args.input_dir, args.output_dir)
+    Runner.run(
+        config, args.input_dir, args.output_dir, args.script_name, args.log_dir
+    )
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import argparse
-import json
 import os
 import sys
 from dataclasses import dataclass
@@ -23,17 +22,19 @@ from tqdm.contrib.concurrent import thread_map
 
 
 from datasets import Audio, load_dataset
-from lexikos import Lexicon
 
 from speechline.config import Config
 from speechline.segmenters import (
     PhonemeOverlapSegmenter,
+    ReferenceCache,
     SilenceSegmenter,
     WordOverlapSegmenter,
 )
 from speechline.transcribers import Wav2Vec2Transcriber, WhisperTranscriber
+from speechline.utils.cache import G2PCache
 from speechline.utils.dataset import preprocess_audio_transcript
 from speechline.utils.io import export_transcripts_json
+from speechline.utils.lexicon import load_lexicon
 from speechline.utils.tokenizer import WordTokenizer
 
 
@@ -178,18 +179,19 @@ class Runner:
         if config.segmenter.type == "silence":
             segmenter = SilenceSegmenter()
         elif config.segmenter.type == "word_overlap":
-            segmenter = WordOverlapSegmenter()
+            segmenter = WordOverlapSegmenter(config.segmenter.alignment_engine)
         elif config.segmenter.type == "phoneme_overlap":
-            lexicon = Lexicon()
-            if config.segmenter.lexicon_path:
-                with open(config.segmenter.lexicon_path) as json_file:
-                    lex = json.load(json_file)
-                # merge dict with lexicon
-                for k, v in lex.items():
-                    lexicon[k] = lexicon[k].union(set(v)) if k in lexicon else set(v)
-            segmenter = PhonemeOverlapSegmenter(lexicon)
+            lexicon_path = config.segmenter.lexicon_path
+            lexicon = load_lexicon([lexicon_path] if lexicon_path else [])
+            g2p_cache = G2PCache(
+                max_size=config.segmenter.g2p_cache_size,
+                cache_path=config.segmenter.g2p_cache_path,
+            )
+            segmenter = PhonemeOverlapSegmenter(lexicon, g2p_cache=g2p_cache)
 
-        tokenizer = WordTokenizer()
+        # tokenize and prepare every distinct ground truth once
+        references = ReferenceCache(segmenter, WordTokenizer())
+        references.prepare(dataset[text_column_name])
 
         def segment_audio(idx):
             example = dataset[idx]
@@ -201,7 +203,7 @@ class Runner:
                 offset,
                 minimum_chunk_duration=config.segmenter.minimum_chunk_duration,
                 silence_duration=config.segmenter.silence_duration,
-                ground_truth=tokenizer(example[text_column_name]),
+                **references.get(example[text_column_name]),
             )
 
         thread_map(segment_audio, range(len(dataset)), desc="Segmenting Audio into Chunks", total=len(dataset))
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from .phoneme_overlap_segmenter import PhonemeOverlapSegmenter
+from .reference_cache import ReferenceCache
 from .segmenter import Segmenter
 from .silence_segmenter import SilenceSegmenter
 from .word_overlap_segmenter import WordOverlapSegmenter
@@ -20,6 +21,7 @@ from .word_overlap_segmenter import WordOverlapSegmenter
 __all__ = [
     "Segmenter",
     "PhonemeOverlapSegmenter",
+    "ReferenceCache",
     "SilenceSegmenter",
     "WordOverlapSegmenter",
 ]
@@ -12,23 +12,44 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List, Union
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 
 from gruut import sentences
 
+from ..utils.alignment import align_variants, consecutive_runs
+from ..utils.cache import G2PCache
+from ..utils.lexicon import CompiledLexicon, normalize_phonemes
+from ..utils.offsets import Offsets
 from .segmenter import Segmenter
 
+# ids of phoneme strings, and phoneme variant ids of every ground truth word
+PhonemeReference = Tuple[Dict[str, int], Tuple[FrozenSet[int], ...]]
+
 
 class PhonemeOverlapSegmenter(Segmenter):
-    def __init__(self, lexicon: Dict[str, List[str]]):
+    def __init__(
+        self,
+        lexicon: Dict[str, List[str]],
+        language: str = "en_US",
+        g2p_cache: Optional[G2PCache] = None,
+    ):
         """
         Phoneme-overlap segmenter, with phoneme variations.
 
         Args:
             lexicon (Dict[str, List[str]]):
-                Lexicon of words and their phoneme variations.
+                Lexicon of words and their phoneme variations,
+                or a `CompiledLexicon`, which is used as is.
+            language (str, optional):
+                Language of out-of-lexicon words, passed to gruut.
+                Defaults to `"en_US"`.
+            g2p_cache (Optional[G2PCache], optional):
+                Cache of out-of-lexicon word conversions, which can be shared with
+                other segmenters. Defaults to `None`, i.e. a new in-memory cache.
         """
         self.lexicon = self._normalize_lexicon(lexicon)
+        self.language = language
+        self.g2p_cache = g2p_cache if g2p_cache is not None else G2PCache()
 
     def _normalize_text(self, text: str) -> str:
         text = text.lower().strip()
@@ -47,10 +68,7 @@ class PhonemeOverlapSegmenter(Segmenter):
             str:
                 Normalized phonemes.
         """
-        diacritics = ["ː", "ˑ", "̆", "̯", "͡", "‿", "͜", "̩", "ˈ", "ˌ"]
-        for d in diacritics:
-            phonemes = phonemes.replace(d, "")
-        return phonemes.strip()
+        return normalize_phonemes(phonemes)
 
     def _normalize_lexicon(self, lexicon: Dict[str, List[str]]) -> Dict[str, List[str]]:
         """
@@ -64,6 +82,9 @@ class PhonemeOverlapSegmenter(Segmenter):
             Dict[str, List[str]]:
                 Normalized lexicon.
         """
+        # compiled lexicons are already normalized
+        if isinstance(lexicon, CompiledLexicon):
+            return lexicon
         return {word: set(self._normalize_phonemes(p) for p in phonemes) for word, phonemes in lexicon.items()}
 
     def _merge_offsets(self, offsets: List[Dict[str, Union[str, float]]]) -> List[List[Dict[str, Union[str, float]]]]:
@@ -78,30 +99,33 @@ class PhonemeOverlapSegmenter(Segmenter):
             List[List[Dict[str, Union[str, float]]]]:
                 List of word-bounded phoneme offset segments.
         """
-        result = []
-        current_item = {"text": [], "start_time": None, "end_time": None}
-        for item in offsets:
-            if item["text"] != " ":
-                if current_item["start_time"] is None:
-                    current_item["start_time"] = item["start_time"]
-                current_item["end_time"] = item["end_time"]
-                current_item["text"].append(item["text"])
-            else:
-                if current_item["start_time"] is not None:
-                    result.append(current_item)
-                    current_item = {"text": [], "start_time": None, "end_time": None}
+        return Offsets.from_dicts(offsets).merge_words(delimiter=" ").to_dicts()
 
-        if current_item["start_time"] is not None:
-            result.append(current_item)
+    def g2p(self, text: str) -> List[str]:
+        """
+        Converts out-of-lexicon text to phonemes with gruut.
 
-        for r in result:
-            r["text"] = " ".join(r["text"])
+        Args:
+            text (str):
+                Text to convert.
 
-        return result
+        Returns:
+            List[str]:
+                Phonemes of every word and punctuation break.
+        """
+        phonemes = []
+        for words in sentences(text, lang=self.language):
+            for word in words:
+                if word.is_major_break or word.is_minor_break:
+                    phonemes.append(word.text)
+                elif word.phonemes:
+                    phonemes.append(" ".join(word.phonemes))
+        return phonemes
 
     def _generate_combinations(self, ground_truth: List[str]) -> List[List[str]]:
         """
         Generate all possible phoneme combinations for a given word.
+        Out-of-lexicon words are converted once per language through `g2p_cache`.
 
         Args:
             ground_truth (List[str]):
@@ -111,35 +135,50 @@ class PhonemeOverlapSegmenter(Segmenter):
             List[List[str]]:
                 List of phoneme combinations.
         """
-
-        def g2p(text: str) -> List[str]:
-            phonemes = []
-            for words in sentences(text):
-                for word in words:
-                    if word.is_major_break or word.is_minor_break:
-                        phonemes.append(word.text)
-                    elif word.phonemes:
-                        phonemes.append(" ".join(word.phonemes))
-            return phonemes
-
         combinations = []
         for word in ground_truth:
             normalized_word = self._normalize_text(word)
             if normalized_word in self.lexicon:
                 phonemes = self.lexicon[normalized_word]
             else:
-                phonemes = g2p(normalized_word)
+                phonemes = self.g2p_cache.get(
+                    self.language, normalized_word, self.g2p
+                )
             combinations.append(phonemes)
         return combinations
 
+    def prepare_reference(self, ground_truth: List[str]) -> PhonemeReference:
+        """
+        Generates phoneme combinations of ground truth words, and pre-hashes
+        them to integer ids.
+
+        Args:
+            ground_truth (List[str]):
+                List of words.
+
+        Returns:
+            PhonemeReference:
+                Ids of phoneme strings, and variant ids of every word.
+        """
+        vocab: Dict[str, int] = {}
+        variant_ids = tuple(
+            frozenset(vocab.setdefault(phonemes, len(vocab)) for phonemes in variants)
+            for variants in self._generate_combinations(ground_truth)
+        )
+        return vocab, variant_ids
+
     def chunk_offsets(
         self,
         offsets: List[Dict[str, Union[str, float]]],
         ground_truth: List[str],
+        reference: Optional[PhonemeReference] = None,
         **kwargs,
     ) -> List[List[Dict[str, Union[str, float]]]]:
         """
         Chunk phoneme-level offsets into word-bounded phoneme offsets.
+        Transcript words are aligned to the ground truth words' phoneme variations
+        with a dynamic-programming aligner, and maximal runs of consecutive
+        matched words are kept as segments.
 
         ### Example
         ```pycon title="example_phoneme_overlap_segmenter.py"
@@ -206,41 +245,28 @@ class PhonemeOverlapSegmenter(Segmenter):
                 List of phoneme offsets.
             ground_truth (List[str]):
                 List of words.
+            reference (Optional[PhonemeReference], optional):
+                Shared output of `prepare_reference(ground_truth)`.
+                Defaults to `None`, i.e. prepared from `ground_truth`.
 
         Returns:
             List[List[Dict[str, Union[str, float]]]]:
                 List of word-bounded phoneme offset segments.
         """
+        # phoneme strings are pre-hashed, so that variant lookups compare integers
+        if reference is None:
+            reference = self.prepare_reference(ground_truth)
+        vocab, variant_ids = reference
 
-        ground_truth = self._generate_combinations(ground_truth)
         merged_offsets = self._merge_offsets(offsets)
         transcripts = [self._normalize_phonemes(o["text"]) for o in merged_offsets]
+        transcript_ids = [vocab.get(word, -1) for word in transcripts]
 
-        idxs, index = [], 0  # index in ground truth
-        for i, word in enumerate(transcripts):
-            if index >= len(ground_truth):
-                break
-            for var in ground_truth[index:]:
-                # match
-                if word in var:
-                    idxs.append(i)
-                    break
-            index += 1
-
-        # if no matches
-        if not idxs:
-            return []
+        # maximal alignment of transcript words to ground truth variants
+        idxs = [i for i, _ in align_variants(transcript_ids, variant_ids)]
 
         # collapse longest consecutive indices
-        merged_idxs = []
-        start, end = idxs[0], idxs[0] + 1
-        for i in idxs[1:]:
-            if i == end:
-                end += 1
-            else:
-                merged_idxs.append((start, end))
-                start, end = i, i + 1
-        merged_idxs.append((start, end))
+        merged_idxs = consecutive_runs(idxs)
 
         # segment according to longest consecutive indices
         segments = [merged_offsets[i:j] for (i, j) in merged_idxs]
@@ -0,0 +1,107 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .segmenter import Segmenter
+
+
+class ReferenceCache:
+    """
+    Ground truth references shared by all utterances of the same text.
+
+    Utterances are grouped by their normalized ground truth text, i.e. lowercased
+    with collapsed whitespace. Every distinct text is tokenized, and its reference
+    prepared by `segmenter.prepare_reference`, once. Tokens and references are
+    immutable, and shared by every utterance of the group.
+
+    Args:
+        segmenter (Segmenter):
+            Segmenter preparing references.
+        tokenizer (Callable[[str], List[str]]):
+            Ground truth word tokenizer.
+
+    Attributes:
+        num_hits (int):
+            Number of references served from the cache.
+        num_misses (int):
+            Number of references prepared.
+    """
+
+    def __init__(self, segmenter: Segmenter, tokenizer: Callable[[str], List[str]]):
+        self.segmenter = segmenter
+        self.tokenizer = tokenizer
+        self.num_hits = 0
+        self.num_misses = 0
+        self._references: Dict[str, Tuple[Tuple[str, ...], Any]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalizes a ground truth text into its group key.
+
+        Args:
+            text (str):
+                Ground truth text.
+
+        Returns:
+            str:
+                Lowercased text with collapsed whitespace.
+        """
+        return " ".join(text.lower().split())
+
+    def prepare(self, texts: Iterable[str]) -> None:
+        """
+        Prepares the references of all distinct `texts` ahead of time.
+
+        Args:
+            texts (Iterable[str]):
+                Ground truth texts.
+        """
+        for text in dict.fromkeys(texts):
+            self.get(text)
+
+    def get(self, text: str) -> Dict[str, Any]:
+        """
+        Gets the shared reference of a ground truth text.
+
+        Args:
+            text (str):
+                Ground truth text.
+
+        Returns:
+            Dict[str, Any]:
+                Keyword arguments of `Segmenter.prepare_segments`, i.e. the
+                tokenized `ground_truth` and its prepared `reference`.
+        """
+        key = self.normalize(text)
+        with self._lock:
+            entry = self._references.get(key)
+            if entry is not None:
+                self.num_hits += 1
+
+        if entry is None:
+            tokens = tuple(self.tokenizer(key))
+            entry = (tokens, self.segmenter.prepare_reference(list(tokens)))
+            with self._lock:
+                entry = self._references.setdefault(key, entry)
+                self.num_misses += 1
+
+        ground_truth, reference = entry
+        return {"ground_truth": ground_truth, "reference": reference}
+
+    def __len__(self) -> int:
+        return len(self._references)
@@ -12,21 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
-from typing import Dict, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from datasets import Audio, Dataset
-from pydub import AudioSegment
+import numpy as np
 
-from ..modules import AudioModule
-from ..utils.io import (
-    export_segment_audio_wav,
-    export_segment_transcripts_tsv,
-    get_chunk_path,
-    get_outdir_path,
-    np_f32_to_pydub,
-    pydub_to_np,
-)
+from ..modules import AudioMultiLabelClassifier
+from ..sinks import DirectorySink, SegmentSink
+from ..utils.audio_store import AudioStore, decode_audio
+from ..utils.offsets import Offsets
+from ..utils.resample import resample_audios
 
 
 class Segmenter:
@@ -43,6 +39,10 @@ class Segmenter:
         Chunks an audio file based on its offsets.
         Generates and exports WAV audio chunks and aligned TSV phoneme transcripts.
 
+        Runs `prepare_segments`, `classify_noise` and `export_segments` on a single
+        audio. To classify noise across many audios in large batches, run these
+        phases separately with `classify_noise_batched` instead.
+
         Args:
             audio_path (str):
                 Path to audio file to chunk.
@@ -62,33 +62,131 @@ class Segmenter:
             List[List[Dict[str, Union[str, float]]]]:
                 List of offsets for every segment.
         """
-        # Extract full transcript from offsets
-        full_transcript = " ".join(
-            [offset["text"] for offset in offsets if offset.get("text")]
-        )
-
-        segments = self.chunk_offsets(offsets, **kwargs)
+        segments = self.prepare_segments(offsets, do_noise_classify, **kwargs)
         # skip empty segments (undetected transcripts)
         if len(segments) == 0:
             return [[{}]]
 
         if do_noise_classify:
-            segments = self.insert_empty_tags(segments, **kwargs)
             segments = self.classify_noise(segments, audio_path, **kwargs)
 
-        if isinstance(audio_path, str):
-            audio = AudioSegment.from_file(audio_path)
-        elif isinstance(audio_path, dict):
-            audio = np_f32_to_pydub(audio_path)
+        return self.export_segments(
+            audio_path, outdir, offsets, segments, minimum_chunk_duration, **kwargs
+        )
+
+    def prepare_reference(self, ground_truth: List[str]) -> Any:
+        """
+        Prepares the reference of a ground truth, i.e. everything `chunk_offsets`
+        derives from it independently of the transcript offsets. References are
+        immutable, and can be shared by all utterances of the same ground truth
+        through the `reference` keyword argument of `chunk_offsets`.
+
+        Args:
+            ground_truth (List[str]):
+                List of ground truth words.
+
+        Returns:
+            Any:
+                Reference of the ground truth.
+        """
+        return tuple(ground_truth)
+
+    def prepare_segments(
+        self,
+        offsets: List[Dict[str, Union[str, float]]],
+        do_noise_classify: bool = False,
+        **kwargs,
+    ) -> List[List[Dict[str, Union[str, float]]]]:
+        """
+        Chunks offsets into segments, and marks gaps for noise classification.
+
+        Args:
+            offsets (List[Dict[str, Union[str, float]]]):
+                List of phoneme offsets.
+            do_noise_classify (bool, optional):
+                Whether to insert empty tags for noise classification.
+                Defaults to `False`.
+
+        Returns:
+            List[List[Dict[str, Union[str, float]]]]:
+                List of offsets for every segment.
+        """
+        segments = self.chunk_offsets(offsets, **kwargs)
+        if do_noise_classify and len(segments) > 0:
+            segments = self.insert_empty_tags(segments, **kwargs)
+        return segments
+
+    def export_segments(
+        self,
+        audio_path: Union[str, Dict[str, Any]],
+        outdir: str,
+        offsets: List[Dict[str, Union[str, float]]],
+        segments: List[List[Dict[str, Union[str, float]]]],
+        minimum_chunk_duration: float = 1.0,
+        audio_store: Optional[AudioStore] = None,
+        sampling_rate: int = 16000,
+        audio_format: str = "wav",
+        sink: Optional[SegmentSink] = None,
+        **kwargs,
+    ) -> List[Dict[str, str]]:
+        """
+        Exports audio chunks and aligned TSV transcripts of `segments`.
+
+        Chunks are sliced by sample index from the mono audio array at
+        `sampling_rate`, which is only resampled if the source differs, and are
+        written as 16-bit PCM in-process, without spawning ffmpeg.
+        Chunks are written to `sink`, by default one audio and one TSV file per
+        chunk under `outdir` (see `DirectorySink`).
+
+        Args:
+            audio_path (Union[str, Dict[str, Any]]):
+                Path to audio file to chunk, or audio with `array`, `sampling_rate`
+                and `path` keys.
+            outdir (str):
+                Output directory to save chunked audio.
+                Per-region subfolders will be generated under this directory.
+            offsets (List[Dict[str, Union[str, float]]]):
+                List of phoneme offsets of the full audio.
+            segments (List[List[Dict[str, Union[str, float]]]]):
+                List of offsets for every segment.
+            minimum_chunk_duration (float, optional):
+                Minimum chunk duration (in seconds) to be exported.
+                Defaults to 1.0 second.
+            audio_store (Optional[AudioStore], optional):
+                Shared store of decoded audios. Defaults to `None`.
+            sampling_rate (int, optional):
+                Sampling rate of exported chunks. Defaults to `16000`.
+            audio_format (str, optional):
+                Format of exported chunks, either `"wav"` or `"flac"`.
+                Defaults to `"wav"`.
+            sink (Optional[SegmentSink], optional):
+                Output sink of chunks. Defaults to `None`, i.e. a `DirectorySink`
+                under `outdir`.
+
+        Returns:
+            List[Dict[str, str]]:
+                Manifest entries of the exported chunks.
+        """
+        if len(segments) == 0:
+            return [[{}]]
+
+        # Extract full transcript from offsets
+        full_transcript = " ".join(
+            [offset["text"] for offset in offsets if offset.get("text")]
+        )
+
+        array = self._load_array(audio_path, sampling_rate, audio_store)["array"]
+        if isinstance(audio_path, dict):
             audio_path = audio_path["path"]
 
         # add extra 50ms to end time to prevent clipping
-        extra_time_ms = 50
+        extra_time = 0.05
 
-        audio_segments: List[AudioSegment] = [
-            audio[
-                s[0]["start_time"]
-                * 1000 : min(s[-1]["end_time"] * 1000 + extra_time_ms, len(audio))
+        audio_segments: List[np.ndarray] = [
+            array[
+                round(s[0]["start_time"] * sampling_rate) : round(
+                    (s[-1]["end_time"] + extra_time) * sampling_rate
+                )
             ]
             for s in segments
         ]
@@ -96,32 +194,22 @@ class Segmenter:
         # shift segments based on their respective index start times
         shifted_segments = [self._shift_offsets(segment) for segment in segments]
 
-        # create output directory folder and subfolders
-        os.makedirs(get_outdir_path(audio_path, outdir), exist_ok=True)
+        if sink is None:
+            sink = DirectorySink(outdir, audio_format)
 
         segmented_manifest = []
         for idx, (segment, audio_segment) in enumerate(
             zip(shifted_segments, audio_segments)
         ):
             # skip export if audio segment does not meet minimum chunk duration
-            if len(audio_segment) < minimum_chunk_duration * 1000:
+            if len(audio_segment) < minimum_chunk_duration * sampling_rate:
                 continue
 
-            # export TSV transcripts and WAV audio segment
-            output_tsv_path = get_chunk_path(audio_path, outdir, idx, "tsv")
-            export_segment_transcripts_tsv(output_tsv_path, segment)
-
-            output_audio_path = get_chunk_path(audio_path, outdir, idx, "wav")
-            export_segment_audio_wav(output_audio_path, audio_segment)
+            # export audio segment and TSV transcripts
+            entry = sink.write(audio_path, idx, audio_segment, sampling_rate, segment)
 
-            # Include text and text_file fields in each manifest entry
-            segmented_manifest.append(
-                {
-                    "wav_path": output_audio_path,
-                    "tsv_path": output_tsv_path,
-                    "text": full_transcript,
-                }
-            )
+            # Include full transcript in each manifest entry
+            segmented_manifest.append({**entry, "text": full_transcript})
 
         return segmented_manifest
 
@@ -129,9 +217,10 @@ class Segmenter:
         self,
         segments: List[List[Dict[str, Union[str, float]]]],
         audio_path: str,
-        noise_classifier: AudioModule,
+        noise_classifier: AudioMultiLabelClassifier,
         noise_classifier_threshold: float,
         empty_tag: str = "<EMPTY>",
+        noise_classifier_batch_size: int = 1,
         **kwargs,
     ) -> List[List[Dict[str, Union[str, float]]]]:
         """
@@ -142,60 +231,141 @@ class Segmenter:
                 List of chunked segments with empty tag.
             audio_path (str):
                 Path to audio file to chunk.
-            noise_classifier (AudioModule):
+            noise_classifier (AudioMultiLabelClassifier):
                 Audio Module to perform noise classification.
             noise_classifier_threshold (float):
                 Minimum probability threshold for multi label classification.
             empty_tag (str, optional):
                 Special empty tag.
                 Defaults to `"<EMPTY>"`.
+            noise_classifier_batch_size (int, optional):
+                Batch size during noise classification. Defaults to `1`.
 
         Returns:
             List[List[Dict[str, Union[str, float]]]]:
                 Chunk segments with classified noise tags.
         """
-        pos, empty_tag_pos = 0, {}
-        for i, segment in enumerate(segments):
-            for j, offset in enumerate(segment):
-                if offset["text"] == empty_tag:
-                    empty_tag_pos[pos] = (i, j)
-                    pos += 1
-
-        # return original segments if no empty tags
-        if len(empty_tag_pos) == 0:
-            return segments
-
-        audio = AudioSegment.from_file(audio_path)
-        audio_arrays = [
-            {
-                "path": None,
-                "array": pydub_to_np(
-                    audio[offset["start_time"] * 1000 : offset["end_time"] * 1000]
-                ),
-                "sampling_rate": audio.frame_rate,
-            }
-            for segment in segments
-            for offset in segment
-            if offset["text"] == empty_tag
-        ]
+        for _ in self.classify_noise_batched(
+            [(audio_path, segments)],
+            noise_classifier,
+            noise_classifier_threshold,
+            empty_tag=empty_tag,
+            noise_classifier_batch_size=noise_classifier_batch_size,
+            num_workers=1,
+            **kwargs,
+        ):
+            pass
+        return segments
 
-        dataset = Dataset.from_dict({"audio": audio_arrays})
-        dataset = dataset.cast_column(
-            "audio", Audio(sampling_rate=noise_classifier.sampling_rate)
-        )
+    def classify_noise_batched(
+        self,
+        items: Iterable[Tuple[Union[str, Dict[str, Any]], List[List[Dict[str, Any]]]]],
+        noise_classifier: AudioMultiLabelClassifier,
+        noise_classifier_threshold: float,
+        empty_tag: str = "<EMPTY>",
+        noise_classifier_batch_size: int = 1,
+        window_size: Optional[int] = None,
+        num_workers: Optional[int] = None,
+        audio_store: Optional[AudioStore] = None,
+        **kwargs,
+    ) -> Iterator[Tuple[Union[str, Dict[str, Any]], List[List[Dict[str, Any]]]]]:
+        """
+        Classify empty tags as noise, across many audios at once.
 
-        outputs = noise_classifier.predict(
-            dataset, threshold=noise_classifier_threshold
-        )
+        Empty-tagged gaps of consecutive audios are collected in windows of at
+        least `window_size` gaps, sliced out of their audios (decoded once per
+        audio, in parallel), and classified together in full batches by a single
+        loaded `noise_classifier`. Labels are written back into the segments in place.
 
-        for idx, predictions in enumerate(outputs):
-            if len(predictions) > 0:
-                i, j = empty_tag_pos[idx]
-                offset = segments[i][j]
-                label = max(predictions, key=lambda item: item["score"])["label"]
-                offset["text"] = f"<{label}>"
+        Args:
+            items (Iterable[Tuple[Union[str, Dict], List[List[Dict]]]]):
+                Pairs of audio path (or audio) and its segments with empty tags,
+                as returned by `prepare_segments`.
+            noise_classifier (AudioMultiLabelClassifier):
+                Audio Module to perform noise classification.
+            noise_classifier_threshold (float):
+                Minimum probability threshold for multi label classification.
+            empty_tag (str, optional):
+                Special empty tag.
+                Defaults to `"<EMPTY>"`.
+            noise_classifier_batch_size (int, optional):
+                Batch size during noise classification. Defaults to `1`.
+            window_size (Optional[int], optional):
+                Minimum number of gaps classified together.
+                Defaults to `None`, i.e. `64 * noise_classifier_batch_size`.
+            num_workers (Optional[int], optional):
+                Number of threads decoding audios.
+                Defaults to `None`, i.e. the `ThreadPoolExecutor` default.
+            audio_store (Optional[AudioStore], optional):
+                Shared store of decoded audios. Defaults to `None`.
+
+        Yields:
+            Tuple[Union[str, Dict[str, Any]], List[List[Dict[str, Any]]]]:
+                `items`, in order, once their gaps have been classified.
+        """
+        window_size = window_size or 64 * noise_classifier_batch_size
+
+        def _gaps(segments: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            return [
+                offset
+                for segment in segments
+                for offset in segment
+                if offset["text"] == empty_tag
+            ]
 
-        return segments
+        def _gap_audios(item: Tuple[Any, List[List[Dict[str, Any]]]]):
+            audio_path, segments = item
+            gaps = _gaps(segments)
+            if len(gaps) == 0:
+                return []
+
+            # decoded (or fetched from the store) at the classifier's rate
+            audio = self._load_array(
+                audio_path, noise_classifier.sampling_rate, audio_store
+            )
+            sampling_rate = audio["sampling_rate"]
+            return [
+                {
+                    "array": audio["array"][
+                        round(gap["start_time"] * sampling_rate) : round(
+                            gap["end_time"] * sampling_rate
+                        )
+                    ],
+                    "sampling_rate": sampling_rate,
+                }
+                for gap in gaps
+            ]
+
+        def _classify(window: List[Tuple[Any, List[List[Dict[str, Any]]]]]):
+            gaps = [gap for _, segments in window for gap in _gaps(segments)]
+            if len(gaps) == 0:
+                return
+
+            audios = list(chain.from_iterable(executor.map(_gap_audios, window)))
+            probs = noise_classifier.predict_proba(
+                [{"audio": audio} for audio in audios],
+                batch_size=noise_classifier_batch_size,
+            )
+            labels = noise_classifier.top_labels(
+                probs, threshold=noise_classifier_threshold
+            )
+
+            for gap, label in zip(gaps, labels):
+                if label is not None:
+                    gap["text"] = f"<{label}>"
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            window, num_gaps = [], 0
+            for item in items:
+                window.append(item)
+                num_gaps += len(_gaps(item[1]))
+                if num_gaps >= window_size:
+                    _classify(window)
+                    yield from window
+                    window, num_gaps = [], 0
+
+            _classify(window)
+            yield from window
 
     def insert_empty_tags(
         self,
@@ -222,23 +392,12 @@ class Segmenter:
             List[List[Dict[str, Union[str, float]]]]:
                 Updated segments where empty tags have been inserted.
         """
-        for segment in segments:
-            gaps = [
-                round(next["start_time"] - curr["end_time"], 3)
-                for curr, next in zip(segment, segment[1:])
-            ]
-
-            for idx, gap in reversed(list(enumerate(gaps))):
-                if gap >= minimum_empty_duration:
-                    start_time = segment[idx]["end_time"]
-                    end_time = segment[idx + 1]["start_time"]
-                    empty_offset = {
-                        "text": empty_tag,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                    }
-                    segment.insert(idx + 1, empty_offset)
-        return segments
+        return [
+            Offsets.from_dicts(segment)
+            .insert_gaps(minimum_empty_duration, empty_tag)
+            .to_dicts()
+            for segment in segments
+        ]
 
     def _shift_offsets(
         self, offset: List[Dict[str, Union[str, float]]]
@@ -255,13 +414,18 @@ class Segmenter:
             List[Dict[str, Union[str, float]]]:
                 Shifted offsets.
         """
-        index_start = offset[0]["start_time"]
-        shifted_offset = [
-            {
-                "text": o["text"],
-                "start_time": round(o["start_time"] - index_start, 3),
-                "end_time": round(o["end_time"] - index_start, 3),
-            }
-            for o in offset
-        ]
-        return shifted_offset
+        return Offsets.from_dicts(offset).shift().to_dicts()
+
+    @staticmethod
+    def _load_array(
+        audio_path: Union[str, Dict[str, Any]],
+        sampling_rate: int,
+        audio_store: Optional[AudioStore] = None,
+    ) -> Dict[str, Any]:
+        if isinstance(audio_path, dict):
+            return resample_audios([audio_path], sampling_rate)[0]
+        if audio_store is not None:
+            return audio_store.get(audio_path, sampling_rate)
+        array, native_rate = decode_audio(audio_path)
+        audio = {"path": audio_path, "array": array, "sampling_rate": native_rate}
+        return resample_audios([audio], sampling_rate)[0]
@@ -14,6 +14,7 @@
 
 from typing import Dict, List, Union
 
+from ..utils.offsets import Offsets
 from .segmenter import Segmenter
 
 
@@ -83,17 +84,8 @@ class SilenceSegmenter(Segmenter):
             List[List[Dict[str, Union[str, float]]]]:
                 List of chunked/segmented offsets.
         """
-        # calculate gaps in between offsets
-        gaps = [
-            round(next["start_time"] - curr["end_time"], 3)
-            for curr, next in zip(offsets, offsets[1:])
-        ]
-        # generate segment slices (start and end indices) based on silence
-        slices = (
-            [0]
-            + [idx + 1 for idx, gap in enumerate(gaps) if gap >= silence_duration]
-            + [len(offsets)]
-        )
+        # generate segment slices (start and end indices) based on silence gaps
+        slices = Offsets.from_dicts(offsets).gap_boundaries(silence_duration).tolist()
         # group consecutive offsets (segments) based on slices
         segments = [offsets[i:j] for i, j in zip(slices, slices[1:])]
         return segments
@@ -12,21 +12,48 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from difflib import SequenceMatcher
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+from ..utils.alignment import equal_blocks
 from .segmenter import Segmenter
 
 
 class WordOverlapSegmenter(Segmenter):
+    def __init__(self, engine: str = "difflib"):
+        """
+        Word-overlap segmenter.
+
+        Args:
+            engine (str, optional):
+                Word alignment engine, either `"difflib"` or `"levenshtein"`.
+                See `speechline.utils.alignment.equal_blocks`.
+                Defaults to `"difflib"`.
+        """
+        self.engine = engine
+
     def normalize(self, text: str) -> str:
         text = text.lower().strip()
         return text
 
+    def prepare_reference(self, ground_truth: List[str]) -> Tuple[str, ...]:
+        """
+        Normalizes ground truth words.
+
+        Args:
+            ground_truth (List[str]):
+                List of ground truth words.
+
+        Returns:
+            Tuple[str, ...]:
+                Normalized ground truth words.
+        """
+        return tuple(self.normalize(g) for g in ground_truth)
+
     def chunk_offsets(
         self,
         offsets: List[Dict[str, Union[str, float]]],
         ground_truth: List[str],
+        reference: Optional[Tuple[str, ...]] = None,
         **kwargs,
     ) -> List[List[Dict[str, Union[str, float]]]]:
         """
@@ -65,15 +92,18 @@ class WordOverlapSegmenter(Segmenter):
                 Offsets to chunk.
             ground_truth (List[str]):
                 List of ground truth words to compare with offsets.
+            reference (Optional[Tuple[str, ...]], optional):
+                Shared output of `prepare_reference(ground_truth)`.
+                Defaults to `None`, i.e. prepared from `ground_truth`.
 
         Returns:
             List[List[Dict[str, Union[str, float]]]]:
                 List of chunked/segmented offsets.
         """
-        ground_truth = [self.normalize(g) for g in ground_truth]
+        if reference is None:
+            reference = self.prepare_reference(ground_truth)
         transcripts = [self.normalize(o["text"]) for o in offsets]
 
-        matcher = SequenceMatcher(None, transcripts, ground_truth)
-        idxs = [(i1, i2) for tag, i1, i2, *_ in matcher.get_opcodes() if tag == "equal"]
-        segments = [offsets[i:j] for (i, j) in idxs]
+        blocks = equal_blocks(transcripts, reference, engine=self.engine)
+        segments = [offsets[i:j] for (i, j, *_) in blocks]
         return segments
@@ -0,0 +1,147 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+from datasets import Audio, Features, Sequence, Value
+
+from ..utils.io import export_segment_audio
+from .sink import SegmentSink
+
+
+class ArrowShardSink(SegmentSink):
+    """
+    Writes chunks into size-bounded Arrow shards `{outdir}/shard-{n:06d}.arrow`,
+    holding encoded audio bytes, transcripts and offsets of every chunk.
+
+    Shards carry HuggingFace `datasets` features, so that they can be loaded
+    directly, without re-reading chunk files, e.g.
+    `concatenate_datasets([Dataset.from_file(shard) for shard in shards])`.
+
+    Args:
+        outdir (str):
+            Output directory.
+        audio_format (str, optional):
+            Format of encoded audio, either `"wav"` or `"flac"`. Defaults to `"wav"`.
+        max_shard_size_mb (float, optional):
+            Size (in megabytes) after which a new shard is started.
+            Defaults to `1024`.
+        batch_size (int, optional):
+            Number of chunks per written record batch. Defaults to `64`.
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        audio_format: str = "wav",
+        max_shard_size_mb: float = 1024,
+        batch_size: int = 64,
+    ) -> None:
+        self.outdir = outdir
+        self.audio_format = audio_format
+        self.max_shard_size = int(max_shard_size_mb * 1024 * 1024)
+        self.batch_size = batch_size
+        self.num_shards = 0
+        self.features = Features(
+            {
+                "id": Value("string"),
+                "language": Value("string"),
+                "audio": Audio(),
+                "text": Value("string"),
+                "offsets": Sequence(
+                    {
+                        "text": Value("string"),
+                        "start_time": Value("float64"),
+                        "end_time": Value("float64"),
+                    }
+                ),
+            }
+        )
+        self._rows: List[Dict[str, Any]] = []
+        self._writer: Optional[pa.RecordBatchStreamWriter] = None
+        self._sink: Optional[pa.OSFile] = None
+        self._shard_path: Optional[str] = None
+        self._lock = Lock()
+        os.makedirs(outdir, exist_ok=True)
+
+    def write(
+        self,
+        audio_path: str,
+        idx: int,
+        array: np.ndarray,
+        sampling_rate: int,
+        segment: List[Dict[str, Union[str, float]]],
+    ) -> Dict[str, Any]:
+        key = self.chunk_key(audio_path, idx)
+        language, utt_id = os.path.split(key)
+        buffer = io.BytesIO()
+        export_segment_audio(buffer, array, sampling_rate, self.audio_format)
+        row = {
+            "id": utt_id,
+            "language": language,
+            "audio": {
+                "bytes": buffer.getvalue(),
+                "path": f"{utt_id}.{self.audio_format}",
+            },
+            "text": " ".join(offset["text"] for offset in segment),
+            "offsets": {
+                "text": [offset["text"] for offset in segment],
+                "start_time": [offset["start_time"] for offset in segment],
+                "end_time": [offset["end_time"] for offset in segment],
+            },
+        }
+
+        with self._lock:
+            if self._writer is None:
+                self._open()
+            self._rows.append(row)
+            shard_path = self._shard_path
+            if len(self._rows) >= self.batch_size:
+                self._flush()
+        return {"shard_path": shard_path, "key": key}
+
+    def _open(self) -> None:
+        self._shard_path = os.path.join(
+            self.outdir, f"shard-{self.num_shards:06d}.arrow"
+        )
+        self._sink = pa.OSFile(self._shard_path, "wb")
+        self._writer = pa.ipc.new_stream(self._sink, self.features.arrow_schema)
+        self.num_shards += 1
+
+    def _flush(self) -> None:
+        if self._rows:
+            batch = pa.RecordBatch.from_pylist(
+                self._rows, schema=self.features.arrow_schema
+            )
+            self._writer.write_batch(batch)
+            self._rows = []
+        if self._sink.tell() >= self.max_shard_size:
+            self._close_shard()
+
+    def _close_shard(self) -> None:
+        self._writer.close()
+        self._sink.close()
+        self._writer = self._sink = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._flush()
+            if self._writer is not None:
+                self._close_shard()
@@ -0,0 +1,83 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from ..utils.io import (
+    export_segment_audio,
+    export_segment_transcripts_tsv,
+    get_chunk_path,
+    get_outdir_path,
+)
+from .sink import SegmentSink
+
+
+class DirectorySink(SegmentSink):
+    """
+    Writes every chunk as an audio file and a TSV transcript file,
+    under `{outdir}/{lang}/{utt_id}-{idx}.{extension}`.
+
+    Args:
+        outdir (str):
+            Output directory.
+        audio_format (str, optional):
+            Format of audio files, either `"wav"` or `"flac"`. Defaults to `"wav"`.
+    """
+
+    def __init__(self, outdir: str, audio_format: str = "wav") -> None:
+        self.outdir = outdir
+        self.audio_format = audio_format
+
+    def write_audio(
+        self, audio_path: str, idx: int, array: np.ndarray, sampling_rate: int
+    ) -> str:
+        """
+        Writes the audio file of a chunk.
+
+        Args:
+            audio_path (str):
+                Path to the source audio file.
+            idx (int):
+                Index of chunk in the source audio.
+            array (np.ndarray):
+                1D `float32` audio array of the chunk.
+            sampling_rate (int):
+                Sampling rate of `array`.
+
+        Returns:
+            str:
+                Path to the written audio file.
+        """
+        os.makedirs(get_outdir_path(audio_path, self.outdir), exist_ok=True)
+        output_audio_path = get_chunk_path(
+            audio_path, self.outdir, idx, self.audio_format
+        )
+        export_segment_audio(output_audio_path, array, sampling_rate, self.audio_format)
+        return output_audio_path
+
+    def write(
+        self,
+        audio_path: str,
+        idx: int,
+        array: np.ndarray,
+        sampling_rate: int,
+        segment: List[Dict[str, Union[str, float]]],
+    ) -> Dict[str, Any]:
+        output_audio_path = self.write_audio(audio_path, idx, array, sampling_rate)
+        output_tsv_path = get_chunk_path(audio_path, self.outdir, idx, "tsv")
+        export_segment_transcripts_tsv(output_tsv_path, segment)
+        return {"wav_path": output_audio_path, "tsv_path": output_tsv_path}
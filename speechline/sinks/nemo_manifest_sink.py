@@ -0,0 +1,74 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from threading import Lock
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from .directory_sink import DirectorySink
+
+
+class NemoManifestSink(DirectorySink):
+    """
+    Writes every chunk as an audio file under `{outdir}/{lang}/`, and appends it
+    to a JSON-lines [NeMo](https://github.com/NVIDIA/NeMo) manifest, with
+    `audio_filepath`, `duration` and `text` fields. Chunk transcripts are kept
+    in the manifest, instead of separate TSV files.
+
+    Args:
+        outdir (str):
+            Output directory.
+        audio_format (str, optional):
+            Format of audio files, either `"wav"` or `"flac"`. Defaults to `"wav"`.
+        manifest_name (str, optional):
+            Name of manifest file under `outdir`. Defaults to `"manifest.jsonl"`.
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        audio_format: str = "wav",
+        manifest_name: str = "manifest.jsonl",
+    ) -> None:
+        super().__init__(outdir, audio_format)
+        self.manifest_path = os.path.join(outdir, manifest_name)
+        os.makedirs(outdir, exist_ok=True)
+        self._file = open(self.manifest_path, "w")
+        self._lock = Lock()
+
+    def write(
+        self,
+        audio_path: str,
+        idx: int,
+        array: np.ndarray,
+        sampling_rate: int,
+        segment: List[Dict[str, Union[str, float]]],
+    ) -> Dict[str, Any]:
+        output_audio_path = self.write_audio(audio_path, idx, array, sampling_rate)
+        entry = {
+            "audio_filepath": output_audio_path,
+            "duration": len(array) / sampling_rate,
+            "text": " ".join(offset["text"] for offset in segment),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+        return {"wav_path": output_audio_path}
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
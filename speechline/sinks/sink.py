@@ -0,0 +1,89 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from ..utils.io import get_chunk_path
+
+
+class SegmentSink(ABC):
+    """
+    Base class of segment output sinks, receiving the audio chunks and
+    transcripts exported by `Segmenter.export_segments`.
+
+    Sinks may be written to concurrently by several segmentation workers,
+    and must be closed once all chunks are written.
+    """
+
+    @abstractmethod
+    def write(
+        self,
+        audio_path: str,
+        idx: int,
+        array: np.ndarray,
+        sampling_rate: int,
+        segment: List[Dict[str, Union[str, float]]],
+    ) -> Dict[str, Any]:
+        """
+        Writes an audio chunk and its transcript.
+
+        Args:
+            audio_path (str):
+                Path to the source audio file.
+            idx (int):
+                Index of chunk in the source audio.
+            array (np.ndarray):
+                1D `float32` audio array of the chunk.
+            sampling_rate (int):
+                Sampling rate of `array`.
+            segment (List[Dict[str, Union[str, float]]]):
+                Offsets of the chunk, relative to its start.
+
+        Returns:
+            Dict[str, Any]:
+                Manifest entry of the written chunk.
+        """
+
+    def close(self) -> None:
+        """
+        Flushes and closes all outputs of the sink.
+        """
+        pass
+
+    @staticmethod
+    def chunk_key(audio_path: str, idx: int) -> str:
+        """
+        Generates the key of a chunk, i.e. `{lang}/{utt_id}-{idx}`.
+
+        Args:
+            audio_path (str):
+                Path to the source audio file.
+            idx (int):
+                Index of chunk in the source audio.
+
+        Returns:
+            str:
+                Key of chunk.
+        """
+        return os.path.splitext(get_chunk_path(audio_path, "", idx, "wav"))[0]
+
+    def __enter__(self) -> "SegmentSink":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,94 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import tarfile
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from ..utils.io import export_segment_audio, format_segment_transcripts_tsv
+from .sink import SegmentSink
+
+
+class TarShardSink(SegmentSink):
+    """
+    Writes chunks into size-bounded, WebDataset-style tar shards
+    `{outdir}/shard-{n:06d}.tar`. Every chunk is stored as
+    `{lang}/{utt_id}-{idx}.{audio_format}` and `{lang}/{utt_id}-{idx}.tsv` members.
+
+    Args:
+        outdir (str):
+            Output directory.
+        audio_format (str, optional):
+            Format of audio members, either `"wav"` or `"flac"`. Defaults to `"wav"`.
+        max_shard_size_mb (float, optional):
+            Size (in megabytes) after which a new shard is started.
+            Defaults to `1024`.
+    """
+
+    def __init__(
+        self, outdir: str, audio_format: str = "wav", max_shard_size_mb: float = 1024
+    ) -> None:
+        self.outdir = outdir
+        self.audio_format = audio_format
+        self.max_shard_size = int(max_shard_size_mb * 1024 * 1024)
+        self.num_shards = 0
+        self._tar: Optional[tarfile.TarFile] = None
+        self._shard_path: Optional[str] = None
+        self._lock = Lock()
+        os.makedirs(outdir, exist_ok=True)
+
+    def _add(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def write(
+        self,
+        audio_path: str,
+        idx: int,
+        array: np.ndarray,
+        sampling_rate: int,
+        segment: List[Dict[str, Union[str, float]]],
+    ) -> Dict[str, Any]:
+        key = self.chunk_key(audio_path, idx)
+        buffer = io.BytesIO()
+        export_segment_audio(buffer, array, sampling_rate, self.audio_format)
+        tsv = format_segment_transcripts_tsv(segment).encode()
+
+        with self._lock:
+            if self._tar is None or self._tar.offset >= self.max_shard_size:
+                self._rotate()
+            self._add(f"{key}.{self.audio_format}", buffer.getvalue())
+            self._add(f"{key}.tsv", tsv)
+            shard_path = self._shard_path
+        return {"shard_path": shard_path, "key": key}
+
+    def _rotate(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+        self._shard_path = os.path.join(
+            self.outdir, f"shard-{self.num_shards:06d}.tar"
+        )
+        self._tar = tarfile.open(self._shard_path, "w")
+        self.num_shards += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._tar is not None:
+                self._tar.close()
+                self._tar = None
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Union
 
 import torch
 from datasets import Dataset
@@ -27,10 +27,31 @@ class Wav2Vec2Transcriber(AudioTranscriber):
     Args:
         model_checkpoint (str):
             HuggingFace model hub checkpoint.
+        torch_dtype (str, optional):
+            PyTorch model dtype, e.g. `"float16"`. Defaults to `None`.
+        backend (str, optional):
+            Inference backend, either `"pytorch"` or `"onnx"`. Defaults to `"pytorch"`.
+        quantize (bool, optional):
+            Whether to quantize the ONNX model to int8. Defaults to `False`.
+        onnx_dir (str, optional):
+            Directory to save and reuse exported ONNX models. Defaults to `None`.
     """
 
-    def __init__(self, model_checkpoint: str, torch_dtype: str = None) -> None:
-        super().__init__(model_checkpoint, getattr(torch, torch_dtype) if torch_dtype else None)
+    def __init__(
+        self,
+        model_checkpoint: str,
+        torch_dtype: str = None,
+        backend: str = "pytorch",
+        quantize: bool = False,
+        onnx_dir: str = None,
+    ) -> None:
+        super().__init__(
+            model_checkpoint,
+            getattr(torch, torch_dtype) if torch_dtype else None,
+            backend=backend,
+            quantize=quantize,
+            onnx_dir=onnx_dir,
+        )
 
     def predict(
         self,
@@ -39,7 +60,15 @@ class Wav2Vec2Transcriber(AudioTranscriber):
         output_offsets: bool = False,
         return_timestamps: str = "word",
         keep_whitespace: bool = False,
-    ) -> Union[List[str], List[List[Dict[str, Union[str, float]]]]]:
+        stream: bool = False,
+        batch_size: int = 1,
+        pack_length_s: float = 0,
+        cache_dir: str = None,
+    ) -> Union[
+        List[str],
+        List[List[Dict[str, Union[str, float]]]],
+        Iterator[Union[str, List[Dict[str, Union[str, float]]]]],
+    ]:
         """
         Performs inference on `dataset`.
 
@@ -54,11 +83,22 @@ class Wav2Vec2Transcriber(AudioTranscriber):
                 Returned timestamp level. Defaults to `"word"`.
             keep_whitespace (bool, optional):
                 Whether to presere whitespace predictions. Defaults to `False`.
+            stream (bool, optional):
+                Whether to lazily yield predictions in order. Defaults to `False`.
+            batch_size (int, optional):
+                Inference batch size, over duration-sorted utterances.
+                Defaults to `1`.
+            pack_length_s (float, optional):
+                If non-zero, consecutive short audios are packed into a single
+                model input of up to `pack_length_s` seconds. Defaults to `0`.
+            cache_dir (str, optional):
+                Path to a transcription cache directory. Defaults to `None`.
 
         Returns:
             Union[List[str], List[List[Dict[str, Union[str, float]]]]]:
                 Defaults to list of transcriptions.
                 If `output_offsets` is `True`, return list of offsets.
+                If `stream` is `True`, return an iterator instead of a list.
 
         ### Example
         ```pycon title="example_transcriber_predict.py"
@@ -95,4 +135,8 @@ class Wav2Vec2Transcriber(AudioTranscriber):
             offset_key="text",
             return_timestamps=return_timestamps,
             keep_whitespace=keep_whitespace,
+            stream=stream,
+            batch_size=batch_size,
+            pack_length_s=pack_length_s,
+            cache_dir=cache_dir,
         )
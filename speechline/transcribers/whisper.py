@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Union
 
 import torch
 from datasets import Dataset
@@ -39,7 +39,14 @@ class WhisperTranscriber(AudioTranscriber):
         output_offsets: bool = False,
         return_timestamps: bool = True,
         keep_whitespace: bool = False,
-    ) -> Union[List[str], List[List[Dict[str, Union[str, float]]]]]:
+        stream: bool = False,
+        batch_size: int = 1,
+        cache_dir: str = None,
+    ) -> Union[
+        List[str],
+        List[List[Dict[str, Union[str, float]]]],
+        Iterator[Union[str, List[Dict[str, Union[str, float]]]]],
+    ]:
         """
         Performs inference on `dataset`.
 
@@ -54,11 +61,19 @@ class WhisperTranscriber(AudioTranscriber):
                 Returned timestamp level. Defaults to `True`.
             keep_whitespace (bool, optional):
                 Whether to presere whitespace predictions. Defaults to `False`.
+            stream (bool, optional):
+                Whether to lazily yield predictions in order. Defaults to `False`.
+            batch_size (int, optional):
+                Inference batch size, over duration-sorted utterances.
+                Defaults to `1`.
+            cache_dir (str, optional):
+                Path to a transcription cache directory. Defaults to `None`.
 
         Returns:
             Union[List[str], List[List[Dict[str, Union[str, float]]]]]:
                 Defaults to list of transcriptions.
                 If `output_offsets` is `True`, return list of text offsets.
+                If `stream` is `True`, return an iterator instead of a list.
 
         ### Example
         ```pycon title="example_transcriber_predict.py"
@@ -91,5 +106,8 @@ class WhisperTranscriber(AudioTranscriber):
             offset_key="text",
             return_timestamps=return_timestamps,
             keep_whitespace=keep_whitespace,
+            stream=stream,
+            batch_size=batch_size,
+            cache_dir=cache_dir,
             generate_kwargs={"max_new_tokens": 448},
         )
@@ -0,0 +1,187 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Collection, Dict, Hashable, List, Sequence, Tuple
+
+import Levenshtein
+import numpy as np
+
+SUPPORTED_ENGINES = {"difflib", "levenshtein"}
+
+
+def intern_tokens(*sequences: Sequence[Hashable]) -> List[List[int]]:
+    """
+    Interns tokens of all `sequences` into integer ids of a shared vocabulary,
+    so that equal tokens share the same id.
+
+    Args:
+        *sequences (Sequence[Hashable]):
+            Token sequences.
+
+    Returns:
+        List[List[int]]:
+            Token ids of every sequence.
+    """
+    vocab: Dict[Hashable, int] = {}
+    return [[vocab.setdefault(token, len(vocab)) for token in seq] for seq in sequences]
+
+
+def equal_blocks(
+    a: Sequence[Hashable], b: Sequence[Hashable], engine: str = "difflib"
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Aligns two token sequences, and returns their `"equal"` opcode blocks.
+
+    Tokens are interned to integer ids before alignment. The `"difflib"` engine
+    runs `difflib.SequenceMatcher` (with its default junk heuristic) on the ids,
+    and returns exactly its blocks. The `"levenshtein"` engine runs the minimal
+    edit script of the `Levenshtein` C extension, which is much faster on long
+    sequences and is not affected by the junk heuristic, but may resolve ties
+    differently.
+
+    ### Example
+    ```pycon title="example_equal_blocks.py"
+    >>> from speechline.utils.alignment import equal_blocks
+    >>> equal_blocks(["her", "red", "umbrella", "is"], ["red", "umbrella", "just"])
+    [(1, 3, 0, 2)]
+    ```
+
+    Args:
+        a (Sequence[Hashable]):
+            Source tokens.
+        b (Sequence[Hashable]):
+            Target tokens.
+        engine (str, optional):
+            Alignment engine, either `"difflib"` or `"levenshtein"`.
+            Defaults to `"difflib"`.
+
+    Raises:
+        ValueError: Unsupported engine.
+
+    Returns:
+        List[Tuple[int, int, int, int]]:
+            `(i1, i2, j1, j2)` of every block where `a[i1:i2] == b[j1:j2]`.
+    """
+    if engine not in SUPPORTED_ENGINES:
+        raise ValueError(f"Alignment engine {engine} is not supported!")
+
+    ids_a, ids_b = intern_tokens(a, b)
+    if engine == "difflib":
+        opcodes = SequenceMatcher(None, ids_a, ids_b).get_opcodes()
+    else:
+        opcodes = Levenshtein.opcodes(ids_a, ids_b)
+    return [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in opcodes if tag == "equal"]
+
+
+def align_variants(
+    a: Sequence[int], b_variants: Sequence[Collection[int]]
+) -> List[Tuple[int, int]]:
+    """
+    Aligns tokens `a` to a sequence of token variant sets `b_variants` with
+    longest-common-subsequence dynamic programming, where `a[i]` matches
+    `b_variants[j]` if it is one of its variants.
+
+    Every row of the DP table is computed in one vectorized pass, as the running
+    maximum of its candidate values, in O(len(a) * len(b_variants)) time.
+    Since rows are non-decreasing by steps of one, they are stored as packed
+    increment bits, i.e. one bit per cell.
+
+    ### Example
+    ```pycon title="example_align_variants.py"
+    >>> from speechline.utils.alignment import align_variants
+    >>> align_variants([0, 5, 2, 3], [{0, 1}, {2}, {3, 4}])
+    [(0, 0), (2, 1), (3, 2)]
+    ```
+
+    Args:
+        a (Sequence[int]):
+            Token ids.
+        b_variants (Sequence[Collection[int]]):
+            Variant token ids of every position.
+
+    Returns:
+        List[Tuple[int, int]]:
+            Matched `(i, j)` index pairs of a maximum alignment, in order.
+    """
+    n, m = len(a), len(b_variants)
+    if n == 0 or m == 0:
+        return []
+
+    # inverted index of variants: token id -> positions accepting it
+    index = defaultdict(list)
+    for j, variants in enumerate(b_variants):
+        for token in variants:
+            index[token].append(j)
+    positions = {token: np.array(js) for token, js in index.items()}
+
+    # bits[i, j] is set where row `i` increments from column `j` to `j + 1`
+    bits = np.zeros((n + 1, (m + 7) // 8), dtype=np.uint8)
+    prev = np.zeros(m + 1, dtype=np.int32)
+    row = np.zeros(m + 1, dtype=np.int32)
+    match = np.zeros(m, dtype=np.int32)
+    for i, token in enumerate(a, start=1):
+        js = positions.get(token)
+        if js is None:
+            # no match, row is unchanged
+            bits[i] = bits[i - 1]
+            continue
+        match[:] = 0
+        match[js] = 1
+        np.maximum.accumulate(np.maximum(prev[1:], prev[:-1] + match), out=row[1:])
+        bits[i] = np.packbits(row[1:] > row[:-1])
+        prev, row = row, prev
+
+    def _row(i: int) -> np.ndarray:
+        increments = np.unpackbits(bits[i], count=m)
+        return np.concatenate(([0], np.cumsum(increments)))
+
+    pairs = []
+    i, j = n, m
+    current = _row(i)
+    while i > 0 and j > 0:
+        above = _row(i - 1)
+        while j > 0 and current[j] != above[j]:
+            if current[j] == current[j - 1]:
+                j -= 1
+            else:
+                # row increments only on a match: a[i - 1] matches position j - 1
+                pairs.append((i - 1, j - 1))
+                j -= 1
+                break
+        i -= 1
+        current = above
+    return pairs[::-1]
+
+
+def consecutive_runs(indices: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    Collapses sorted indices into maximal runs of consecutive indices.
+
+    Args:
+        indices (Sequence[int]):
+            Sorted, unique indices.
+
+    Returns:
+        List[Tuple[int, int]]:
+            `(start, end)` slice bounds of every run.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = indices[np.concatenate(([0], breaks))]
+    ends = indices[np.concatenate((breaks - 1, [indices.size - 1]))] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
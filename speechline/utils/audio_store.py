@@ -0,0 +1,188 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict, defaultdict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+from .io import pydub_to_np
+from .resample import resample_batch
+
+
+def decode_audio(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Decodes an audio file at its native sampling rate, downmixed to mono.
+    Files are decoded in-process with `soundfile`, and only formats it can't read
+    (e.g. AAC) are decoded through `pydub`, i.e. an ffmpeg subprocess.
+
+    Args:
+        path (str):
+            Path to audio file.
+
+    Returns:
+        Tuple[np.ndarray, int]:
+            `float32` audio array in range `[-1.0, 1.0]`, and its sampling rate.
+    """
+    try:
+        array, sampling_rate = sf.read(path, dtype="float32", always_2d=True)
+    except sf.LibsndfileError:
+        audio = AudioSegment.from_file(path)
+        array, sampling_rate = pydub_to_np(audio), audio.frame_rate
+
+    # downmix to mono
+    array = array.mean(axis=1) if array.shape[1] > 1 else array[:, 0]
+    return np.ascontiguousarray(array, dtype=np.float32), sampling_rate
+
+
+class AudioStore:
+    """
+    Thread-safe store of decoded audios, keyed by `(path, sampling_rate)`,
+    shared by all pipeline stages.
+
+    Every file is decoded once at its native sampling rate, and resampled once per
+    requested sampling rate from its cached native decode. Decoded audios are kept
+    in a least-recently-used cache bounded by `max_size_mb`.
+    Returned arrays are shared with the cache and must not be modified in place.
+
+    Args:
+        max_size_mb (float, optional):
+            Maximum total size of cached audio arrays, in megabytes.
+            Defaults to `1024`.
+
+    Attributes:
+        num_decodes (int):
+            Number of files decoded.
+        num_hits (int):
+            Number of audios served from the cache.
+    """
+
+    def __init__(self, max_size_mb: float = 1024) -> None:
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.size = 0
+        self.num_decodes = 0
+        self.num_hits = 0
+        # (path, requested sampling rate) -> (array, sampling rate)
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # locks can't be pickled, e.g. when datasets fingerprints transforms
+        return {k: v for k, v in self.__dict__.items() if k != "_lock"}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def _lookup(
+        self, key: Tuple[str, Optional[int]]
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.num_hits += 1
+            return entry
+
+    def _insert(
+        self, key: Tuple[str, Optional[int]], entry: Tuple[np.ndarray, int]
+    ) -> None:
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = entry
+            self.size += entry[0].nbytes
+            # evict least-recently-used audios, always keeping the newest one
+            while self.size > self.max_size and len(self._cache) > 1:
+                _, (evicted, _) = self._cache.popitem(last=False)
+                self.size -= evicted.nbytes
+
+    def _native(self, path: str) -> Tuple[np.ndarray, int]:
+        entry = self._lookup((path, None))
+        if entry is None:
+            entry = decode_audio(path)
+            with self._lock:
+                self.num_decodes += 1
+            self._insert((path, None), entry)
+        return entry
+
+    def get(self, path: str, sampling_rate: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Gets a decoded audio.
+
+        Args:
+            path (str):
+                Path to audio file.
+            sampling_rate (Optional[int], optional):
+                Target sampling rate. Defaults to `None`, i.e. the native rate.
+
+        Returns:
+            Dict[str, Any]:
+                Audio with `path`, `array` and `sampling_rate` keys.
+        """
+        return self.get_batch([path], sampling_rate)[0]
+
+    def get_batch(
+        self, paths: Sequence[str], sampling_rate: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Gets decoded audios. Audios missing at `sampling_rate` are resampled
+        from their native decodes in batches, one per native sampling rate.
+
+        Args:
+            paths (Sequence[str]):
+                Paths to audio files.
+            sampling_rate (Optional[int], optional):
+                Target sampling rate. Defaults to `None`, i.e. native rates.
+
+        Returns:
+            List[Dict[str, Any]]:
+                Audios with `path`, `array` and `sampling_rate` keys, in order.
+        """
+        arrays: List[Optional[np.ndarray]] = [None] * len(paths)
+        rates: List[Optional[int]] = [sampling_rate] * len(paths)
+        misses = defaultdict(list)
+
+        for idx, path in enumerate(paths):
+            entry = self._lookup((path, sampling_rate)) if sampling_rate else None
+            if entry is None:
+                entry = self._native(path)
+                if sampling_rate is not None and entry[1] != sampling_rate:
+                    misses[entry[1]].append((idx, entry[0]))
+                    continue
+            arrays[idx], rates[idx] = entry
+
+        for native_rate, items in misses.items():
+            indices, natives = zip(*items)
+            for idx, array in zip(
+                indices, resample_batch(natives, native_rate, sampling_rate)
+            ):
+                arrays[idx] = array
+                self._insert((paths[idx], sampling_rate), (array, sampling_rate))
+
+        return [
+            {"path": path, "array": array, "sampling_rate": rate}
+            for path, array, rate in zip(paths, arrays, rates)
+        ]
+
+    def clear(self) -> None:
+        """
+        Removes all cached audios.
+        """
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
@@ -0,0 +1,334 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+
+class TranscriptionCache:
+    """
+    Content-addressed, on-disk cache of transcriber outputs.
+
+    Entries are keyed by the SHA-256 hash of the audio samples, the model
+    checkpoint and its revision, and the inference parameters. Two kinds of
+    entries are stored under `cache_dir/{key[:2]}/`:
+
+    - `{key}.npz`: compressed frame-level CTC emissions (log-probabilities),
+      which only depend on the audio, model and chunking parameters.
+    - `{key}.json.gz`: gzipped pipeline outputs (transcript and timestamps),
+      which additionally depend on the decoding parameters.
+
+    Args:
+        cache_dir (str):
+            Path to cache directory.
+        model_id (str):
+            Model checkpoint identifier, including its revision.
+    """
+
+    # weight files fingerprinted for local checkpoints without a revision
+    WEIGHT_SUFFIXES = {".bin", ".safetensors", ".onnx", ".onnx_data", ".pt", ".pth"}
+
+    def __init__(self, cache_dir: str, model_id: str) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.model_id = model_id
+
+    @classmethod
+    def make_model_id(cls, model_checkpoint: str, revision: Optional[str]) -> str:
+        """
+        Builds the identifier of a model checkpoint at its revision.
+
+        HuggingFace Hub checkpoints are identified by their commit hash. Local
+        checkpoints have none, and are instead identified by the names, sizes and
+        modification times of their weight files, so that cached outputs of
+        retrained or re-exported weights are not reused.
+
+        Args:
+            model_checkpoint (str):
+                HuggingFace Hub model checkpoint, or path to a local model directory.
+            revision (Optional[str]):
+                Commit hash of the checkpoint, if any.
+
+        Returns:
+            str:
+                Model checkpoint identifier.
+        """
+        path = Path(model_checkpoint)
+        if revision is None and path.is_dir():
+            digest = hashlib.sha256()
+            for weights in sorted(path.iterdir()):
+                if weights.suffix in cls.WEIGHT_SUFFIXES and weights.is_file():
+                    stat = weights.stat()
+                    digest.update(f"{weights.name}:{stat.st_size}:".encode())
+                    digest.update(f"{stat.st_mtime_ns}\n".encode())
+            revision = digest.hexdigest()
+        return f"{model_checkpoint}@{revision}"
+
+    @staticmethod
+    def hash_audio(audio: Dict[str, Any]) -> str:
+        """
+        Hashes the samples and sampling rate of an audio.
+
+        Args:
+            audio (Dict[str, Any]):
+                Audio with `array` and `sampling_rate` keys.
+
+        Returns:
+            str:
+                Hex digest of the audio.
+        """
+        array = np.ascontiguousarray(audio["array"], dtype=np.float32)
+        digest = hashlib.sha256(array.tobytes())
+        digest.update(str(audio["sampling_rate"]).encode())
+        return digest.hexdigest()
+
+    def key(self, audio_hash: str, params: Dict[str, Any]) -> str:
+        """
+        Computes the cache key of an audio under the given parameters.
+
+        Args:
+            audio_hash (str):
+                Audio hash, see `hash_audio`.
+            params (Dict[str, Any]):
+                JSON-serializable parameters affecting the cached value.
+
+        Returns:
+            str:
+                Cache key.
+        """
+        payload = json.dumps(
+            [audio_hash, self.model_id, params], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # write atomically, so that concurrent runs never read partial entries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load_emissions(self, key: str) -> Optional[np.ndarray]:
+        """
+        Loads cached emissions.
+
+        Args:
+            key (str):
+                Cache key.
+
+        Returns:
+            Optional[np.ndarray]:
+                Emissions of shape `(frames, vocab_size)`, or `None` if not cached.
+        """
+        path = self._path(key, ".npz")
+        if not path.exists():
+            return None
+        with np.load(path) as f:
+            return f["emissions"]
+
+    def save_emissions(self, key: str, emissions: np.ndarray) -> None:
+        """
+        Saves emissions, compressed.
+
+        Args:
+            key (str):
+                Cache key.
+            emissions (np.ndarray):
+                Emissions of shape `(frames, vocab_size)`.
+        """
+        path = self._path(key, ".npz")
+        with tempfile.TemporaryFile() as f:
+            np.savez_compressed(f, emissions=emissions)
+            f.seek(0)
+            self._write(path, f.read())
+
+    def load_output(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads a cached pipeline output.
+
+        Args:
+            key (str):
+                Cache key.
+
+        Returns:
+            Optional[Dict[str, Any]]:
+                Pipeline output, or `None` if not cached.
+        """
+        path = self._path(key, ".json.gz")
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            output = json.load(f)
+        # JSON has no tuples, restore pipeline timestamps
+        for chunk in output.get("chunks", []):
+            chunk["timestamp"] = tuple(chunk["timestamp"])
+        return output
+
+    def save_output(self, key: str, output: Dict[str, Union[str, Any]]) -> None:
+        """
+        Saves a pipeline output, gzipped.
+
+        Args:
+            key (str):
+                Cache key.
+            output (Dict[str, Union[str, Any]]):
+                Pipeline output with `text` and optionally `chunks` keys.
+        """
+        output = {k: v for k, v in output.items() if k in ("text", "chunks")}
+        data = json.dumps(output, ensure_ascii=False).encode("utf-8")
+        self._write(self._path(key, ".json.gz"), gzip.compress(data))
+
+
+class G2PCache:
+    """
+    Thread-safe, memoized grapheme-to-phoneme conversions, keyed by
+    `(language, word)`, shared by all segmentation workers.
+
+    Conversions are kept in a bounded least-recently-used cache, and optionally
+    persisted to a SQLite database at `cache_path`, so that they are reused
+    across runs. List outputs are stored as tuples, since cached outputs are
+    shared between callers.
+
+    Args:
+        max_size (int, optional):
+            Maximum number of conversions kept in memory. Defaults to `100000`.
+        cache_path (Optional[str], optional):
+            Path to a SQLite database of persisted conversions.
+            Defaults to `None`, i.e. in-memory only.
+
+    Attributes:
+        num_hits (int):
+            Number of conversions served from the cache, in memory or on disk.
+        num_misses (int):
+            Number of conversions computed by the G2P function.
+    """
+
+    def __init__(self, max_size: int = 100000, cache_path: Optional[str] = None):
+        self.max_size = max_size
+        self.num_hits = 0
+        self.num_misses = 0
+        self._cache: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self.cache_path = cache_path
+        self._lock = Lock()
+        self._db = self._connect(cache_path)
+
+    @staticmethod
+    def _connect(cache_path: Optional[str]) -> Optional[sqlite3.Connection]:
+        if not cache_path:
+            return None
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(cache_path, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS g2p "
+            "(language TEXT, word TEXT, phonemes TEXT, PRIMARY KEY (language, word))"
+        )
+        db.commit()
+        return db
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # locks and connections can't be pickled, e.g. to worker processes
+        return {k: v for k, v in self.__dict__.items() if k not in ("_lock", "_db")}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+        self._db = self._connect(self.cache_path)
+
+    @staticmethod
+    def _freeze(phonemes: Any) -> Any:
+        return tuple(phonemes) if isinstance(phonemes, list) else phonemes
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Any]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.num_hits += 1
+                return self._cache[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT phonemes FROM g2p WHERE language = ? AND word = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self.num_hits += 1
+        phonemes = self._freeze(json.loads(row[0]))
+        self._insert(key, phonemes)
+        return phonemes
+
+    def _insert(self, key: Tuple[str, str], phonemes: Any) -> None:
+        with self._lock:
+            self._cache[key] = phonemes
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def get(self, language: str, word: str, g2p: Callable[[str], Any]) -> Any:
+        """
+        Gets the phonemes of `word`, converting it with `g2p` on cache misses.
+
+        Args:
+            language (str):
+                Language of `word`, part of the cache key.
+            word (str):
+                Normalized word.
+            g2p (Callable[[str], Any]):
+                G2P function, called on cache misses.
+
+        Returns:
+            Any:
+                Output of `g2p(word)`, with lists converted to tuples.
+        """
+        key = (language, word)
+        phonemes = self._lookup(key)
+        if phonemes is not None:
+            return phonemes
+
+        # convert outside of the lock, concurrent misses of a word are harmless
+        phonemes = self._freeze(g2p(word))
+        with self._lock:
+            self.num_misses += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO g2p VALUES (?, ?, ?)",
+                    (*key, json.dumps(phonemes, ensure_ascii=False)),
+                )
+                self._db.commit()
+        self._insert(key, phonemes)
+        return phonemes
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def close(self) -> None:
+        """
+        Closes the persisted cache, if any.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
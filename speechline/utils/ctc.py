@@ -0,0 +1,179 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+from transformers import PreTrainedTokenizerBase, Wav2Vec2CTCTokenizer
+
+
+@dataclass
+class CTCDecoder:
+    """
+    Vectorized greedy CTC decoder, producing transcripts and frame offsets
+    straight from the argmax token ids of CTC emissions.
+
+    Equivalent to `Wav2Vec2CTCTokenizer.decode(..., output_char_offsets=True)`
+    and its word offsets, with the repeat/blank collapse and delimiter replacement
+    done as NumPy operations over all frames.
+
+    Args:
+        vocab (np.ndarray):
+            Token string of every token id, as an object array.
+        blank_token (str):
+            CTC blank token, i.e. the tokenizer's pad token.
+        word_delimiter_token (str):
+            Word delimiter token.
+        word_delimiter_char (str, optional):
+            Replacement of the word delimiter token in outputs. Defaults to `" "`.
+        do_lower_case (bool, optional):
+            Whether to lowercase the transcript. Defaults to `False`.
+        clean_up_tokenization_spaces (bool, optional):
+            Whether to clean up spaces before punctuations in the transcript.
+            Defaults to `False`.
+    """
+
+    vocab: np.ndarray
+    blank_token: str
+    word_delimiter_token: str
+    word_delimiter_char: str = " "
+    do_lower_case: bool = False
+    clean_up_tokenization_spaces: bool = False
+
+    def __post_init__(self):
+        self.is_blank = self.vocab == self.blank_token
+        is_delimiter_token = self.vocab == self.word_delimiter_token
+        self.chars = np.where(is_delimiter_token, self.word_delimiter_char, self.vocab)
+        self.is_delimiter = self.chars == self.word_delimiter_char
+
+    @classmethod
+    def from_tokenizer(
+        cls, tokenizer: Wav2Vec2CTCTokenizer, vocab_size: int = 0
+    ) -> "CTCDecoder":
+        """
+        Creates a decoder from a `Wav2Vec2CTCTokenizer`.
+
+        Args:
+            tokenizer (Wav2Vec2CTCTokenizer):
+                CTC tokenizer.
+            vocab_size (int, optional):
+                Minimum number of token ids to decode, e.g. the model's
+                `vocab_size`. Defaults to `0`.
+
+        Returns:
+            CTCDecoder:
+                Decoder with the tokenizer's vocabulary and special tokens.
+        """
+        ids = list(range(max(len(tokenizer), vocab_size)))
+        vocab = np.array(tokenizer.convert_ids_to_tokens(ids), dtype=object)
+        return cls(
+            vocab=vocab,
+            blank_token=tokenizer.pad_token,
+            word_delimiter_token=tokenizer.word_delimiter_token,
+            word_delimiter_char=tokenizer.replace_word_delimiter_char,
+            do_lower_case=tokenizer.do_lower_case,
+            clean_up_tokenization_spaces=tokenizer.clean_up_tokenization_spaces,
+        )
+
+    def collapse(
+        self, token_ids: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Collapses repeated tokens and removes blanks.
+
+        Args:
+            token_ids (np.ndarray):
+                Token id of every frame, of shape `(frames,)`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                Token ids, start frames and end frames (exclusive) of every
+                remaining token.
+        """
+        token_ids = np.asarray(token_ids).reshape(-1)
+        if token_ids.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+
+        # start of every run of identical tokens
+        starts = np.flatnonzero(np.diff(token_ids, prepend=token_ids[0] - 1))
+        ends = np.append(starts[1:], token_ids.size)
+        ids = token_ids[starts]
+
+        keep = ~self.is_blank[ids]
+        return ids[keep], starts[keep], ends[keep]
+
+    def decode(self, token_ids: np.ndarray) -> str:
+        """
+        Decodes token ids into a transcript.
+
+        Args:
+            token_ids (np.ndarray):
+                Token id of every frame, of shape `(frames,)`.
+
+        Returns:
+            str:
+                Transcript.
+        """
+        ids, _, _ = self.collapse(token_ids)
+        text = "".join(self.chars[ids]).strip()
+        if self.do_lower_case:
+            text = text.lower()
+        if self.clean_up_tokenization_spaces:
+            text = PreTrainedTokenizerBase.clean_up_tokenization(text)
+        return text
+
+    def char_offsets(
+        self, token_ids: np.ndarray
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Decodes token ids into characters with start and end frames.
+
+        Args:
+            token_ids (np.ndarray):
+                Token id of every frame, of shape `(frames,)`.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]:
+                Characters, start frames and end frames (exclusive).
+        """
+        ids, starts, ends = self.collapse(token_ids)
+        return self.chars[ids].tolist(), starts, ends
+
+    def word_offsets(
+        self, token_ids: np.ndarray
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Decodes token ids into words with start and end frames.
+
+        Args:
+            token_ids (np.ndarray):
+                Token id of every frame, of shape `(frames,)`.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]:
+                Words, start frames and end frames (exclusive).
+        """
+        ids, starts, ends = self.collapse(token_ids)
+        in_word = ~self.is_delimiter[ids]
+
+        # boundaries of runs of non-delimiter characters
+        edges = np.diff(in_word.astype(np.int8), prepend=0, append=0)
+        word_starts = np.flatnonzero(edges == 1)
+        word_ends = np.flatnonzero(edges == -1)
+
+        chars = self.chars[ids]
+        words = ["".join(chars[s:e]) for s, e in zip(word_starts, word_ends)]
+        return words, starts[word_starts], ends[word_ends - 1]
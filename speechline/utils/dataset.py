@@ -12,25 +12,126 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import re
-from glob import glob
+import shutil
+import tempfile
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import chain
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
 import json
 
 import pandas as pd
-from datasets import Audio, Dataset, config, load_from_disk
+import pyarrow as pa
+from datasets import Audio, Dataset
 
+from .audio_store import AudioStore
+from .resample import resample_audios
 
-def prepare_dataframe(path_to_files: str, audio_extension: str = "wav") -> pd.DataFrame:
+
+def _scan_directory(
+    path: str, num_workers: Optional[int] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Recursively lists files under `path` with parallel `os.scandir` calls.
+    Like `glob`, hidden files and directories are skipped.
+
+    Args:
+        path (str):
+            Root directory to scan.
+        num_workers (Optional[int], optional):
+            Number of scanning threads.
+            Defaults to `None` (`ThreadPoolExecutor` default).
+
+    Returns:
+        Dict[str, Tuple[int, int]]:
+            Mapping of file path to `(size, mtime_ns)`.
+    """
+
+    def _scandir(directory: str) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+        subdirs, files = [], {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return subdirs, files
+
+    files = {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        pending = {executor.submit(_scandir, str(path))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, _files = future.result()
+                files.update(_files)
+                pending.update(executor.submit(_scandir, d) for d in subdirs)
+    return files
+
+
+def _load_index(index_path: Optional[str]) -> Dict[str, Dict[str, Union[str, int]]]:
+    """
+    Loads a directory index written by `prepare_dataframe`.
+    Missing or unreadable indices are treated as empty.
+    """
+    if not index_path or not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(index_path: str, index: Dict[str, Dict[str, Union[str, int]]]) -> None:
+    """
+    Atomically writes a directory index.
+    """
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+
+def prepare_dataframe(
+    path_to_files: str,
+    audio_extension: str = "wav",
+    num_workers: Optional[int] = None,
+    index_path: Optional[str] = None,
+) -> pd.DataFrame:
     """
     Prepares audio and ground truth files as Pandas `DataFrame`.
     Recursively searches for audio files in all subdirectories.
 
+    Directories are scanned in parallel with `os.scandir`,
+    and ground truth transcripts are read with a thread pool.
+    If `index_path` is given, a directory index keyed by audio path and
+    modification times is persisted there, so that repeat runs only
+    read transcripts of new or changed files.
+
     Args:
         path_to_files (str):
             Path to files.
         audio_extension (str, optional):
             Audio extension of files to include. Defaults to "wav".
+        num_workers (Optional[int], optional):
+            Number of I/O threads. Defaults to `None` (`ThreadPoolExecutor` default).
+        index_path (Optional[str], optional):
+            Path to persistent JSON directory index. Defaults to `None`.
 
     Raises:
         ValueError: No audio files found.
@@ -45,48 +146,140 @@ def prepare_dataframe(path_to_files: str, audio_extension: str = "wav") -> pd.Da
         - `language_code`
         - `ground_truth`
     """
-    audios = sorted(glob(f"{path_to_files}/**/*.{audio_extension}", recursive=True))
-    audios = [a for a in audios if Path(a).stat().st_size > 0]
+    files = _scan_directory(path_to_files, num_workers=num_workers)
+    audios = sorted(
+        path
+        for path, (size, _) in files.items()
+        if path.endswith(f".{audio_extension}") and size > 0
+    )
     if len(audios) == 0:
         raise ValueError("No audio files found!")
 
+    index = _load_index(index_path)
+
+    def _read_ground_truth(audio: str) -> Dict[str, Union[str, int]]:
+        # ground truth is same filename, except with .txt extension
+        transcript = str(Path(audio).with_suffix(".txt"))
+        _, audio_mtime = files[audio]
+        _, transcript_mtime = files.get(transcript, (0, None))
+        entry = index.get(audio)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == audio_mtime
+            and entry["transcript_mtime_ns"] == transcript_mtime
+        ):
+            return entry
+        ground_truth = ""
+        if transcript_mtime is not None:
+            with open(transcript) as f:
+                ground_truth = f.read()
+        return {
+            "mtime_ns": audio_mtime,
+            "transcript_mtime_ns": transcript_mtime,
+            "ground_truth": ground_truth,
+        }
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        entries = list(executor.map(_read_ground_truth, audios))
+
+    if index_path:
+        _save_index(index_path, dict(zip(audios, entries)))
+
     df = pd.DataFrame({"audio": audios})
     # ID is filename stem (before extension)
-    df["id"] = df["audio"].apply(lambda f: Path(f).stem)
+    df["id"] = [Path(f).stem for f in audios]
     # language code is immediate parent directory
-    df["language_code"] = df["audio"].apply(lambda f: Path(f).parent.name)
-    df["language"] = df["language_code"].apply(lambda f: f.split("-")[0])
-    # ground truth is same filename, except with .txt extension
-    df["ground_truth"] = df["audio"].apply(lambda p: Path(p).with_suffix(".txt"))
-    df["ground_truth"] = df["ground_truth"].apply(
-        lambda p: open(p).read() if p.exists() else ""
-    )
+    df["language_code"] = [Path(f).parent.name for f in audios]
+    df["language"] = df["language_code"].str.split("-").str[0]
+    df["ground_truth"] = [entry["ground_truth"] for entry in entries]
 
     df = df[df["ground_truth"] != ""]
 
     return df
 
 
-def format_audio_dataset(df: pd.DataFrame, sampling_rate: int = 16000) -> Dataset:
+def _resample_transform(
+    batch: Dict[str, List[Any]], sampling_rate: int
+) -> Dict[str, List[Any]]:
+    # other columns can be accessed on their own
+    if "audio" in batch:
+        batch["audio"] = resample_audios(batch["audio"], sampling_rate)
+    return batch
+
+
+def _audio_store_transform(
+    batch: Dict[str, List[Any]], sampling_rate: int, audio_store: AudioStore
+) -> Dict[str, List[Any]]:
+    if "audio" in batch:
+        batch["audio"] = audio_store.get_batch(batch["audio"], sampling_rate)
+    return batch
+
+
+def format_audio_dataset(
+    df: pd.DataFrame,
+    sampling_rate: int = 16000,
+    cache_dir: Optional[str] = None,
+    audio_store: Optional[AudioStore] = None,
+) -> Dataset:
     """
     Formats Pandas `DataFrame` as a datasets `Dataset`.
     Converts `audio` path column to audio arrays and resamples accordingly.
 
+    Audios are decoded at their native sampling rate and resampled on access,
+    batch-wise, with resampling kernels cached per pair of sampling rates.
+    Iterate with `Dataset.iter(batch_size)` to resample many audios at once.
+    If `audio_store` is given, audios are fetched from it instead, so that
+    stages sharing the store decode (and resample) every file only once.
+
+    The Arrow table is built exactly once. By default it is kept in memory.
+    If `cache_dir` is given, the table is written once to a fresh, per-call
+    scratch directory under `cache_dir` and memory-mapped from there, so that
+    concurrent runs on the same host never share cache files.
+    The scratch directory is removed once the returned dataset is garbage-collected.
+
     Args:
         df (pd.DataFrame):
             Pandas DataFrame to convert to `Dataset`.
+        sampling_rate (int, optional):
+            Target audio sampling rate. Defaults to `16000`.
+        cache_dir (Optional[str], optional):
+            Parent directory of the on-disk scratch table.
+            Defaults to `None` (fully in-memory).
+        audio_store (Optional[AudioStore], optional):
+            Shared store of decoded audios. Defaults to `None`.
 
     Returns:
         Dataset:
             `datasets`' `Dataset` object usable for batch inference.
     """
-    dataset = Dataset.from_pandas(df)
-    dataset.save_to_disk(str(config.HF_DATASETS_CACHE))
-    saved_dataset = load_from_disk(str(config.HF_DATASETS_CACHE))
-    saved_dataset = saved_dataset.cast_column(
-        "audio", Audio(sampling_rate=sampling_rate)
-    )
-    return saved_dataset
+    if cache_dir is None:
+        dataset = Dataset.from_pandas(df, preserve_index=False)
+        scratch_dir = None
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        os.makedirs(cache_dir, exist_ok=True)
+        scratch_dir = tempfile.mkdtemp(prefix="speechline-", dir=cache_dir)
+        table_path = os.path.join(scratch_dir, "dataset.arrow")
+        with pa.OSFile(table_path, "wb") as sink:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        dataset = Dataset.from_file(table_path)
+
+    if audio_store is not None:
+        transform = partial(
+            _audio_store_transform,
+            sampling_rate=sampling_rate,
+            audio_store=audio_store,
+        )
+    else:
+        dataset = dataset.cast_column("audio", Audio())
+        transform = partial(_resample_transform, sampling_rate=sampling_rate)
+    dataset = dataset.with_transform(transform)
+
+    if scratch_dir is not None:
+        weakref.finalize(dataset, shutil.rmtree, scratch_dir, ignore_errors=True)
+
+    return dataset
 
 
 def preprocess_audio_transcript(text: str) -> str:
@@ -114,13 +307,192 @@ def preprocess_audio_transcript(text: str) -> str:
     return text
 
 
-def prepare_dataframe_from_manifest(manifest_path: str) -> pd.DataFrame:
+def _iter_json_array(
+    f: TextIO, read_size: int = 1 << 20
+) -> Iterator[Any]:
+    """
+    Incrementally decodes the items of a top-level JSON array from `f`,
+    without loading the whole document in memory.
+
+    Args:
+        f (TextIO):
+            File object positioned at the opening `[`.
+        read_size (int, optional):
+            Number of characters read per refill. Defaults to `1 << 20`.
+
+    Raises:
+        json.JSONDecodeError: Malformed JSON array.
+
+    Yields:
+        Any:
+            Decoded array items.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = f.read(read_size).lstrip(), 1, False
+    if not buffer.startswith("["):
+        raise json.JSONDecodeError("Expecting '['", buffer, 0)
+
+    while True:
+        # skip separators between items
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # an item ending exactly at the buffer boundary may be truncated
+            if end == len(buffer) and not eof:
+                raise json.JSONDecodeError("Truncated item", buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_manifest_entries(manifest_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily reads manifest entries from either a JSON-array manifest
+    or a JSON-lines manifest. The format is detected from the first character.
+
+    Args:
+        manifest_path (str):
+            Path to the manifest file.
+
+    Raises:
+        json.JSONDecodeError: Malformed manifest.
+
+    Yields:
+        Dict[str, Any]:
+            Manifest entries.
+    """
+    with open(manifest_path, "r") as f:
+        first_char = ""
+        while True:
+            first_char = f.read(1)
+            if not first_char or not first_char.isspace():
+                break
+        f.seek(0)
+
+        if first_char == "[":
+            yield from _iter_json_array(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def iter_dataframe_from_manifest(
+    manifest_path: str,
+    chunk_size: int = 10_000,
+    num_workers: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Prepares audio and ground truth files as chunks of Pandas `DataFrame`
+    from a JSON-array or JSON-lines manifest file.
+    The manifest is read incrementally, and audio files of every chunk are
+    checked for existence concurrently, so processing can start before the
+    whole manifest has been read.
+
+    Args:
+        manifest_path (str):
+            Path to the manifest JSON or JSONL file.
+        chunk_size (int, optional):
+            Number of manifest entries per chunk. Defaults to `10_000`.
+        num_workers (Optional[int], optional):
+            Number of file-checking threads.
+            Defaults to `None` (`ThreadPoolExecutor` default).
+
+    Raises:
+        ValueError: Failed to parse manifest, or no valid entries in manifest file.
+
+    Yields:
+        pd.DataFrame:
+            DataFrame chunks with the columns of `prepare_dataframe_from_manifest`,
+            and the same index: existing audios are numbered consecutively across
+            chunks, before rows with empty ground truths are dropped. The index
+            therefore has gaps where those rows were.
+    """
+
+    def _audio_size(audio_path: str) -> int:
+        try:
+            return os.stat(audio_path).st_size
+        except OSError:
+            return -1
+
+    def _to_dataframe(
+        batch: List[Dict[str, Any]], executor: ThreadPoolExecutor, start: int
+    ) -> pd.DataFrame:
+        sizes = executor.map(_audio_size, [entry["audio"] for entry in batch])
+        entries = []
+        for entry, size in zip(batch, sizes):
+            # Check if the audio file exists
+            if size <= 0:
+                continue
+            audio_path = entry["audio"]
+            parent = Path(audio_path).parent.name
+            # Use the provided fields directly when available
+            entries.append(
+                {
+                    "audio": audio_path,
+                    "id": entry.get("id", Path(audio_path).stem),
+                    "language_code": entry.get("accent", entry.get("language", parent)),
+                    "language": entry.get("language", parent.split("-")[0]),
+                    "ground_truth": entry.get("text", ""),
+                }
+            )
+        return pd.DataFrame(
+            entries,
+            columns=["audio", "id", "language_code", "language", "ground_truth"],
+            index=range(start, start + len(entries)),
+        )
+
+    num_entries = 0
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        try:
+            batch = []
+            entries = iter_manifest_entries(manifest_path)
+            for entry in chain(entries, [None]):
+                if isinstance(entry, dict) and "audio" in entry and "text" in entry:
+                    batch.append(entry)
+                # flush full batches, and the last partial batch
+                if batch and (len(batch) == chunk_size or entry is None):
+                    df = _to_dataframe(batch, executor, num_entries)
+                    num_entries += len(df)
+                    batch = []
+                    df = df[df["ground_truth"] != ""]
+                    if len(df):
+                        yield df
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse manifest file: {e}")
+
+    if num_entries == 0:
+        raise ValueError("No valid entries found in manifest file!")
+
+
+def prepare_dataframe_from_manifest(
+    manifest_path: str,
+    chunk_size: int = 10_000,
+    num_workers: Optional[int] = None,
+) -> pd.DataFrame:
     """
     Prepares audio and ground truth files as Pandas `DataFrame` from a manifest file.
+    Accepts both JSON-array and JSON-lines manifests.
+    See `iter_dataframe_from_manifest` for a chunked, incremental variant.
 
     Args:
         manifest_path (str):
-            Path to the manifest JSON file.
+            Path to the manifest JSON or JSONL file.
+        chunk_size (int, optional):
+            Number of manifest entries checked per batch. Defaults to `10_000`.
+        num_workers (Optional[int], optional):
+            Number of file-checking threads.
+            Defaults to `None` (`ThreadPoolExecutor` default).
 
     Raises:
         ValueError: No valid entries found in manifest file.
@@ -135,40 +507,15 @@ def prepare_dataframe_from_manifest(manifest_path: str) -> pd.DataFrame:
         - `language`
         - `ground_truth`
     """
-    entries = []
-    try:
-        # Load the JSON file as a complete array
-        with open(manifest_path, "r") as f:
-            json_data = json.load(f)
-
-        # Process each entry in the array
-        for entry in json_data:
-            if "audio" in entry and "text" in entry:
-                audio_path = entry["audio"]
-                # Check if the audio file exists
-                if Path(audio_path).exists() and Path(audio_path).stat().st_size > 0:
-                    # Use the provided fields directly when available
-                    entries.append(
-                        {
-                            "audio": audio_path,
-                            "id": entry.get("id", Path(audio_path).stem),
-                            "language_code": entry.get(
-                                "accent",
-                                entry.get("language", Path(audio_path).parent.name),
-                            ),
-                            "language": entry.get(
-                                "language", Path(audio_path).parent.name.split("-")[0]
-                            ),
-                            "ground_truth": entry.get("text", ""),
-                        }
-                    )
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse manifest file: {e}")
-
-    if not entries:
-        raise ValueError("No valid entries found in manifest file!")
-
-    df = pd.DataFrame(entries)
-    df = df[df["ground_truth"] != ""]
+    chunks = list(
+        iter_dataframe_from_manifest(
+            manifest_path, chunk_size=chunk_size, num_workers=num_workers
+        )
+    )
+    if not chunks:
+        # all valid entries have empty ground truths
+        return pd.DataFrame(
+            columns=["audio", "id", "language_code", "language", "ground_truth"]
+        )
 
-    return df
+    return pd.concat(chunks)
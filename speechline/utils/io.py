@@ -14,9 +14,11 @@
 
 import json
 import os
-from typing import Dict, List, Union
+import wave
+from typing import BinaryIO, Dict, List, Union
 from pathlib import Path
 import numpy as np
+import soundfile as sf
 from pydub import AudioSegment
 
 
@@ -104,8 +106,25 @@ def export_segment_transcripts_tsv(output_tsv_path: str, segment: List[Dict[str,
             List of offsets in segment.
     """
     with open(output_tsv_path, "w") as f:
-        for s in segment:
-            f.write(f'{s["start_time"]}\t{s["end_time"]}\t{s["text"]}\n')
+        f.write(format_segment_transcripts_tsv(segment))
+
+
+def format_segment_transcripts_tsv(segment: List[Dict[str, Union[str, float]]]) -> str:
+    """
+    Formats segment transcripts as TSV, as exported by
+    `export_segment_transcripts_tsv`.
+
+    Args:
+        segment (List[Dict[str, Union[str, float]]]):
+            List of offsets in segment.
+
+    Returns:
+        str:
+            TSV transcripts.
+    """
+    return "".join(
+        f'{s["start_time"]}\t{s["end_time"]}\t{s["text"]}\n' for s in segment
+    )
 
 
 def export_segment_audio_wav(output_wav_path: str, segment: AudioSegment) -> None:
@@ -128,6 +147,45 @@ def export_segment_audio_wav(output_wav_path: str, segment: AudioSegment) -> Non
     segment.export(output_wav_path, format="wav", parameters=parameters)
 
 
+def export_segment_audio(
+    output_path: Union[str, BinaryIO],
+    array: np.ndarray,
+    sampling_rate: int,
+    audio_format: str = "wav",
+) -> None:
+    """
+    Exports a mono `float32` audio array as 16-bit PCM, in-process.
+
+    WAV headers and samples are written with the standard `wave` module,
+    and FLAC is encoded with `soundfile` (libsndfile).
+
+    Args:
+        output_path (Union[str, BinaryIO]):
+            Path to audio file, or binary file object.
+        array (np.ndarray):
+            1D audio array, with values in range `[-1.0, 1.0]`.
+        sampling_rate (int):
+            Sampling rate of `array`.
+        audio_format (str, optional):
+            Output format, either `"wav"` or `"flac"`. Defaults to `"wav"`.
+
+    Raises:
+        ValueError: Unsupported audio format.
+    """
+    # inverse of soundfile's int16 -> float32 scaling, lossless for 16-bit sources
+    samples = np.clip(np.round(array * 32768), -32768, 32767).astype("<i2")
+    if audio_format == "wav":
+        with wave.open(output_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(sampling_rate)
+            f.writeframes(samples.tobytes())
+    elif audio_format == "flac":
+        sf.write(output_path, samples, sampling_rate, format="FLAC", subtype="PCM_16")
+    else:
+        raise ValueError(f"Audio format {audio_format} is not supported!")
+
+
 def get_outdir_path(path: str, outdir: str) -> str:
     """
     Generate path at output directory.
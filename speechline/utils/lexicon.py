@@ -0,0 +1,340 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import mmap
+import os
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+from lexikos import Lexicon
+
+MAGIC = b"SPLLEX01"
+# alignment of arrays in compiled lexicons, in bytes
+_ALIGNMENT = 8
+# phoneme diacritics, removed before matching
+DIACRITICS = ["ː", "ˑ", "̆", "̯", "͡", "‿", "͜", "̩", "ˈ", "ˌ"]
+
+
+def normalize_phonemes(phonemes: str) -> str:
+    """
+    Remove diacritics from phonemes.
+    Modified from: [Michael McAuliffe](https://memcauliffe.com/speaker-dictionaries-and-multilingual-ipa.html#multilingual-ipa-mode) # noqa: E501
+
+    Args:
+        phonemes (str):
+            Phonemes to normalize.
+
+    Returns:
+        str:
+            Normalized phonemes.
+    """
+    for d in DIACRITICS:
+        phonemes = phonemes.replace(d, "")
+    return phonemes.strip()
+
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class CompiledLexicon(Mapping):
+    """
+    Read-only lexicon of words and their normalized phoneme variations,
+    memory-mapped from a binary file created by `CompiledLexicon.compile`.
+
+    The file holds an interned table of distinct phoneme strings, and an index
+    of sorted words to the ids of their variants. Arrays are read straight from
+    the memory map, so that loading takes milliseconds regardless of the lexicon
+    size, and the pages are shared by all processes loading the same file.
+    Words are looked up by binary search.
+
+    ### Example
+    ```pycon title="example_compiled_lexicon.py"
+    >>> from speechline.utils.lexicon import CompiledLexicon
+    >>> CompiledLexicon.compile({"red": ["ɹ ˈɛ d", "ɹ ɛ d"]}, "lexicon.bin")
+    >>> lexicon = CompiledLexicon("lexicon.bin")
+    >>> lexicon["red"]
+    frozenset({'ɹ ɛ d'})
+    ```
+
+    Args:
+        path (Union[str, Path]):
+            Path to compiled lexicon.
+
+    Raises:
+        ValueError: File is not a compiled lexicon.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            self._file.close()
+            raise ValueError(f"{self.path} is not a compiled lexicon!")
+
+        header_start = len(MAGIC) + 8
+        header_size = int.from_bytes(self._mmap[len(MAGIC) : header_start], "little")
+        header = json.loads(self._mmap[header_start : header_start + header_size])
+        arrays = {
+            name: np.frombuffer(
+                self._mmap, dtype=dtype, count=count, offset=offset
+            )
+            for name, (dtype, offset, count) in header["arrays"].items()
+        }
+        self._word_bytes = arrays["word_bytes"]
+        self._word_offsets = arrays["word_offsets"]
+        self._phoneme_bytes = arrays["phoneme_bytes"]
+        self._phoneme_offsets = arrays["phoneme_offsets"]
+        self._variant_offsets = arrays["variant_offsets"]
+        self._variant_ids = arrays["variant_ids"]
+
+    @staticmethod
+    def is_compiled(path: Union[str, Path]) -> bool:
+        """
+        Checks whether `path` is a compiled lexicon.
+
+        Args:
+            path (Union[str, Path]):
+                Path to file.
+
+        Returns:
+            bool:
+                Whether the file starts with the compiled lexicon magic bytes.
+        """
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def compile(
+        lexicon: Mapping, path: Union[str, Path], normalize: bool = True
+    ) -> None:
+        """
+        Compiles a lexicon into a binary file.
+
+        Args:
+            lexicon (Mapping):
+                Lexicon of words and their phoneme variations.
+            path (Union[str, Path]):
+                Path to output file.
+            normalize (bool, optional):
+                Whether to remove diacritics from phonemes, before deduplicating
+                them. Defaults to `True`.
+        """
+        # sort words by their UTF-8 bytes, the order of lookups
+        words = sorted(lexicon, key=lambda word: word.encode("utf-8"))
+
+        phoneme_ids: Dict[str, int] = {}
+        variant_offsets = np.zeros(len(words) + 1, dtype="<u8")
+        variant_ids = []
+        for i, word in enumerate(words):
+            variants = {
+                normalize_phonemes(p) if normalize else p for p in lexicon[word]
+            }
+            variant_ids.extend(
+                phoneme_ids.setdefault(p, len(phoneme_ids)) for p in sorted(variants)
+            )
+            variant_offsets[i + 1] = len(variant_ids)
+
+        word_bytes, word_offsets = _pack_strings(words)
+        phoneme_bytes, phoneme_offsets = _pack_strings(list(phoneme_ids))
+        arrays = {
+            "word_bytes": word_bytes,
+            "word_offsets": word_offsets,
+            "phoneme_bytes": phoneme_bytes,
+            "phoneme_offsets": phoneme_offsets,
+            "variant_offsets": variant_offsets,
+            "variant_ids": np.asarray(variant_ids, dtype="<u4"),
+        }
+
+        # header offsets depend on the header size, reserve space for the largest
+        def _header(start: int) -> bytes:
+            entries, offset = {}, start
+            for name, array in arrays.items():
+                entries[name] = (array.dtype.str, offset, len(array))
+                offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+            return json.dumps({"arrays": entries}).encode("utf-8")
+
+        header_size = len(_header(2**63))
+        start = -(-(len(MAGIC) + 8 + header_size) // _ALIGNMENT) * _ALIGNMENT
+        header = _header(start).ljust(header_size)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(header_size.to_bytes(8, "little"))
+            f.write(header)
+            f.write(b"\0" * (start - f.tell()))
+            for array in arrays.values():
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % _ALIGNMENT))
+        os.chmod(tmp_path, 0o644)
+        # write atomically, so that running jobs never map partial files
+        os.replace(tmp_path, path)
+
+    def _word(self, idx: int) -> bytes:
+        start, end = self._word_offsets[idx], self._word_offsets[idx + 1]
+        return self._word_bytes[start:end].tobytes()
+
+    def _find(self, word: Any) -> int:
+        if not isinstance(word, str):
+            return -1
+        key = word.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._word(lo) == key else -1
+
+    def phoneme(self, phoneme_id: int) -> str:
+        """
+        Gets an interned phoneme string.
+
+        Args:
+            phoneme_id (int):
+                Phoneme string id.
+
+        Returns:
+            str:
+                Phoneme string.
+        """
+        start = self._phoneme_offsets[phoneme_id]
+        end = self._phoneme_offsets[phoneme_id + 1]
+        return self._phoneme_bytes[start:end].tobytes().decode("utf-8")
+
+    def variant_ids(self, word: str) -> np.ndarray:
+        """
+        Gets the phoneme string ids of a word's variations.
+
+        Args:
+            word (str):
+                Word to look up.
+
+        Raises:
+            KeyError: Word is not in the lexicon.
+
+        Returns:
+            np.ndarray:
+                Phoneme string ids, see `phoneme`.
+        """
+        idx = self._find(word)
+        if idx < 0:
+            raise KeyError(word)
+        start, end = self._variant_offsets[idx], self._variant_offsets[idx + 1]
+        # copied, views would keep the memory map open
+        return self._variant_ids[start:end].copy()
+
+    def __getitem__(self, word: str) -> FrozenSet[str]:
+        return frozenset(self.phoneme(i) for i in self.variant_ids(word))
+
+    def __contains__(self, word: Any) -> bool:
+        return self._find(word) >= 0
+
+    def __len__(self) -> int:
+        return len(self._word_offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._word(i).decode("utf-8") for i in range(len(self)))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # memory maps can't be pickled, processes map the file themselves
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["path"])
+
+    def close(self) -> None:
+        """
+        Unmaps the compiled lexicon.
+        """
+        # arrays view the memory map, and must be released before closing it
+        del self._word_bytes, self._word_offsets
+        del self._phoneme_bytes, self._phoneme_offsets
+        del self._variant_offsets, self._variant_ids
+        self._mmap.close()
+        self._file.close()
+
+
+def load_lexicon(
+    lexicon_paths: Iterable[Union[str, Path]] = (), use_lexikos: bool = True
+) -> Mapping:
+    """
+    Loads a lexicon of words and their phoneme variations.
+
+    A single compiled lexicon is memory-mapped as is. Otherwise, JSON lexicons
+    are merged in order into the `lexikos` lexicon.
+
+    Args:
+        lexicon_paths (Iterable[Union[str, Path]], optional):
+            Paths to a compiled lexicon, or to JSON lexicons of words and their
+            phoneme variations. Defaults to `()`.
+        use_lexikos (bool, optional):
+            Whether to merge JSON lexicons into the `lexikos` lexicon.
+            Defaults to `True`.
+
+    Returns:
+        Mapping:
+            Lexicon of words and their phoneme variations.
+    """
+    lexicon_paths = list(lexicon_paths)
+    if len(lexicon_paths) == 1 and CompiledLexicon.is_compiled(lexicon_paths[0]):
+        return CompiledLexicon(lexicon_paths[0])
+
+    lexicon = Lexicon() if use_lexikos else {}
+    for lexicon_path in lexicon_paths:
+        with open(lexicon_path) as json_file:
+            lex = json.load(json_file)
+        # merge dict with lexicon
+        for k, v in lex.items():
+            lexicon[k] = lexicon[k].union(set(v)) if k in lexicon else set(v)
+    return lexicon
+
+
+def compile_lexicon(
+    output_path: Union[str, Path],
+    lexicon_paths: Iterable[Union[str, Path]] = (),
+    use_lexikos: bool = True,
+) -> CompiledLexicon:
+    """
+    Merges lexicons, and compiles them into a binary file, see `CompiledLexicon`.
+
+    Args:
+        output_path (Union[str, Path]):
+            Path to output compiled lexicon.
+        lexicon_paths (Iterable[Union[str, Path]], optional):
+            Paths to JSON lexicons of words and their phoneme variations, merged
+            in order. Defaults to `()`.
+        use_lexikos (bool, optional):
+            Whether to merge JSON lexicons into the `lexikos` lexicon.
+            Defaults to `True`.
+
+    Returns:
+        CompiledLexicon:
+            Compiled lexicon.
+    """
+    CompiledLexicon.compile(load_lexicon(lexicon_paths, use_lexikos), output_path)
+    return CompiledLexicon(output_path)
@@ -14,6 +14,8 @@
 
 import json
 import os
+from textwrap import indent as indent_text
+from threading import Lock
 from typing import List, Dict, Union, Any
 from speechline.utils.logger import Logger
 
@@ -118,6 +120,81 @@ def write_manifest(
         )
 
 
+class ManifestWriter:
+    """
+    Thread-safe, incremental writer of a JSON manifest, in the format of
+    `write_manifest`. Entries are appended to the file as soon as they are
+    written, so that memory stays bounded regardless of the number of entries.
+    The file is removed on `close` if no valid entries were written.
+
+    Args:
+        output_path (str):
+            Path where the JSON manifest file will be written.
+        indent (int, optional):
+            Number of spaces for JSON indentation. Defaults to 2.
+    """
+
+    def __init__(self, output_path: str, indent: int = 2) -> None:
+        self.output_path = output_path
+        self.indent = indent
+        self.num_entries = 0
+        self._lock = Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if os.path.exists(output_path):
+            logger.warning(f"Overwriting existing manifest file: {output_path}")
+        self._file = open(output_path, "w")
+        self._file.write("[")
+
+    def write(self, manifest_data: List[Any]) -> None:
+        """
+        Appends manifest entries, e.g. the segments of one utterance.
+
+        Args:
+            manifest_data (List[Any]):
+                Manifest data that may contain nested structures.
+        """
+        # flattened non-empty entries, without per-call logging
+        entries = [entry for entry in _count_items(manifest_data) if entry]
+        if not entries:
+            return
+        prefix = " " * self.indent
+        text = ",\n".join(
+            indent_text(json.dumps(entry, indent=self.indent), prefix)
+            for entry in entries
+        )
+        with self._lock:
+            self._file.write(("\n" if self.num_entries == 0 else ",\n") + text)
+            self._file.flush()
+            self.num_entries += len(entries)
+
+    def close(self) -> None:
+        """
+        Terminates the JSON array, or removes the file if it has no entries.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write("\n]" if self.num_entries else "]")
+            self._file.close()
+            if self.num_entries:
+                logger.info(
+                    f"Wrote {self.num_entries} entries to manifest {self.output_path}"
+                )
+            else:
+                os.remove(self.output_path)
+                logger.warning(
+                    f"No valid entries found, manifest file {self.output_path} "
+                    "not created"
+                )
+
+    def __enter__(self) -> "ManifestWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
 def read_manifest_as_lines(file_path: str) -> List[Dict[str, Any]]:
     """
     Reads a manifest file where each line is a valid JSON object.
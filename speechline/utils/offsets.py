@@ -0,0 +1,320 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+@dataclass
+class Offsets:
+    """
+    Columnar offsets: start times, end times and token ids as NumPy arrays,
+    with a shared token vocabulary.
+
+    Compact alternative to the list of `{"text", "start_time", "end_time"}`
+    dictionaries used throughout SpeechLine, with cheap conversion to and from it.
+    Gap computation, shifting, slicing and tag insertion are vectorized, and
+    return new `Offsets` sharing (or extending) the same vocabulary.
+
+    ### Example
+    ```pycon title="example_offsets.py"
+    >>> from speechline.utils.offsets import Offsets
+    >>> offsets = Offsets.from_dicts(
+    ...     [
+    ...         {"text": "hi", "start_time": 0.5, "end_time": 0.7},
+    ...         {"text": "there", "start_time": 1.0, "end_time": 1.3},
+    ...     ]
+    ... )
+    >>> offsets.gaps()
+    array([0.3])
+    >>> offsets.insert_gaps(0.2, "<EMPTY>").shift().to_dicts()
+    [
+        {"text": "hi", "start_time": 0.0, "end_time": 0.2},
+        {"text": "<EMPTY>", "start_time": 0.2, "end_time": 0.5},
+        {"text": "there", "start_time": 0.5, "end_time": 0.8},
+    ]
+    ```
+
+    Args:
+        token_ids (np.ndarray):
+            Token id of every offset, indexing `vocab`.
+        start_time (np.ndarray):
+            Start time (in seconds) of every offset.
+        end_time (np.ndarray):
+            End time (in seconds) of every offset.
+        vocab (np.ndarray):
+            Token strings, as an object array.
+    """
+
+    token_ids: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+    vocab: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        texts: Sequence[str],
+        start_time: Sequence[float],
+        end_time: Sequence[float],
+    ) -> "Offsets":
+        """
+        Creates offsets from texts, start times and end times, interning texts
+        into a vocabulary.
+
+        Args:
+            texts (Sequence[str]):
+                Text of every offset.
+            start_time (Sequence[float]):
+                Start time of every offset.
+            end_time (Sequence[float]):
+                End time of every offset.
+
+        Returns:
+            Offsets:
+                Columnar offsets.
+        """
+        texts = np.array(texts, dtype=object).reshape(-1)
+        if texts.size == 0:
+            vocab, token_ids = np.array([], dtype=object), np.zeros(0, dtype=np.int64)
+        else:
+            vocab, token_ids = np.unique(texts, return_inverse=True)
+        return cls(
+            token_ids=token_ids.astype(np.int64),
+            start_time=np.asarray(start_time, dtype=np.float64).reshape(-1),
+            end_time=np.asarray(end_time, dtype=np.float64).reshape(-1),
+            vocab=vocab,
+        )
+
+    @classmethod
+    def from_dicts(
+        cls, offsets: List[Dict[str, Union[str, float]]], text_key: str = "text"
+    ) -> "Offsets":
+        """
+        Creates offsets from a list of offset dictionaries.
+
+        Args:
+            offsets (List[Dict[str, Union[str, float]]]):
+                Offsets with `text_key`, `start_time` and `end_time` keys.
+                Offsets without `text_key` are given an empty text.
+            text_key (str, optional):
+                Text key of offsets. Defaults to `"text"`.
+
+        Returns:
+            Offsets:
+                Columnar offsets.
+        """
+        return cls.from_arrays(
+            [o.get(text_key, "") for o in offsets],
+            [o["start_time"] for o in offsets],
+            [o["end_time"] for o in offsets],
+        )
+
+    def to_dicts(self, text_key: str = "text") -> List[Dict[str, Union[str, float]]]:
+        """
+        Converts offsets into a list of offset dictionaries.
+
+        Args:
+            text_key (str, optional):
+                Text key of offsets. Defaults to `"text"`.
+
+        Returns:
+            List[Dict[str, Union[str, float]]]:
+                Offsets with `text_key`, `start_time` and `end_time` keys.
+        """
+        return [
+            {text_key: text, "start_time": start, "end_time": end}
+            for text, start, end in zip(
+                self.text.tolist(), self.start_time.tolist(), self.end_time.tolist()
+            )
+        ]
+
+    @property
+    def text(self) -> np.ndarray:
+        """
+        Text of every offset, as an object array.
+        """
+        return self.vocab[self.token_ids]
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> "Offsets":
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+        return Offsets(
+            token_ids=self.token_ids[index],
+            start_time=self.start_time[index],
+            end_time=self.end_time[index],
+            vocab=self.vocab,
+        )
+
+    def token_id(self, text: str) -> Tuple["Offsets", int]:
+        """
+        Looks up the token id of `text`, adding it to the vocabulary if needed.
+
+        Args:
+            text (str):
+                Token text.
+
+        Returns:
+            Tuple[Offsets, int]:
+                Offsets whose vocabulary contains `text`, and its token id.
+        """
+        matches = np.flatnonzero(self.vocab == text)
+        if len(matches) > 0:
+            return self, int(matches[0])
+        vocab = np.append(self.vocab, np.array([text], dtype=object))
+        offsets = Offsets(self.token_ids, self.start_time, self.end_time, vocab)
+        return offsets, len(vocab) - 1
+
+    def gaps(self) -> np.ndarray:
+        """
+        Computes the gaps between consecutive offsets, rounded to milliseconds.
+
+        Returns:
+            np.ndarray:
+                Gap (in seconds) before every offset but the first.
+        """
+        return np.round(self.start_time[1:] - self.end_time[:-1], 3)
+
+    def gap_boundaries(self, minimum_gap: float) -> np.ndarray:
+        """
+        Finds slice boundaries of runs of offsets separated by gaps of
+        at least `minimum_gap`.
+
+        Args:
+            minimum_gap (float):
+                Minimum gap duration (in seconds).
+
+        Returns:
+            np.ndarray:
+                Boundaries, starting at `0` and ending at `len(self)`, such that
+                consecutive boundaries delimit every run.
+        """
+        splits = np.flatnonzero(self.gaps() >= minimum_gap) + 1
+        return np.concatenate(([0], splits, [len(self)])).astype(np.int64)
+
+    def split(self, boundaries: Sequence[int]) -> List["Offsets"]:
+        """
+        Splits offsets at `boundaries`.
+
+        Args:
+            boundaries (Sequence[int]):
+                Slice boundaries, e.g. as returned by `gap_boundaries`.
+
+        Returns:
+            List[Offsets]:
+                Offsets between consecutive boundaries.
+        """
+        return [self[i:j] for i, j in zip(boundaries[:-1], boundaries[1:])]
+
+    def shift(self) -> "Offsets":
+        """
+        Shifts start and end times relative to the first start time,
+        rounded to milliseconds.
+
+        Returns:
+            Offsets:
+                Shifted offsets.
+        """
+        if len(self) == 0:
+            return self
+        origin = self.start_time[0]
+        return Offsets(
+            token_ids=self.token_ids,
+            start_time=np.round(self.start_time - origin, 3),
+            end_time=np.round(self.end_time - origin, 3),
+            vocab=self.vocab,
+        )
+
+    def insert(
+        self,
+        indices: Sequence[int],
+        text: str,
+        start_time: Sequence[float],
+        end_time: Sequence[float],
+    ) -> "Offsets":
+        """
+        Inserts offsets of the same text before `indices`, in a single pass.
+
+        Args:
+            indices (Sequence[int]):
+                Indices (in the current offsets) to insert before.
+            text (str):
+                Text of inserted offsets.
+            start_time (Sequence[float]):
+                Start time of every inserted offset.
+            end_time (Sequence[float]):
+                End time of every inserted offset.
+
+        Returns:
+            Offsets:
+                Offsets with inserted offsets.
+        """
+        offsets, token_id = self.token_id(text)
+        return Offsets(
+            token_ids=np.insert(offsets.token_ids, indices, token_id),
+            start_time=np.insert(offsets.start_time, indices, start_time),
+            end_time=np.insert(offsets.end_time, indices, end_time),
+            vocab=offsets.vocab,
+        )
+
+    def insert_gaps(self, minimum_gap: float, text: str) -> "Offsets":
+        """
+        Fills every gap of at least `minimum_gap` with an offset of `text`.
+
+        Args:
+            minimum_gap (float):
+                Minimum gap duration (in seconds).
+            text (str):
+                Text of inserted offsets, e.g. `"<EMPTY>"`.
+
+        Returns:
+            Offsets:
+                Offsets with filled gaps.
+        """
+        idxs = np.flatnonzero(self.gaps() >= minimum_gap)
+        return self.insert(
+            idxs + 1, text, self.end_time[idxs], self.start_time[idxs + 1]
+        )
+
+    def merge_words(self, delimiter: str = " ", separator: str = " ") -> "Offsets":
+        """
+        Merges runs of tokens between `delimiter` tokens into word offsets,
+        spanning from the first token's start to the last token's end.
+
+        Args:
+            delimiter (str, optional):
+                Word delimiter token. Defaults to `" "`.
+            separator (str, optional):
+                Separator of merged token texts. Defaults to `" "`.
+
+        Returns:
+            Offsets:
+                Word offsets.
+        """
+        in_word = (self.vocab != delimiter)[self.token_ids]
+        # boundaries of runs of non-delimiter tokens
+        edges = np.diff(in_word.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        texts = self.text
+        words = [separator.join(texts[s:e]) for s, e in zip(starts, ends)]
+        return Offsets.from_arrays(
+            words, self.start_time[starts], self.end_time[ends - 1]
+        )
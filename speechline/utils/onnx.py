@@ -0,0 +1,131 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import platform
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import torch
+
+
+def _has_onnx_weights(model_checkpoint: str) -> bool:
+    path = Path(model_checkpoint)
+    return path.is_dir() and any(path.glob("*.onnx"))
+
+
+def load_onnx_model(
+    model_checkpoint: str,
+    task: str,
+    quantize: bool = False,
+    export_dir: Optional[str] = None,
+) -> Any:
+    """
+    Loads a HuggingFace model for inference with ONNX Runtime on CPU.
+
+    If `model_checkpoint` is a local directory containing an ONNX model, it is
+    loaded as is. Otherwise, the model is exported to ONNX from its PyTorch
+    weights. If `quantize`, weights are then quantized to int8 with dynamic
+    quantization. When `export_dir` is given, the exported (and quantized) model
+    is saved under it, and reused by subsequent calls.
+
+    Args:
+        model_checkpoint (str):
+            HuggingFace Hub model checkpoint, or path to a local model directory.
+        task (str):
+            Model task, either `"ctc"` or `"audio-classification"`.
+        quantize (bool, optional):
+            Whether to apply dynamic int8 quantization. Defaults to `False`.
+        export_dir (Optional[str], optional):
+            Directory to save exported models to. Defaults to `None`.
+
+    Raises:
+        ValueError: Unsupported task.
+        ImportError: `optimum[onnxruntime]` is not installed.
+
+    Returns:
+        Any:
+            ONNX Runtime model, usable in place of the PyTorch model
+            in HuggingFace pipelines.
+    """
+    try:
+        import onnxruntime as ort
+        from optimum.onnxruntime import (
+            ORTModelForAudioClassification,
+            ORTModelForCTC,
+            ORTQuantizer,
+        )
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        raise ImportError(
+            "optimum and onnxruntime are required for the ONNX backend. "
+            "They can be installed through: `pip install optimum[onnxruntime]`."
+        )
+
+    model_classes = {
+        "ctc": ORTModelForCTC,
+        "audio-classification": ORTModelForAudioClassification,
+    }
+    if task not in model_classes:
+        raise ValueError(f"ONNX backend does not support task {task}!")
+    model_class = model_classes[task]
+
+    provider = "CPUExecutionProvider"
+    # use as many intra-op threads as PyTorch, e.g. as set per model replica
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = torch.get_num_threads()
+    file_name = "model_quantized.onnx" if quantize else "model.onnx"
+    save_dir = None
+    if export_dir:
+        model_name = re.sub(r"[^\w.-]", "_", model_checkpoint.strip("/"))
+        save_dir = Path(export_dir) / model_name
+
+    if save_dir and (save_dir / file_name).exists():
+        model = model_class.from_pretrained(
+            save_dir,
+            file_name=file_name,
+            provider=provider,
+            session_options=session_options,
+        )
+    else:
+        model = model_class.from_pretrained(
+            model_checkpoint,
+            export=not _has_onnx_weights(model_checkpoint),
+            provider=provider,
+            session_options=session_options,
+        )
+        if save_dir:
+            model.save_pretrained(save_dir)
+
+        if quantize:
+            if platform.machine().lower() in {"arm64", "aarch64"}:
+                qconfig_fn = AutoQuantizationConfig.arm64
+            else:
+                qconfig_fn = AutoQuantizationConfig.avx2
+            qconfig = qconfig_fn(is_static=False, per_channel=False)
+
+            quantized_dir = save_dir or tempfile.mkdtemp(prefix="speechline-onnx-")
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=qconfig)
+            model = model_class.from_pretrained(
+                quantized_dir,
+                file_name=file_name,
+                provider=provider,
+                session_options=session_options,
+            )
+
+    # HuggingFace pipelines read the input name off the model
+    model.main_input_name = "input_values"
+    return model
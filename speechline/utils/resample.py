@@ -0,0 +1,140 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import torch
+import torchaudio.transforms as T
+
+
+@lru_cache(maxsize=None)
+def get_resampler(orig_freq: int, new_freq: int) -> T.Resample:
+    """
+    Gets a `float32` resampler from `orig_freq` to `new_freq`.
+    Resamplers are cached per pair of sampling rates,
+    so that their sinc interpolation kernel is only computed once.
+
+    Args:
+        orig_freq (int):
+            Original sampling rate.
+        new_freq (int):
+            Target sampling rate.
+
+    Returns:
+        T.Resample:
+            Cached resampler.
+    """
+    return T.Resample(orig_freq, new_freq, dtype=torch.float32)
+
+
+def resample_batch(
+    arrays: Sequence[np.ndarray], orig_freq: int, new_freq: int
+) -> List[np.ndarray]:
+    """
+    Resamples audio arrays of the same sampling rate in a single call.
+
+    Arrays are zero-padded to the same length, resampled together,
+    and trimmed back to their resampled lengths. Since resampling already
+    zero-pads the signal edges, the outputs equal resampling every array on its own.
+
+    Args:
+        arrays (Sequence[np.ndarray]):
+            1D audio arrays, sampled at `orig_freq`.
+        orig_freq (int):
+            Original sampling rate.
+        new_freq (int):
+            Target sampling rate.
+
+    Returns:
+        List[np.ndarray]:
+            `float32` audio arrays, sampled at `new_freq`.
+    """
+    if orig_freq == new_freq:
+        return [np.asarray(array, dtype=np.float32) for array in arrays]
+    if len(arrays) == 0:
+        return []
+
+    lengths = [len(array) for array in arrays]
+    batch = np.zeros((len(arrays), max(lengths)), dtype=np.float32)
+    for i, array in enumerate(arrays):
+        batch[i, : len(array)] = array
+
+    with torch.inference_mode():
+        resampled = get_resampler(orig_freq, new_freq)(torch.from_numpy(batch)).numpy()
+
+    # ceil(length * new_freq / orig_freq), the resampled length of each array
+    return [
+        resampled[i, : -(-length * new_freq // orig_freq)]
+        for i, length in enumerate(lengths)
+    ]
+
+
+def resample(array: np.ndarray, orig_freq: int, new_freq: int) -> np.ndarray:
+    """
+    Resamples an audio array with a cached resampler.
+
+    Args:
+        array (np.ndarray):
+            1D audio array, sampled at `orig_freq`.
+        orig_freq (int):
+            Original sampling rate.
+        new_freq (int):
+            Target sampling rate.
+
+    Returns:
+        np.ndarray:
+            `float32` audio array, sampled at `new_freq`.
+    """
+    return resample_batch([array], orig_freq, new_freq)[0]
+
+
+def resample_audios(
+    audios: Sequence[Dict[str, Any]], sampling_rate: int
+) -> List[Dict[str, Any]]:
+    """
+    Resamples `datasets`-style audios to `sampling_rate`.
+    Audios sharing the same original sampling rate are resampled in one batch.
+
+    Args:
+        audios (Sequence[Dict[str, Any]]):
+            Audios with `array` and `sampling_rate` keys.
+        sampling_rate (int):
+            Target sampling rate.
+
+    Returns:
+        List[Dict[str, Any]]:
+            Audios sampled at `sampling_rate`, in order.
+            Audios already at `sampling_rate` are returned as is.
+    """
+    outputs = list(audios)
+    groups = defaultdict(list)
+    for idx, audio in enumerate(audios):
+        if audio["sampling_rate"] != sampling_rate:
+            groups[audio["sampling_rate"]].append(idx)
+
+    for orig_freq, indices in groups.items():
+        arrays = [audios[idx]["array"] for idx in indices]
+        for idx, array in zip(
+            indices, resample_batch(arrays, orig_freq, sampling_rate)
+        ):
+            outputs[idx] = {
+                **audios[idx],
+                "array": array,
+                "sampling_rate": sampling_rate,
+            }
+
+    return outputs
@@ -12,12 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
 from distutils import dir_util
 
 import boto3
 import pytest
+import torch
 from moto import mock_s3
+from transformers import (
+    Wav2Vec2Config,
+    Wav2Vec2CTCTokenizer,
+    Wav2Vec2FeatureExtractor,
+    Wav2Vec2ForCTC,
+)
+
+from speechline.modules import AudioModule
 
 
 @pytest.fixture
@@ -37,6 +47,22 @@ def datadir(tmpdir, request):
     return tmpdir
 
 
+@pytest.fixture
+def fake_audio_module():
+    """
+    Fixture building audio modules around fake pipelines, bypassing the loading
+    of models in their constructors. Progress bars are disabled.
+    """
+
+    def build(module_class, pipeline):
+        module = module_class.__new__(module_class)
+        AudioModule.__init__(module, pipeline)
+        module.show_progress = False
+        return module
+
+    return build
+
+
 @pytest.fixture
 def intialize_credentials():
     os.environ["API_KEY"] = "testing"
@@ -55,3 +81,33 @@ def s3_client(aws_credentials):
     with mock_s3():
         conn = boto3.client("s3", region_name="us-east-1")
         yield conn
+
+
+@pytest.fixture(scope="session")
+def tiny_wav2vec2_ctc(tmp_path_factory):
+    """
+    Fixture creating a tiny, randomly initialized Wav2Vec2 CTC checkpoint,
+    for tests that run models without downloading them.
+    """
+    model_dir = tmp_path_factory.mktemp("tiny-wav2vec2-ctc")
+    vocab_path = model_dir / "vocab.json"
+    vocab_path.write_text(json.dumps({"<pad>": 0, "|": 1, "a": 2, "b": 3, "c": 4}))
+
+    torch.manual_seed(0)
+    config = Wav2Vec2Config(
+        vocab_size=5,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=37,
+        conv_dim=(32,) * 7,
+        feat_extract_norm="layer",
+        do_stable_layer_norm=True,
+        num_conv_pos_embeddings=16,
+        num_conv_pos_embedding_groups=2,
+        pad_token_id=0,
+    )
+    Wav2Vec2ForCTC(config).eval().save_pretrained(model_dir)
+    Wav2Vec2CTCTokenizer(str(vocab_path)).save_pretrained(model_dir)
+    Wav2Vec2FeatureExtractor(return_attention_mask=True).save_pretrained(model_dir)
+    return str(model_dir)
@@ -0,0 +1,83 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+
+import numpy as np
+import soundfile as sf
+
+from speechline.utils.audio_store import AudioStore, decode_audio
+from speechline.utils.dataset import format_audio_dataset, prepare_dataframe
+from speechline.utils.resample import resample
+
+
+def test_audio_store(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"{i}.wav")
+        sf.write(path, rng.uniform(-0.5, 0.5, (4410, 2)), 44100)
+        paths.append(path)
+
+    store = AudioStore()
+    audios = store.get_batch(paths, 16000)
+    assert store.num_decodes == 3 and store.num_hits == 0
+    for path, audio in zip(paths, audios):
+        array, sampling_rate = decode_audio(path)
+        assert sampling_rate == 44100 and array.ndim == 1
+        assert audio["path"] == path and audio["sampling_rate"] == 16000
+        assert np.allclose(audio["array"], resample(array, 44100, 16000))
+
+    # resampled audios are served from the cache, new rates from native decodes
+    assert store.get(paths[0], 16000)["array"] is audios[0]["array"]
+    assert store.get(paths[0])["sampling_rate"] == 44100
+    assert len(store.get(paths[0], 8000)["array"]) == 800
+    assert store.num_decodes == 3 and store.num_hits == 3
+
+    # least-recently-used audios are evicted beyond the memory budget
+    store = AudioStore(max_size_mb=4410 * 4 / 1024 / 1024)
+    store.get(paths[0])
+    store.get(paths[1])
+    store.get(paths[0])
+    assert store.num_decodes == 3 and store.size == 4410 * 4
+
+
+def test_format_audio_dataset_audio_store():
+    df = prepare_dataframe("tests/test_ml", audio_extension="wav")
+    store = AudioStore()
+    expected = format_audio_dataset(df, sampling_rate=8000)
+    dataset = format_audio_dataset(df, sampling_rate=8000, audio_store=store)
+    for batch, expected_batch in zip(dataset.iter(2), expected.iter(2)):
+        for audio, expected_audio in zip(batch["audio"], expected_batch["audio"]):
+            assert audio["sampling_rate"] == expected_audio["sampling_rate"]
+            assert np.allclose(audio["array"], expected_audio["array"], atol=1e-4)
+
+    list(dataset)
+    assert store.num_decodes == len(df) and store.num_hits == len(df)
+
+    # non-audio columns are read without touching the store
+    assert dataset["id"] == list(df["id"])
+    assert dataset.select_columns(["id"])[0] == {"id": df["id"].iloc[0]}
+    assert store.num_decodes == len(df) and store.num_hits == len(df)
+
+
+def test_audio_store_pickle(tmp_path):
+    path = str(tmp_path / "audio.wav")
+    sf.write(path, np.zeros(1600, dtype=np.float32), 16000)
+    store = AudioStore()
+    store.get(path)
+
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored.get(path)["array"].shape == (1600,)
+    assert restored.num_decodes == 1 and restored.num_hits == 1
@@ -0,0 +1,90 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+
+import numpy as np
+
+from speechline.utils.cache import G2PCache, TranscriptionCache
+
+
+def test_transcription_cache(tmpdir):
+    cache = TranscriptionCache(str(tmpdir), "model@revision")
+    audio = {"array": np.linspace(-1, 1, 16000), "sampling_rate": 16000}
+    audio_hash = cache.hash_audio(audio)
+    assert audio_hash != cache.hash_audio({**audio, "sampling_rate": 8000})
+
+    key = cache.key(audio_hash, {"chunk_length_s": 30})
+    assert key != cache.key(audio_hash, {"chunk_length_s": 10})
+    assert key != TranscriptionCache(str(tmpdir), "model@other").key(
+        audio_hash, {"chunk_length_s": 30}
+    )
+
+    assert cache.load_output(key) is None
+    assert cache.load_emissions(key) is None
+
+    output = {"text": "hi", "chunks": [{"text": "hi", "timestamp": (0.0, 0.5)}]}
+    cache.save_output(key, {**output, "segment_size": [16000]})
+    assert cache.load_output(key) == output
+
+    emissions = np.random.randn(50, 32).astype(np.float32)
+    cache.save_emissions(key, emissions)
+    np.testing.assert_array_equal(cache.load_emissions(key), emissions)
+
+
+def test_transcription_cache_model_id(tmpdir):
+    assert TranscriptionCache.make_model_id("org/model", "abc") == "org/model@abc"
+
+    # local checkpoints are identified by their weight files
+    checkpoint = tmpdir.mkdir("model")
+    checkpoint.join("config.json").write("{}")
+    weights = checkpoint.join("model.safetensors")
+    weights.write("weights")
+    model_id = TranscriptionCache.make_model_id(str(checkpoint), None)
+    assert model_id.startswith(f"{checkpoint}@")
+    assert model_id == TranscriptionCache.make_model_id(str(checkpoint), None)
+
+    checkpoint.join("config.json").write('{"a": 1}')
+    assert model_id == TranscriptionCache.make_model_id(str(checkpoint), None)
+    weights.write("retrained weights")
+    assert model_id != TranscriptionCache.make_model_id(str(checkpoint), None)
+
+
+def test_g2p_cache(tmpdir):
+    calls = []
+
+    def g2p(text):
+        calls.append(text)
+        return [" ".join(text)]
+
+    path = str(tmpdir / "g2p.sqlite")
+    cache = G2PCache(max_size=2, cache_path=path)
+    assert cache.get("en", "hi", g2p) == ("h i",)
+    assert cache.get("en", "hi", g2p) == ("h i",)
+    assert cache.get("id", "hi", g2p) == ("h i",)
+    assert calls == ["hi", "hi"]
+    assert cache.num_hits == 1 and cache.num_misses == 2
+
+    # evicted conversions are served from disk
+    cache.get("en", "yo", g2p)
+    assert len(cache) == 2
+    assert cache.get("en", "hi", g2p) == ("h i",)
+    assert cache.num_misses == 3 and cache.num_hits == 2
+
+    # persisted across caches and processes
+    cache = pickle.loads(pickle.dumps(cache))
+    cache.get("en", "yo", g2p)
+    assert G2PCache(cache_path=path).get("id", "hi", g2p) == ("h i",)
+    assert len(calls) == 3
+    cache.close()
@@ -0,0 +1,65 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import numpy as np
+from transformers import Wav2Vec2CTCTokenizer
+
+from speechline.utils.ctc import CTCDecoder
+
+
+def test_ctc_decoder(tmpdir):
+    vocab = {"<pad>": 0, "<s>": 1, "</s>": 2, "<unk>": 3, "|": 4}
+    vocab.update({c: i + 5 for i, c in enumerate("abcdef'")})
+    vocab_path = f"{tmpdir}/vocab.json"
+    with open(vocab_path, "w") as f:
+        json.dump(vocab, f)
+
+    tokenizer = Wav2Vec2CTCTokenizer(vocab_path)
+    decoder = CTCDecoder.from_tokenizer(tokenizer)
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        token_ids = rng.integers(0, len(vocab), size=rng.integers(0, 50))
+        expected = tokenizer.decode(token_ids, output_char_offsets=True)
+        expected_words = tokenizer._get_word_offsets(
+            expected["char_offsets"], tokenizer.replace_word_delimiter_char
+        )
+
+        assert decoder.decode(token_ids) == tokenizer.decode(token_ids)
+
+        chars, starts, ends = decoder.char_offsets(token_ids)
+        assert list(zip(chars, starts.tolist(), ends.tolist())) == [
+            (o["char"], o["start_offset"], o["end_offset"])
+            for o in expected["char_offsets"]
+        ]
+
+        words, starts, ends = decoder.word_offsets(token_ids)
+        assert list(zip(words, starts.tolist(), ends.tolist())) == [
+            (o["word"], o["start_offset"], o["end_offset"]) for o in expected_words
+        ]
+
+
+def test_ctc_decoder_offsets():
+    vocab = np.array(["<pad>", "|", "a", "b"], dtype=object)
+    decoder = CTCDecoder(vocab, blank_token="<pad>", word_delimiter_token="|")
+    token_ids = np.array([0, 2, 2, 0, 2, 3, 1, 1, 3, 0])
+
+    assert decoder.decode(token_ids) == "aab b"
+    assert decoder.char_offsets(token_ids)[0] == ["a", "a", "b", " ", "b"]
+    words, starts, ends = decoder.word_offsets(token_ids)
+    assert words == ["aab", "b"]
+    assert starts.tolist() == [1, 8]
+    assert ends.tolist() == [6, 9]
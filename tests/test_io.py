@@ -0,0 +1,37 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from speechline.utils.io import export_segment_audio
+
+
+def test_export_segment_audio(tmp_path):
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-32768, 32768, 1600, dtype=np.int16)
+    array = samples.astype(np.float32) / 32768
+
+    for audio_format in ("wav", "flac"):
+        path = str(tmp_path / f"chunk.{audio_format}")
+        export_segment_audio(path, array, 16000, audio_format)
+        info = sf.info(path)
+        assert info.format == audio_format.upper() and info.subtype == "PCM_16"
+        assert info.samplerate == 16000 and info.channels == 1
+        # 16-bit samples round-trip losslessly
+        assert np.array_equal(sf.read(path, dtype="int16")[0], samples)
+
+    with pytest.raises(ValueError):
+        export_segment_audio(str(tmp_path / "chunk.mp3"), array, 16000, "mp3")
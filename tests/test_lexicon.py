@@ -0,0 +1,71 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import pickle
+
+import pytest
+
+from speechline.__main__ import main
+from speechline.segmenters import PhonemeOverlapSegmenter
+from speechline.utils.lexicon import CompiledLexicon, load_lexicon
+
+
+def test_compiled_lexicon(tmpdir):
+    lexicon = {
+        "red": ["ɹ ˈɛ d", "ɹ ɛ d"],
+        "café": ["k æ ˈf eɪ"],
+        "just": ["d͡ʒ ˈʌ s t", "d͡ʒ ʌ s t", "dʒ ə s t"],
+        "": [],
+    }
+    path = str(tmpdir / "lexicon.bin")
+    CompiledLexicon.compile(lexicon, path)
+    assert CompiledLexicon.is_compiled(path)
+
+    compiled = CompiledLexicon(path)
+    normalized = PhonemeOverlapSegmenter(lexicon).lexicon
+    assert len(compiled) == 4 and set(compiled) == set(lexicon)
+    assert all(compiled[word] == normalized[word] for word in lexicon)
+    assert "blue" not in compiled and compiled.get("blue") is None and 1 not in compiled
+    with pytest.raises(KeyError):
+        compiled["blue"]
+
+    # phoneme strings are interned
+    ids = compiled.variant_ids("just")
+    assert sorted(compiled.phoneme(i) for i in ids) == ["dʒ ə s t", "dʒ ʌ s t"]
+    assert PhonemeOverlapSegmenter(compiled).lexicon is compiled
+    assert pickle.loads(pickle.dumps(compiled))["café"] == {"k æ f eɪ"}
+    compiled.close()
+
+    json_path = str(tmpdir / "lexicon.json")
+    with open(json_path, "w") as f:
+        json.dump(lexicon, f)
+    assert not CompiledLexicon.is_compiled(json_path)
+    with pytest.raises(ValueError):
+        CompiledLexicon(json_path)
+
+
+def test_compile_lexicon_cli(tmpdir):
+    json_paths = [str(tmpdir / "a.json"), str(tmpdir / "b.json")]
+    for json_path, lexicon in zip(json_paths, [{"red": ["ɹ ɛ d"]}, {"red": ["r ɛ d"]}]):
+        with open(json_path, "w") as f:
+            json.dump(lexicon, f)
+
+    path = str(tmpdir / "lexicon.bin")
+    args = ["lexicon", "compile", "-o", path, "--no_lexikos"]
+    main(args + ["-l", json_paths[0], "-l", json_paths[1]])
+    compiled = load_lexicon([path])
+    assert isinstance(compiled, CompiledLexicon)
+    assert dict(compiled) == load_lexicon(json_paths, use_lexikos=False)
+    assert compiled["red"] == {"ɹ ɛ d", "r ɛ d"}
@@ -13,18 +13,38 @@
 # limitations under the License.
 
 import json
+import os
+import shutil
 from glob import glob
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
+import torch
 
 from scripts.aac_to_wav import convert_to_wav, parse_args
 from speechline.classifiers import ASTClassifier, Wav2Vec2Classifier
-from speechline.config import Config, SegmenterConfig, TranscriberConfig
+from speechline.config import (
+    ClassifierConfig,
+    Config,
+    SegmenterConfig,
+    TranscriberConfig,
+)
+from speechline.modules import (
+    AudioClassifier,
+    AudioModule,
+    AudioMultiLabelClassifier,
+)
 from speechline.run import Runner
 from speechline.segmenters import SilenceSegmenter
 from speechline.transcribers import Wav2Vec2Transcriber, WhisperTranscriber
-from speechline.utils.dataset import format_audio_dataset, prepare_dataframe
+from speechline.utils.dataset import (
+    format_audio_dataset,
+    iter_dataframe_from_manifest,
+    prepare_dataframe,
+    prepare_dataframe_from_manifest,
+)
 from speechline.utils.io import export_transcripts_json
 
 
@@ -47,6 +67,62 @@ def test_prepare_dataframe(datadir):
     assert df.shape[1] == 5
 
 
+def test_prepare_dataframe_index(datadir, tmpdir):
+    index_path = f"{tmpdir}/index.json"
+    df = prepare_dataframe(datadir, index_path=index_path)
+    assert Path(index_path).exists()
+    index = json.load(open(index_path))
+    assert sorted(index) == sorted(df["audio"])
+
+    # unchanged files are served from the index
+    for entry in index.values():
+        entry["ground_truth"] = "cached"
+    json.dump(index, open(index_path, "w"))
+    cached_df = prepare_dataframe(datadir, index_path=index_path)
+    assert (cached_df["ground_truth"] == "cached").all()
+
+    # changed transcripts are re-read
+    transcript = Path(df["audio"].iloc[0]).with_suffix(".txt")
+    transcript.write_text("updated")
+    os.utime(transcript, ns=(0, 0))
+    updated_df = prepare_dataframe(datadir, index_path=index_path)
+    assert updated_df["ground_truth"].iloc[0] == "updated"
+
+
+def test_prepare_dataframe_from_manifest(datadir, tmpdir):
+    audios = sorted(glob(f"{datadir}/*/*.wav"))
+    entries = [{"audio": audio, "text": "hello"} for audio in audios]
+    entries += [{"audio": f"{datadir}/missing.wav", "text": "hello"}, {"id": "foo"}]
+
+    json_path, jsonl_path = f"{tmpdir}/manifest.json", f"{tmpdir}/manifest.jsonl"
+    json.dump(entries, open(json_path, "w"), indent=2)
+    with open(jsonl_path, "w") as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+    df = prepare_dataframe_from_manifest(json_path)
+    assert df["audio"].tolist() == audios
+    assert df.equals(prepare_dataframe_from_manifest(jsonl_path))
+
+    chunks = list(iter_dataframe_from_manifest(jsonl_path, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert pd.concat(chunks).equals(df)
+
+
+def test_format_audio_dataset(datadir, tmpdir):
+    df = prepare_dataframe(datadir)
+    in_memory = format_audio_dataset(df, sampling_rate=16000)
+    on_disk = format_audio_dataset(df, sampling_rate=16000, cache_dir=str(tmpdir))
+    assert len(in_memory) == len(on_disk) == len(df)
+    assert in_memory.column_names == on_disk.column_names == list(df.columns)
+    for a, b in zip(in_memory, on_disk):
+        assert a["audio"]["sampling_rate"] == b["audio"]["sampling_rate"] == 16000
+        assert (a["audio"]["array"] == b["audio"]["array"]).all()
+
+    # non-audio columns are read without decoding audios
+    assert in_memory["id"] == list(df["id"])
+    assert in_memory.select_columns(["id"])[0] == {"id": df["id"].iloc[0]}
+
+
 def test_empty_dataframe():
     with pytest.raises(ValueError):
         _ = prepare_dataframe("foo")
@@ -59,6 +135,7 @@ def test_audio_classifier(datadir):
     dataset = format_audio_dataset(df, sampling_rate=classifier.sampling_rate)
     predictions = classifier.predict(dataset)
     assert predictions == ["child", "child", "child"]
+    assert classifier.predict(dataset, batch_size=2) == predictions
 
 
 def test_wav2vec2_transcriber(datadir, tmpdir):
@@ -261,6 +338,302 @@ def test_wav2vec2_transcriber(datadir, tmpdir):
     ]
 
 
+def test_pipeline_sorted_by_length():
+    class LengthPipeline:
+        feature_extractor = type("FeatureExtractor", (), {"sampling_rate": 16000})
+
+        def __init__(self):
+            self.calls = []
+
+        def __call__(self, inputs, batch_size=1):
+            inputs = list(inputs)
+            self.calls.append(inputs)
+            return iter(len(x) for x in inputs)
+
+    pipeline = LengthPipeline()
+    module = AudioModule(pipeline)
+    inputs = ["a" * n for n in [3, 1, 4, 1, 5, 9, 2, 6]]
+
+    outputs = module.pipeline_sorted_by_length(
+        inputs, length_fn=len, batch_size=2, window_size=5
+    )
+    assert list(outputs) == [3, 1, 4, 1, 5, 9, 2, 6]
+    assert [[len(x) for x in call] for call in pipeline.calls] == [
+        [5, 4, 3, 1, 1],
+        [9, 6, 2],
+    ]
+
+    outputs = module.pipeline_sorted_by_length(inputs, length_fn=len)
+    assert list(outputs) == [3, 1, 4, 1, 5, 9, 2, 6]
+
+
+def test_multilabel_classifier_thresholding(fake_audio_module):
+    class ProbsPipeline:
+        feature_extractor = type("FeatureExtractor", (), {"sampling_rate": 16000})
+        model = type(
+            "Model",
+            (),
+            {"config": type("Config", (), {"id2label": {0: "a", 1: "b", 2: "c"}})},
+        )
+
+        def __call__(self, inputs, batch_size=1):
+            return iter(inputs)
+
+    module = fake_audio_module(AudioMultiLabelClassifier, ProbsPipeline())
+    probs = np.array([[0.1, 0.7, 0.6], [0.2, 0.1, 0.3], [0.9, 0.0, 0.0]])
+    dataset = [{"audio": {"array": row}} for row in probs]
+
+    assert np.array_equal(module.predict_proba(dataset), probs)
+    assert module.top_labels(probs, threshold=0.5) == ["b", None, "a"]
+    assert module.inference(dataset, threshold=0.5) == [
+        [{"label": "b", "score": 0.7}, {"label": "c", "score": 0.6}],
+        [],
+        [{"label": "a", "score": 0.9}],
+    ]
+
+
+def test_audio_classifier_by_group(fake_audio_module):
+    class SignPipeline:
+        feature_extractor = type("FeatureExtractor", (), {"sampling_rate": 16000})
+
+        def __init__(self):
+            self.num_inputs = 0
+
+        def __call__(self, inputs, top_k=1, batch_size=1):
+            for x in inputs:
+                self.num_inputs += 1
+                label = "child" if x[0] > 0 else "adult"
+                yield [{"label": label, "score": abs(x[0])}]
+
+    pipeline = SignPipeline()
+    classifier = fake_audio_module(AudioClassifier, pipeline)
+
+    # confident child speaker, confident adult speaker, unconfident speaker,
+    # speaker whose samples disagree
+    scores = {"a": [0.95] * 20, "b": [-0.99] * 10, "c": [0.6] * 10}
+    scores["d"] = [0.95, -0.95] * 5
+    groups = [group for group, values in scores.items() for _ in values]
+    dataset = [
+        {"audio": {"array": np.array([score])}}
+        for values in scores.values()
+        for score in values
+    ]
+
+    predictions = classifier.inference_by_group(
+        dataset, groups, sample_size=2, max_samples=4, threshold=0.9
+    )
+    expected = classifier.inference(dataset)
+    assert predictions == expected
+    # 2 samples of "a" and "b", 4 samples and fallback of "c" and "d"
+    assert pipeline.num_inputs == len(dataset) + 2 + 2 + 20
+    assert expected.count("child") == 20 + 10 + 5
+
+
+def test_audio_classifier_cascade(fake_audio_module):
+    class WindowPipeline:
+        feature_extractor = type("FeatureExtractor", (), {"sampling_rate": 16000})
+
+        def __init__(self):
+            self.lengths = []
+
+        def __call__(self, inputs, top_k=1, batch_size=1):
+            for x in inputs:
+                self.lengths.append(len(x))
+                # leading windows are scored by their first sample
+                score = abs(x[0]) if len(x) < 10 else 1.0
+                yield [{"label": "child" if x[-1] > 0 else "adult", "score": score}]
+
+    pipeline = WindowPipeline()
+    classifier = fake_audio_module(AudioClassifier, pipeline)
+
+    arrays = [
+        np.array([0.95, 1.0] + [-1.0] * 8),
+        np.array([0.5, 1.0] + [-1.0] * 8),
+        np.array([-0.99, -1.0] + [1.0] * 8),
+    ]
+    dataset = [{"audio": {"array": array}} for array in arrays]
+
+    predictions = classifier.inference_cascade(
+        dataset, window_s=2 / 16000, threshold=0.9
+    )
+    assert predictions == ["child", "adult", "adult"]
+    assert pipeline.lengths == [2, 2, 2, 10]
+
+
+def test_classify_noise_batched(datadir):
+    class LengthNoiseClassifier:
+        sampling_rate = 16000
+
+        def __init__(self):
+            self.calls = []
+
+        def predict_proba(self, dataset, batch_size=1):
+            self.calls.append(len(dataset))
+            return np.array([[len(item["audio"]["array"])] for item in dataset])
+
+        def top_labels(self, probs, threshold=0.5):
+            return [f"{int(p[0]) // 160}0ms" for p in probs]
+
+    df = prepare_dataframe(datadir)
+    offsets = [
+        {"text": "a", "start_time": 0.0, "end_time": 0.1},
+        {"text": "b", "start_time": 0.3, "end_time": 0.4},
+        {"text": "c", "start_time": 0.5, "end_time": 0.6},
+    ]
+    segmenter = SilenceSegmenter()
+    items = [
+        (
+            audio_path,
+            segmenter.prepare_segments(
+                offsets,
+                do_noise_classify=True,
+                silence_duration=1.0,
+                minimum_empty_duration=0.1,
+            ),
+        )
+        for audio_path in df["audio"]
+    ]
+
+    noise_classifier = LengthNoiseClassifier()
+    outputs = segmenter.classify_noise_batched(
+        items, noise_classifier, noise_classifier_threshold=0.5, window_size=3
+    )
+    assert [audio_path for audio_path, _ in outputs] == list(df["audio"])
+    # gaps of consecutive audios are classified together
+    assert noise_classifier.calls == [4, 2]
+    for _, segments in items:
+        assert [o["text"] for o in segments[0]] == ["a", "<200ms>", "b", "<100ms>", "c"]
+
+
+def test_wav2vec2_transcriber_packed(datadir):
+    model_checkpoint = "bookbot/wav2vec2-ljspeech-gruut"
+    transcriber = Wav2Vec2Transcriber(model_checkpoint)
+    df = prepare_dataframe(datadir)
+    dataset = format_audio_dataset(df, sampling_rate=transcriber.sampling_rate)
+    output_offsets = transcriber.predict(
+        dataset, return_timestamps="char", output_offsets=True, pack_length_s=20
+    )
+    assert len(output_offsets) == len(dataset)
+    for offsets, item in zip(output_offsets, dataset):
+        duration = len(item["audio"]["array"]) / item["audio"]["sampling_rate"]
+        assert offsets and offsets[-1]["end_time"] <= duration
+
+
+def _export_onnx_checkpoint(
+    checkpoint: str, transcriber: Wav2Vec2Transcriber, output_dir: str
+) -> str:
+    # checkpoints with ONNX weights are loaded as is
+    shutil.copytree(checkpoint, output_dir)
+    torch.onnx.export(
+        transcriber.pipeline.model,
+        (torch.randn(1, 16000),),
+        os.path.join(output_dir, "model.onnx"),
+        input_names=["input_values"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_values": {0: "batch", 1: "time"},
+            "logits": {0: "batch", 1: "frames"},
+        },
+        opset_version=14,
+        dynamo=False,
+    )
+    return output_dir
+
+
+def test_wav2vec2_transcriber_onnx(datadir, tmpdir, tiny_wav2vec2_ctc):
+    pytest.importorskip("optimum.onnxruntime")
+    transcriber = Wav2Vec2Transcriber(tiny_wav2vec2_ctc)
+    onnx_checkpoint = _export_onnx_checkpoint(
+        tiny_wav2vec2_ctc, transcriber, str(tmpdir / "onnx")
+    )
+    onnx_transcriber = Wav2Vec2Transcriber(onnx_checkpoint, backend="onnx")
+    df = prepare_dataframe(datadir)
+    dataset = format_audio_dataset(df, sampling_rate=transcriber.sampling_rate)
+    dataset = dataset.select([0])
+
+    # packed inputs go through `_num_frames` on both backends
+    for pack_length_s in (0, 20):
+        kwargs = dict(
+            return_timestamps="char", output_offsets=True, pack_length_s=pack_length_s
+        )
+        expected = transcriber.predict(dataset, **kwargs)[0]
+        offsets = onnx_transcriber.predict(dataset, **kwargs)[0]
+        assert expected and [o["text"] for o in offsets] == [
+            o["text"] for o in expected
+        ]
+        for offset, expected_offset in zip(offsets, expected):
+            assert offset["start_time"] == pytest.approx(
+                expected_offset["start_time"], abs=0.02
+            )
+            assert offset["end_time"] == pytest.approx(
+                expected_offset["end_time"], abs=0.02
+            )
+
+
+def test_wav2vec2_transcriber_cache_dtype(tmpdir, tiny_wav2vec2_ctc):
+    transcriber = Wav2Vec2Transcriber(tiny_wav2vec2_ctc)
+    rng = np.random.default_rng(0)
+    array = rng.uniform(-0.5, 0.5, 16000).astype(np.float32)
+    dataset = [{"audio": {"array": array, "sampling_rate": 16000}}]
+    cache_dir = str(tmpdir / "cache")
+
+    def num_entries():
+        return len(glob(os.path.join(cache_dir, "*", "*")))
+
+    transcriber.predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 2
+    transcriber.predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 2
+
+    # emissions of another precision are not reused
+    transcriber.pipeline.model.double()
+    transcriber.predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 4
+
+
+def test_wav2vec2_transcriber_cache_backend(tmpdir, tiny_wav2vec2_ctc):
+    pytest.importorskip("optimum.onnxruntime")
+    checkpoint = _export_onnx_checkpoint(
+        tiny_wav2vec2_ctc,
+        Wav2Vec2Transcriber(tiny_wav2vec2_ctc),
+        str(tmpdir / "onnx"),
+    )
+    onnx_dir = str(tmpdir / "exported")
+    rng = np.random.default_rng(0)
+    array = rng.uniform(-0.5, 0.5, 16000).astype(np.float32)
+    dataset = [{"audio": {"array": array, "sampling_rate": 16000}}]
+    cache_dir = str(tmpdir / "cache")
+
+    def num_entries():
+        return len(glob(os.path.join(cache_dir, "*", "*")))
+
+    Wav2Vec2Transcriber(checkpoint).predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 2
+    # export both ONNX models, which are then loaded from the same directory
+    for quantize in (False, True):
+        Wav2Vec2Transcriber(
+            checkpoint, backend="onnx", quantize=quantize, onnx_dir=onnx_dir
+        )
+
+    onnx_transcriber = Wav2Vec2Transcriber(
+        checkpoint, backend="onnx", onnx_dir=onnx_dir
+    )
+    onnx_transcriber.predict(dataset, cache_dir=cache_dir)
+    onnx_transcriber.predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 4
+
+    # outputs of the unquantized model are not reused for the quantized one
+    quantized_transcriber = Wav2Vec2Transcriber(
+        checkpoint, backend="onnx", quantize=True, onnx_dir=onnx_dir
+    )
+    assert (
+        quantized_transcriber.pipeline.model.config._name_or_path
+        == onnx_transcriber.pipeline.model.config._name_or_path
+    )
+    quantized_transcriber.predict(dataset, cache_dir=cache_dir)
+    assert num_entries() == 6
+
+
 def test_whisper_transcriber(datadir):
     model_checkpoint = "openai/whisper-tiny"
     transcriber = WhisperTranscriber(model_checkpoint)
@@ -325,6 +698,40 @@ def test_runner_wav2vec2_word(datadir, tmpdir):
     assert len(glob(f"{tmpdir}/*/*.wav")) == 4
 
 
+def test_runner_wav2vec2_streaming(datadir, tmpdir, tiny_wav2vec2_ctc):
+    config = {
+        "do_classify": False,
+        "filter_empty_transcript": True,
+        "transcriber": {
+            "type": "wav2vec2",
+            "model": tiny_wav2vec2_ctc,
+            "return_timestamps": "char",
+            "chunk_length_s": 30,
+        },
+        "segmenter": {
+            "type": "silence",
+            "silence_duration": 0.05,
+            "minimum_chunk_duration": 0.01,
+        },
+    }
+
+    def _run(output_dir: str, do_stream: bool):
+        config_path = f"{tmpdir}/config_{do_stream}.json"
+        with open(config_path, "w") as f:
+            json.dump({**config, "do_stream": do_stream}, f)
+        log_dir = f"{tmpdir}/logs"
+        Runner.run(Config(config_path), str(datadir), output_dir, log_dir=log_dir)
+        with open(f"{output_dir}/audio_segment_manifest.json") as f:
+            manifest = json.load(f)
+        wavs = sorted(Path(p).name for p in glob(f"{output_dir}/*/*.wav"))
+        return wavs, sorted(Path(e["wav_path"]).name for e in manifest)
+
+    wavs, manifest = _run(f"{tmpdir}/streaming", do_stream=True)
+    assert len(wavs) > 0 and manifest == wavs
+    # streaming segments the same chunks as batch mode
+    assert _run(f"{tmpdir}/batch", do_stream=False) == (wavs, manifest)
+
+
 def test_runner_whisper(datadir, tmpdir):
     args = Runner.parse_args(
         [
@@ -351,6 +758,35 @@ def test_invalid_transcriber_config():
     with pytest.raises(ValueError):
         _ = TranscriberConfig("whisper", "model", "word", 0)
 
+    with pytest.raises(ValueError):
+        _ = TranscriberConfig("whisper", "model", True, 30, pack_length_s=10)
+
+    with pytest.raises(ValueError):
+        _ = TranscriberConfig("wav2vec2", "model", "char", 30, backend="tensorrt")
+
+    with pytest.raises(ValueError):
+        _ = TranscriberConfig("whisper", "model", True, 30, backend="onnx")
+
+    with pytest.raises(ValueError):
+        _ = TranscriberConfig("wav2vec2", "model", "char", 30, num_replicas=0)
+
+
+def test_invalid_classifier_config():
+    with pytest.raises(ValueError):
+        _ = ClassifierConfig("model", backend="tensorrt")
+
+    with pytest.raises(ValueError):
+        _ = ClassifierConfig("model", speaker_sample_size=0)
+
+    with pytest.raises(ValueError):
+        _ = ClassifierConfig("model", speaker_sample_size=8, speaker_max_samples=4)
+
+    with pytest.raises(ValueError):
+        _ = ClassifierConfig("model", max_duration_s=3.0, cascade_window_s=5.0)
+
+    with pytest.raises(ValueError):
+        _ = ClassifierConfig("model", cascade_window_s=1.0, group_by_speaker=True)
+
 
 def test_invalid_segmenter_config():
     with pytest.raises(ValueError):
@@ -0,0 +1,62 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from speechline.utils.offsets import Offsets
+
+OFFSETS = [
+    {"text": "h", "start_time": 0.5, "end_time": 0.54},
+    {"text": " ", "start_time": 0.54, "end_time": 0.58},
+    {"text": "a", "start_time": 0.9, "end_time": 0.92},
+    {"text": "h", "start_time": 0.92, "end_time": 1.0},
+    {"text": " ", "start_time": 1.0, "end_time": 1.04},
+]
+
+
+def test_offsets_conversion():
+    offsets = Offsets.from_dicts(OFFSETS)
+    assert len(offsets) == 5
+    assert offsets.vocab.tolist() == [" ", "a", "h"]
+    assert offsets.token_ids.tolist() == [2, 0, 1, 2, 0]
+    assert offsets.to_dicts() == OFFSETS
+    assert offsets[2:4].to_dicts() == OFFSETS[2:4]
+    assert Offsets.from_dicts([]).to_dicts() == []
+
+
+def test_offsets_operations():
+    offsets = Offsets.from_dicts(OFFSETS)
+    assert np.allclose(offsets.gaps(), [0.0, 0.32, 0.0, 0.0])
+    assert offsets.gap_boundaries(0.3).tolist() == [0, 2, 5]
+    assert [len(o) for o in offsets.split([0, 2, 5])] == [2, 3]
+
+    assert offsets[2:].shift().to_dicts() == [
+        {"text": "a", "start_time": 0.0, "end_time": 0.02},
+        {"text": "h", "start_time": 0.02, "end_time": 0.1},
+        {"text": " ", "start_time": 0.1, "end_time": 0.14},
+    ]
+
+    filled = offsets.insert_gaps(0.3, "<EMPTY>")
+    assert filled.vocab.tolist() == [" ", "a", "h", "<EMPTY>"]
+    assert filled.to_dicts()[2] == {
+        "text": "<EMPTY>",
+        "start_time": 0.58,
+        "end_time": 0.9,
+    }
+    assert len(filled) == 6
+
+    assert offsets.merge_words().to_dicts() == [
+        {"text": "h", "start_time": 0.5, "end_time": 0.54},
+        {"text": "a h", "start_time": 0.9, "end_time": 1.0},
+    ]
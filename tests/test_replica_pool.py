@@ -0,0 +1,64 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+
+import pytest
+import torch
+
+from speechline.modules.replica_pool import ReplicaPool
+
+
+class DummyReplica:
+    def __init__(self) -> None:
+        self.show_progress = True
+
+    def predict(self, dataset, **kwargs):
+        # give the other replica a chance to pick up work
+        time.sleep(0.05)
+        return [
+            {
+                "length": len(item["audio"]["array"]),
+                "num_threads": torch.get_num_threads(),
+                "pid": os.getpid(),
+                "show_progress": self.show_progress,
+                **kwargs,
+            }
+            for item in dataset
+        ]
+
+
+def test_replica_pool():
+    dataset = [{"audio": {"array": [0.0] * i}, "id": i} for i in range(8)]
+    pool = ReplicaPool(
+        DummyReplica, 16000, num_replicas=2, num_threads=1, chunk_size=1
+    )
+    with pool:
+        predictions = pool.predict(dataset, key="value")
+        streamed = list(pool.predict(iter(dataset), stream=True))
+
+    # predictions are merged back in dataset order
+    assert [p["length"] for p in predictions] == list(range(8))
+    assert [p["length"] for p in streamed] == list(range(8))
+    assert all(p["key"] == "value" and not p["show_progress"] for p in predictions)
+
+    # work is spread over replicas, each with its own thread settings
+    assert len({p["pid"] for p in predictions}) == 2
+    assert os.getpid() not in {p["pid"] for p in predictions}
+    assert all(p["num_threads"] == 1 for p in predictions)
+
+    # replicas are shut down on exit
+    with pytest.raises(RuntimeError):
+        pool.predict(dataset)
@@ -0,0 +1,45 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import torch
+import torchaudio.functional as F
+
+from speechline.utils.resample import get_resampler, resample_audios, resample_batch
+
+
+def test_resample_batch():
+    rng = np.random.default_rng(0)
+    arrays = [rng.standard_normal(n).astype(np.float32) for n in (1, 4410, 22051)]
+    outputs = resample_batch(arrays, 44100, 16000)
+    for array, output in zip(arrays, outputs):
+        expected = F.resample(torch.from_numpy(array), 44100, 16000).numpy()
+        assert output.shape == expected.shape
+        assert np.allclose(output, expected, atol=1e-5)
+
+    assert get_resampler(44100, 16000) is get_resampler(44100, 16000)
+    assert resample_batch([], 44100, 16000) == []
+
+
+def test_resample_audios():
+    audios = [
+        {"path": "a.wav", "array": np.zeros(4410), "sampling_rate": 44100},
+        {"path": "b.wav", "array": np.zeros(1600), "sampling_rate": 16000},
+        {"path": "c.wav", "array": np.zeros(4800), "sampling_rate": 48000},
+    ]
+    outputs = resample_audios(audios, 16000)
+    assert [audio["path"] for audio in outputs] == ["a.wav", "b.wav", "c.wav"]
+    assert [audio["sampling_rate"] for audio in outputs] == [16000] * 3
+    assert [len(audio["array"]) for audio in outputs] == [1600] * 3
+    assert outputs[1] is audios[1]
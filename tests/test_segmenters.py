@@ -12,11 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
 from speechline.segmenters import (
     PhonemeOverlapSegmenter,
+    ReferenceCache,
     SilenceSegmenter,
     WordOverlapSegmenter,
 )
+from speechline.utils.alignment import align_variants, consecutive_runs, equal_blocks
+from speechline.utils.tokenizer import WordTokenizer
 
 
 def test_phoneme_overlap_segmenter():
@@ -103,6 +111,53 @@ def test_phoneme_overlap_segmenter():
     segments = segmenter.chunk_offsets(offsets, ground_truth)
     assert segments == []
 
+    # inserted words before the ground truth
+    offsets = [
+        {"text": "ə", "start_time": 0.16, "end_time": 0.18},
+        {"text": " ", "start_time": 0.2, "end_time": 0.22},
+        {"text": "ð", "start_time": 0.24, "end_time": 0.26},
+        {"text": "ə", "start_time": 0.26, "end_time": 0.28},
+        {"text": " ", "start_time": 0.3, "end_time": 0.34},
+        {"text": "ɹ", "start_time": 0.36, "end_time": 0.38},
+        {"text": "ɛ", "start_time": 0.44, "end_time": 0.46},
+        {"text": "d", "start_time": 0.5, "end_time": 0.52},
+    ]
+    ground_truth = ["red"]
+    segments = segmenter.chunk_offsets(offsets, ground_truth)
+    assert segments == [
+        [{"text": "ɹ ɛ d", "start_time": 0.36, "end_time": 0.52}],
+    ]
+
+    # out-of-lexicon words are converted once
+    segmenter = PhonemeOverlapSegmenter({})
+    combinations = segmenter._generate_combinations(["Red", "red"])
+    assert combinations[0] is combinations[1]
+    assert segmenter.g2p_cache.num_misses == 1 and segmenter.g2p_cache.num_hits == 1
+
+
+def test_align_variants():
+    rng = random.Random(0)
+    for _ in range(50):
+        a = rng.choices(range(6), k=rng.randint(0, 30))
+        b = [set(rng.sample(range(8), 2)) for _ in range(rng.randint(0, 30))]
+        # reference longest common subsequence length
+        table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+        for i, token in enumerate(a):
+            for j, variants in enumerate(b):
+                table[i + 1][j + 1] = max(
+                    table[i][j + 1],
+                    table[i + 1][j],
+                    table[i][j] + (token in variants),
+                )
+
+        pairs = align_variants(a, b)
+        assert len(pairs) == table[-1][-1]
+        assert all(a[i] in b[j] for i, j in pairs)
+        assert all(i1 < i2 and j1 < j2 for (i1, j1), (i2, j2) in zip(pairs, pairs[1:]))
+
+    assert consecutive_runs([]) == []
+    assert consecutive_runs([1, 3, 4, 6]) == [(1, 2), (3, 5), (6, 7)]
+
 
 def test_word_overlap_segmenter():
     offsets = [
@@ -115,19 +170,58 @@ def test_word_overlap_segmenter():
         {"end_time": 2.3, "start_time": 1.98, "text": "BEST"},
     ]
     ground_truth = ["red", "umbrella", "just", "the", "best"]
-    segmenter = WordOverlapSegmenter()
-    segments = segmenter.chunk_offsets(offsets, ground_truth)
-    assert segments == [
-        [
-            {"end_time": 0.52, "start_time": 0.34, "text": "RED"},
-            {"end_time": 1.12, "start_time": 0.68, "text": "UMBRELLA"},
-        ],
-        [
-            {"end_time": 1.78, "start_time": 1.56, "text": "JUST"},
-            {"end_time": 1.94, "start_time": 1.86, "text": "THE"},
-            {"end_time": 2.3, "start_time": 1.98, "text": "BEST"},
-        ],
+    for engine in ("difflib", "levenshtein"):
+        segmenter = WordOverlapSegmenter(engine)
+        segments = segmenter.chunk_offsets(offsets, ground_truth)
+        assert segments == [
+            [
+                {"end_time": 0.52, "start_time": 0.34, "text": "RED"},
+                {"end_time": 1.12, "start_time": 0.68, "text": "UMBRELLA"},
+            ],
+            [
+                {"end_time": 1.78, "start_time": 1.56, "text": "JUST"},
+                {"end_time": 1.94, "start_time": 1.86, "text": "THE"},
+                {"end_time": 2.3, "start_time": 1.98, "text": "BEST"},
+            ],
+        ]
+
+
+def test_equal_blocks():
+    rng = random.Random(0)
+    # long enough to trigger difflib's junk heuristic
+    b = rng.choices(["a", "b", "c", "the", "and"], k=500)
+    a = [w for w in b if rng.random() > 0.1]
+    matcher = SequenceMatcher(None, a, b)
+    expected = [tuple(op[1:]) for op in matcher.get_opcodes() if op[0] == "equal"]
+    assert equal_blocks(a, b) == equal_blocks(a, b, engine="difflib") == expected
+
+    blocks = equal_blocks(a, b, engine="levenshtein")
+    assert all(a[i1:i2] == b[j1:j2] for i1, i2, j1, j2 in blocks)
+    # every transcript word is a ground truth word, only deletions remain
+    assert sum(i2 - i1 for i1, i2, *_ in blocks) == len(a)
+
+    with pytest.raises(ValueError):
+        equal_blocks(a, b, engine="myers")
+
+
+def test_reference_cache():
+    offsets = [
+        {"end_time": 0.52, "start_time": 0.34, "text": "RED"},
+        {"end_time": 1.12, "start_time": 0.68, "text": "UMBRELLA"},
+        {"end_time": 1.78, "start_time": 1.56, "text": "JUST"},
     ]
+    segmenter = WordOverlapSegmenter()
+    references = ReferenceCache(segmenter, WordTokenizer())
+    references.prepare(["Red umbrella, just!", "red  UMBRELLA, just!"])
+    assert len(references) == 1
+    assert references.num_misses == 1 and references.num_hits == 1
+
+    kwargs = references.get("Red umbrella, just!")
+    assert kwargs["reference"] is references.get("red umbrella, just!")["reference"]
+    assert kwargs["ground_truth"] == ("red", "umbrella", "just")
+    assert segmenter.chunk_offsets(offsets, **kwargs) == segmenter.chunk_offsets(
+        offsets, ["red", "umbrella", "just"]
+    )
 
 
 def test_silence_segmenter():
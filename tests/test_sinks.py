@@ -0,0 +1,105 @@
+# Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import tarfile
+
+import numpy as np
+import pytest
+from datasets import Dataset
+
+from speechline.sinks import (
+    ArrowShardSink,
+    DirectorySink,
+    NemoManifestSink,
+    SegmentSink,
+    TarShardSink,
+)
+
+AUDIO_PATH = "input/en-us/utt"
+SEGMENT = [
+    {"text": "hello", "start_time": 0.0, "end_time": 0.5},
+    {"text": "world", "start_time": 0.5, "end_time": 1.0},
+]
+
+
+def _chunk(idx: int) -> np.ndarray:
+    samples = np.full(16000, idx * 100, dtype=np.int16)
+    return samples.astype(np.float32) / 32768
+
+
+def test_segment_sink_is_abstract():
+    class NoWriteSink(SegmentSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWriteSink()
+
+
+def test_directory_sink(tmp_path):
+    with DirectorySink(str(tmp_path), audio_format="flac") as sink:
+        entry = sink.write(AUDIO_PATH, 0, _chunk(0), 16000, SEGMENT)
+    assert entry == {
+        "wav_path": f"{tmp_path}/en-us/utt-0.flac",
+        "tsv_path": f"{tmp_path}/en-us/utt-0.tsv",
+    }
+    assert open(entry["tsv_path"]).read() == "0.0\t0.5\thello\n0.5\t1.0\tworld\n"
+
+
+def test_nemo_manifest_sink(tmp_path):
+    with NemoManifestSink(str(tmp_path)) as sink:
+        for idx in range(2):
+            sink.write(AUDIO_PATH, idx, _chunk(idx), 16000, SEGMENT)
+    with open(tmp_path / "manifest.jsonl") as f:
+        entries = [json.loads(line) for line in f]
+    assert entries == [
+        {
+            "audio_filepath": f"{tmp_path}/en-us/utt-{idx}.wav",
+            "duration": 1.0,
+            "text": "hello world",
+        }
+        for idx in range(2)
+    ]
+
+
+def test_tar_shard_sink(tmp_path):
+    # every 1-second chunk exceeds the shard size, one shard per chunk
+    with TarShardSink(str(tmp_path), max_shard_size_mb=0.01) as sink:
+        entries = [
+            sink.write(AUDIO_PATH, idx, _chunk(idx), 16000, SEGMENT)
+            for idx in range(3)
+        ]
+    assert sink.num_shards == 3
+    assert entries[1] == {
+        "shard_path": f"{tmp_path}/shard-000001.tar",
+        "key": "en-us/utt-1",
+    }
+    with tarfile.open(entries[1]["shard_path"]) as tar:
+        assert tar.getnames() == ["en-us/utt-1.wav", "en-us/utt-1.tsv"]
+
+
+def test_arrow_shard_sink(tmp_path):
+    with ArrowShardSink(str(tmp_path), batch_size=2) as sink:
+        for idx in range(3):
+            sink.write(AUDIO_PATH, idx, _chunk(idx), 16000, SEGMENT)
+    assert sink.num_shards == 1
+
+    dataset = Dataset.from_file(f"{tmp_path}/shard-000000.arrow")
+    assert dataset["id"] == ["utt-0", "utt-1", "utt-2"]
+    assert dataset["language"] == ["en-us"] * 3
+    assert dataset["text"] == ["hello world"] * 3
+    assert dataset[0]["offsets"]["start_time"] == [0.0, 0.5]
+    audio = dataset[2]["audio"]
+    assert audio["sampling_rate"] == 16000
+    assert np.array_equal(audio["array"], _chunk(2))